@@ -8,6 +8,8 @@ from . import rock_physics  # noqa: F401
 
 from . import inversion  # noqa: F401
 from . import wavelets  # noqa: F401
+from . import precision  # noqa: F401
+from . import validation  # noqa: F401
 
 __version__ = "0.1.6-beta.2"
 __author__ = "GIECAR - UFF"
@@ -1,4 +1,5 @@
 from . import classification
 from . import regression
 from . import mlp_classification
-from . import mlp_regression
\ No newline at end of file
+from . import mlp_regression
+from . import clustering
\ No newline at end of file
@@ -0,0 +1 @@
+from .electrofacies import electrofacies
@@ -0,0 +1,415 @@
+import numpy as np
+from typing import Annotated
+
+METHODS = ("kmeans", "gmm")
+
+# Rows sampled to seed the centres with k-means++.
+_SEED_ROWS = 20_000
+
+# Weight below which a mixture component is reseeded during online EM.
+_MIN_WEIGHT = 1e-4
+
+
+def _well_curves(well, curves):
+    """Row-chunk accessor of the curves of a well.
+
+    Accepts the dictionary layout of :class:`stoneforge.preprocessing.project`
+    (``{mnemonic: {'data': array, 'unit': str}}``), the matrix layout
+    produced by ``project.convert_into_matrix`` (``{'mnemonics': [...],
+    'data': (n_curves, n_samples)}``) and ``(n_samples, n_features)`` arrays
+    such as ``np.memmap``. Nothing is copied until a chunk is requested.
+    """
+    if isinstance(well, np.ndarray):
+        return well.shape[0], lambda a, b: np.asarray(well[a:b], dtype=float)
+    if "mnemonics" in well and "data" in well:
+        rows = [list(well["mnemonics"]).index(name) for name in curves]
+        data = well["data"]
+        return np.shape(data)[1], lambda a, b: np.asarray(data[rows, a:b], dtype=float).T
+    columns = [well[name]["data"] if isinstance(well[name], dict) else well[name] for name in curves]
+    return len(columns[0]), lambda a, b: np.column_stack([np.asarray(c[a:b], dtype=float) for c in columns])
+
+
+def _squared_distances(X, centres):
+    """Squared Euclidean distances of every row to every centre (one matmul)."""
+    d = X @ (-2.0 * centres.T)
+    d += np.einsum("ij,ij->i", X, X)[:, None]
+    d += np.einsum("ij,ij->i", centres, centres)[None, :]
+    # the expansion can round slightly below zero
+    return np.maximum(d, 0.0, out=d)
+
+
+class electrofacies():
+    """Unsupervised electrofacies from the logs of many wells.
+
+    The model is trained out-of-core: the wells are read in chunks of
+    `batch_size` depth samples, so memory-mapped arrays are never loaded
+    whole. A first pass standardises the curves (streaming mean and
+    variance) and keeps a uniform random sample of the rows; the centres
+    are seeded with the best of a few k-means++ starts refined on that
+    sample. Then, for `n_epochs` passes over the chunks in random order:
+
+    - 'kmeans': mini-batch k-means, where every centre moves towards the
+      mean of its samples in the batch with a learning rate of one over
+      its running count;
+    - 'gmm': a full covariance Gaussian mixture, started from the k-means
+      solution and refined by online (stochastic) EM on the running
+      sufficient statistics.
+
+    The assignment of a batch is a single matrix product against all the
+    centres. Facies are numbered by increasing centre of the first curve.
+
+    Example
+    -------
+    >>> proj = project('path/to/well/logs')
+    >>> proj.import_folder(ext='.las')
+    >>> proj.import_several_wells()
+    >>> model = electrofacies(n_facies=5, curves=['GR', 'RHOB', 'NPHI', 'DT'])
+    >>> model.fit(proj)
+    >>> model.write(proj, name='FACIES')  # proj.well_data[well]['FACIES']
+    """
+
+    def __init__(
+        self,
+        n_facies : Annotated [int, "Number of electrofacies"] = 6,
+        curves : Annotated [list, "Mnemonics of the curves used"] = None,
+        method : Annotated [str, "Clustering method"] = "kmeans",
+        batch_size : Annotated [int, "Depth samples per mini-batch"] = 65_536,
+        n_epochs : Annotated [int, "Passes over the data"] = 3,
+        seed : Annotated [int, "Seed of the random generator"] = 99):
+        """Sets up the model.
+
+        Parameters
+        ----------
+        n_facies : int, optional
+            Number of electrofacies (clusters).
+        curves : list, optional
+            Mnemonics of the curves used as features. Required unless the
+            wells are ``(n_samples, n_features)`` arrays.
+        method : str, optional
+            Clustering method. Should be one of
+                - 'kmeans': mini-batch k-means.
+                - 'gmm': Gaussian mixture trained by online EM.
+        batch_size : int, optional
+            Number of depth samples read and processed at once.
+        n_epochs : int, optional
+            Number of passes over all the wells.
+        seed : int, optional
+            Seed of the random generator (initialisation and chunk order).
+        """
+
+        if method not in METHODS:
+            raise ValueError(f"Method '{method}' is not supported. Available methods: {list(METHODS)}")
+        if n_facies < 1 or batch_size < 1:
+            raise ValueError("n_facies and batch_size must be positive integers")
+        self.n_facies = int(n_facies)
+        self.curves = curves
+        self.method = method
+        self.batch_size = int(batch_size)
+        self.n_epochs = int(n_epochs)
+        self.seed = seed
+
+        self.mean = None
+        self.scale = None
+        self.centres = None
+        self.weights = None
+        self.covariances = None
+
+    # ============================================ #
+
+    def _wells(self, data):
+        wells = data.well_data if hasattr(data, "well_data") else data
+        if isinstance(wells, np.ndarray):
+            wells = {0: wells}
+        return {name: _well_curves(well, self.curves) for name, well in wells.items()}
+
+    def _chunks(self, sources, rng=None):
+        """Standardised chunks of valid rows, in random order when `rng` is given."""
+        tasks = [(name, start) for name, (size, _) in sources.items()
+                 for start in range(0, size, self.batch_size)]
+        if rng is not None:
+            tasks = [tasks[i] for i in rng.permutation(len(tasks))]
+        for name, start in tasks:
+            size, read = sources[name]
+            block = read(start, min(start + self.batch_size, size))
+            valid = ~np.isnan(block).any(axis=1)
+            block = block[valid]
+            if self.mean is not None:
+                block -= self.mean
+                block /= self.scale
+            yield name, start, valid, block
+
+    def _statistics(self, sources, rng):
+        """Streaming mean and variance (Chan merge) and a uniform row sample.
+
+        The sample keeps the rows with the smallest random keys seen so far
+        (bottom-k sampling), which is uniform over all the valid rows.
+        """
+        count, mean, m2 = 0, 0.0, 0.0
+        keys, sample = np.empty(0), np.empty((0, 0))
+        for _, _, _, block in self._chunks(sources):
+            n = len(block)
+            if n == 0:
+                continue
+            block_mean = block.mean(axis=0)
+            block_m2 = ((block - block_mean)**2).sum(axis=0)
+            delta = block_mean - mean
+            total = count + n
+            mean = mean + delta * n / total
+            m2 = m2 + block_m2 + delta**2 * count * n / total
+            count = total
+
+            block_keys = rng.random(n)
+            if len(keys) >= _SEED_ROWS:
+                kept = block_keys < keys.max()
+                block_keys, block = block_keys[kept], block[kept]
+            keys = np.concatenate([keys, block_keys])
+            sample = np.concatenate([sample.reshape(-1, block.shape[1]), block])
+            if len(keys) > _SEED_ROWS:
+                smallest = np.argpartition(keys, _SEED_ROWS)[:_SEED_ROWS]
+                keys, sample = keys[smallest], sample[smallest]
+
+        if count < self.n_facies:
+            raise ValueError("There are fewer valid samples than facies")
+        std = np.sqrt(m2 / count)
+        scale = np.where(std > 0, std, 1.0)
+        return mean, scale, (sample - mean) / scale
+
+    def _kmeans_plus_plus(self, rows, rng):
+        centres = [rows[rng.integers(len(rows))]]
+        closest = _squared_distances(rows, centres[0][None, :])[:, 0]
+        for _ in range(1, self.n_facies):
+            total = closest.sum()
+            index = rng.choice(len(rows), p=closest / total) if total > 0 else rng.integers(len(rows))
+            centres.append(rows[index])
+            np.minimum(closest, _squared_distances(rows, rows[index][None, :])[:, 0], out=closest)
+        return np.array(centres)
+
+    def _seed_centres(self, rows, rng, n_init=4, iterations=25):
+        """Best of `n_init` k-means++ seeds refined by Lloyd on the sample."""
+        best, best_inertia = None, np.inf
+        for _ in range(n_init):
+            centres = self._kmeans_plus_plus(rows, rng)
+            for _ in range(iterations):
+                labels = np.argmin(_squared_distances(rows, centres), axis=1)
+                counts = np.bincount(labels, minlength=self.n_facies)
+                sums = np.zeros_like(centres)
+                np.add.at(sums, labels, rows)
+                filled = counts > 0
+                centres[filled] = sums[filled] / counts[filled, None]
+            inertia = _squared_distances(rows, centres).min(axis=1).sum()
+            if inertia < best_inertia:
+                best, best_inertia = centres, inertia
+        return best
+
+    def _log_density(self, X):
+        """Log of weight times Gaussian density of every row and component."""
+        k = X.shape[1]
+        out = np.empty((len(X), self.n_facies))
+        for c in range(self.n_facies):
+            try:
+                chol = np.linalg.cholesky(self.covariances[c])
+            except np.linalg.LinAlgError:
+                raise ValueError(f"The covariance of facies {c} is not positive definite; "
+                                 "check for constant or duplicated curves") from None
+            z = np.linalg.solve(chol, (X - self.centres[c]).T)
+            out[:, c] = (np.log(self.weights[c]) - np.log(np.diag(chol)).sum()
+                         - 0.5 * (k * np.log(2 * np.pi) + np.einsum("ij,ij->j", z, z)))
+        return out
+
+    def _responsibilities(self, X):
+        log_p = self._log_density(X)
+        log_p -= log_p.max(axis=1, keepdims=True)
+        np.exp(log_p, out=log_p)
+        log_p /= log_p.sum(axis=1, keepdims=True)
+        return log_p
+
+    # ============================================ #
+
+    def fit(
+        self,
+        data : Annotated [object, "project, or wells keyed by name"]) -> "electrofacies":
+        """Trains the model on all the wells.
+
+        Parameters
+        ----------
+        data : project or dict
+            A :class:`stoneforge.preprocessing.project`, or a dictionary of
+            wells keyed by name in any of the layouts of ``project.well_data``
+            or as ``(n_samples, n_features)`` (memory-mapped) arrays.
+
+        Returns
+        -------
+        self : electrofacies
+            The trained model.
+        """
+        rng = np.random.default_rng(self.seed)
+        sources = self._wells(data)
+        self.mean, self.scale = None, None
+        mean, scale, rows = self._statistics(sources, rng)
+        self.mean, self.scale = mean, scale
+
+        centres = self._seed_centres(rows, rng)
+        counts = np.zeros(self.n_facies)
+        for _ in range(self.n_epochs):
+            for _, _, _, X in self._chunks(sources, rng):
+                if len(X) == 0:
+                    continue
+                labels = np.argmin(_squared_distances(X, centres), axis=1)
+                n = np.bincount(labels, minlength=self.n_facies).astype(float)
+                sums = np.zeros_like(centres)
+                np.add.at(sums, labels, X)
+                counts += n
+                moved = n > 0
+                # each centre moves to the running mean of its samples
+                rate = n[moved] / counts[moved]
+                centres[moved] += rate[:, None] * (sums[moved] / n[moved, None] - centres[moved])
+
+        order = np.argsort(centres[:, 0])
+        self.centres = centres[order]
+        counts = counts[order]
+        self.weights = np.maximum(counts, 1.0) / np.maximum(counts, 1.0).sum()
+        k = rows.shape[1]
+        self.covariances = np.repeat(np.eye(k)[None], self.n_facies, axis=0)
+
+        if self.method == "gmm":
+            self._fit_gmm(sources, rng, rows)
+        return self
+
+    def _fit_gmm(self, sources, rng, rows):
+        """Online EM: running sufficient statistics with a decaying step."""
+        k = rows.shape[1]
+        labels = np.argmin(_squared_distances(rows, self.centres), axis=1)
+        for c in range(self.n_facies):
+            members = rows[labels == c]
+            if len(members) > k:
+                self.covariances[c] = np.cov(members, rowvar=False) + 1e-6 * np.eye(k)
+
+        s0 = self.weights.copy()
+        s1 = self.weights[:, None] * self.centres
+        s2 = self.weights[:, None, None] * (self.covariances + np.einsum("ci,cj->cij", self.centres, self.centres))
+        step = 0
+        for _ in range(self.n_epochs):
+            for _, _, _, X in self._chunks(sources, rng):
+                if len(X) == 0:
+                    continue
+                r = self._responsibilities(X)
+                n = len(X)
+                rho = (step + 2.0)**-0.6
+                step += 1
+                s0 = (1 - rho) * s0 + rho * r.sum(axis=0) / n
+                s1 = (1 - rho) * s1 + rho * (r.T @ X) / n
+                s2 = (1 - rho) * s2 + rho * np.einsum("nc,ni,nj->cij", r, X, X, optimize=True) / n
+
+                collapsed = s0 < _MIN_WEIGHT
+                if collapsed.any():
+                    # reseed components left without samples on random rows
+                    picks = rows[rng.integers(len(rows), size=collapsed.sum())]
+                    s0[collapsed] = _MIN_WEIGHT
+                    s1[collapsed] = _MIN_WEIGHT * picks
+                    s2[collapsed] = _MIN_WEIGHT * (np.eye(k) + np.einsum("ci,cj->cij", picks, picks))
+
+                self.weights = s0 / s0.sum()
+                self.centres = s1 / s0[:, None]
+                self.covariances = (s2 / s0[:, None, None]
+                                    - np.einsum("ci,cj->cij", self.centres, self.centres)
+                                    + 1e-6 * np.eye(k))
+
+        # EM may reorder the components: number them by the first curve again
+        order = np.argsort(self.centres[:, 0])
+        self.centres = self.centres[order]
+        self.weights = self.weights[order]
+        self.covariances = self.covariances[order]
+
+    # ============================================ #
+
+    def _check_fitted(self):
+        if self.centres is None:
+            raise ValueError("The model must be fitted first")
+
+    def predict(
+        self,
+        well : Annotated [object, "Curves of a well"]) -> np.array:
+        """Electrofacies of every depth sample of a well.
+
+        Parameters
+        ----------
+        well : dict or array_like
+            A well in any of the layouts accepted by :meth:`fit`.
+
+        Returns
+        -------
+        facies : array_like
+            Facies code (0 to ``n_facies - 1``) of each sample, NaN where a
+            curve is missing.
+        """
+        self._check_fitted()
+        size, read = _well_curves(well, self.curves)
+        facies = np.full(size, np.nan)
+        for _, start, valid, X in self._chunks({0: (size, read)}):
+            if len(X) == 0:
+                continue
+            if self.method == "gmm":
+                labels = np.argmax(self._log_density(X), axis=1)
+            else:
+                labels = np.argmin(_squared_distances(X, self.centres), axis=1)
+            facies[start + np.flatnonzero(valid)] = labels
+        return facies
+
+    def predict_proba(
+        self,
+        well : Annotated [object, "Curves of a well"]) -> np.array:
+        """Probability of every facies at every depth sample ('gmm' only).
+
+        Returns
+        -------
+        probability : array_like
+            Array of shape ``(n_samples, n_facies)``, NaN where a curve is
+            missing.
+        """
+        self._check_fitted()
+        if self.method != "gmm":
+            raise ValueError("Facies probabilities require method='gmm'")
+        size, read = _well_curves(well, self.curves)
+        probability = np.full((size, self.n_facies), np.nan)
+        for _, start, valid, X in self._chunks({0: (size, read)}):
+            if len(X):
+                probability[start + np.flatnonzero(valid)] = self._responsibilities(X)
+        return probability
+
+    def write(
+        self,
+        data : Annotated [object, "project, or wells keyed by name"],
+        name : Annotated [str, "Mnemonic of the facies curve"] = "FACIES") -> dict:
+        """Predicts the facies of every well and writes them back.
+
+        Parameters
+        ----------
+        data : project or dict
+            The wells, as given to :meth:`fit`. Wells in the layouts of
+            ``project.well_data`` receive a new curve; arrays are left
+            unchanged.
+        name : str, optional
+            Mnemonic of the facies curve.
+
+        Returns
+        -------
+        facies : dict
+            Facies curve of each well keyed by well name.
+        """
+        wells = data.well_data if hasattr(data, "well_data") else data
+        result = {}
+        for well_name, well in wells.items():
+            facies = self.predict(well)
+            result[well_name] = facies
+            if isinstance(well, np.ndarray):
+                continue
+            if "mnemonics" in well and "data" in well:
+                if name in well["mnemonics"]:
+                    well["data"][list(well["mnemonics"]).index(name)] = facies
+                else:
+                    well["mnemonics"].append(name)
+                    well["units"].append("")
+                    well["data"] = np.vstack([well["data"], facies])
+            else:
+                well[name] = {"data": facies, "unit": ""}
+        return result
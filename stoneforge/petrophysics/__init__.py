@@ -3,3 +3,11 @@ from . import permeability  # noqa: F401
 from . import shale_volume  # noqa: F401
 from . import water_saturation  # noqa: F401
 from . import total_organic_carbon_content  # noqa: F401
+from . import helpers  # noqa: F401
+from . import batch  # noqa: F401
+from . import sweep  # noqa: F401
+from . import uncertainty  # noqa: F401
+from . import propagation  # noqa: F401
+from . import multimineral  # noqa: F401
+from . import nmr  # noqa: F401
+from . import temperature  # noqa: F401
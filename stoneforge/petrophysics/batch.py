@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+
+import os
+import numpy as np
+from typing import Annotated
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from multiprocessing import shared_memory
+
+from .porosity import porosity
+from .shale_volume import vshale
+from .water_saturation import water_saturation
+from .permeability import permeability
+from .total_organic_carbon_content import calculate_toc
+from ..preprocessing.data_management import zone_table
+
+
+_batch_methods = {
+    "porosity": porosity,
+    "vshale": vshale,
+    "water_saturation": water_saturation,
+    "permeability": permeability,
+    "calculate_toc": calculate_toc,
+}
+
+
+def _well_curve(well, mnemonic):
+    """Return a curve from a single well in any of the project layouts."""
+    if "mnemonics" in well and "data" in well:
+        # matrix layout from `project.convert_into_matrix`
+        return np.asarray(well["data"][well["mnemonics"].index(mnemonic)])
+
+    curve = well[mnemonic]
+    if isinstance(curve, dict):
+        # dictionary layout from `project.import_well`
+        curve = curve["data"]
+
+    return np.asarray(curve)
+
+
+def _evaluate(function, curves, parameters, kwargs, out):
+    """Evaluate `function` for one well.
+
+    Zoned parameters are expanded into per-sample arrays, so the well is
+    evaluated with a single vectorised call whatever its number of zones.
+    """
+    fun = _batch_methods.get(function, function)
+
+    if isinstance(parameters, dict):
+        out[:] = fun(**curves, **parameters, **kwargs)
+        return
+
+    if not isinstance(parameters, zone_table):
+        parameters = zone_table(parameters)
+    out[:] = fun(**curves, **parameters.expand(curves.pop("__depth__")), **kwargs)
+
+
+def _share(arrays):
+    """Copy the curves of a well into a new shared memory block.
+
+    The block holds one row per curve plus a last row for the result.
+    """
+    arrays = [np.asarray(a, dtype=np.float64) for a in arrays]
+    rows, size = len(arrays) + 1, len(arrays[0])
+    shm = shared_memory.SharedMemory(create=True, size=max(1, rows * size * 8))
+    block = np.ndarray((rows, size), dtype=np.float64, buffer=shm.buf)
+    block[:-1] = arrays
+    block = None
+    return shm
+
+
+def _run_shared(function, names, shm_name, size, parameters, kwargs):
+    """Process-pool worker: attach to the well block and evaluate it."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    block = np.ndarray((len(names) + 1, size), dtype=np.float64, buffer=shm.buf)
+    try:
+        curves = {name: block[i] for i, name in enumerate(names)}
+        _evaluate(function, curves, parameters, kwargs, block[-1])
+    finally:
+        # views must be released before the block is closed
+        curves = block = None
+        shm.close()
+
+
+def batch(
+    wells: Annotated[dict, "Wells data, e.g. project.well_data"],
+    function: Annotated[str, "Façade name or function to be evaluated"],
+    curves: Annotated[dict, "Function argument name to well mnemonic"],
+    parameters: Annotated[dict, "Per-well parameter table"] = None,
+    depth: Annotated[str, "Depth mnemonic, required by zoned parameters"] = None,
+    n_jobs: Annotated[int, "Number of worker processes"] = None,
+    **kwargs) -> dict:
+    """Evaluate a petrophysics function over several wells in a process pool.
+
+    The input curves of each well are copied once into a shared memory block
+    that the worker process attaches to, so the logs are not pickled between
+    processes. Each worker writes its result back into the same block.
+
+    Parameters
+    ----------
+    wells : dict
+        Wells keyed by name. Each well may be a ``{mnemonic: array}``
+        dictionary or follow the ``project.well_data`` layouts (either
+        ``{mnemonic: {'data': array, 'unit': str}}`` or the matrix layout
+        created by ``project.convert_into_matrix``). A ``project`` object is
+        also accepted.
+    function : str or callable
+        One of 'porosity', 'vshale', 'water_saturation', 'permeability' and
+        'calculate_toc',
+        or a module level function (it must be picklable).
+    curves : dict
+        Maps the function argument names to the well mnemonics, e.g.
+        ``{'rhob': 'RHOB'}``.
+    parameters : dict, optional
+        Parameter table keyed by well name. Each entry is either a dictionary
+        of parameters for the whole well or a
+        :class:`stoneforge.preprocessing.zone_table` (or the list of
+        ``(top, parameters)`` tuples it is built from) with per-zone values
+        (a zone spans from its top down to the next top; samples above the
+        first top use the first zone). Wells
+        that are missing from the table use only `kwargs`.
+    depth : str, optional
+        Depth mnemonic. Required if any well has per-zone parameters.
+    n_jobs : int, optional
+        Number of worker processes. Default is the number of CPUs. If 1,
+        wells are evaluated serially in the current process.
+    **kwargs : dict
+        Parameters shared by all wells (e.g. ``method='density'``).
+
+    Returns
+    -------
+    results : dict
+        Resulting log of each well, keyed by the well name.
+
+    Example
+    -------
+    >>> params = {'W1': {'rw': 0.03}, 'W2': [(1000.0, {'rw': 0.03}), (1500.0, {'rw': 0.05})]}
+    >>> sw = batch(proj.well_data, 'water_saturation', {'rt': 'ILD', 'phi': 'PHIE'},
+    ...            parameters=params, depth='DEPT', a=1.0, m=2.0, n=2.0, method='archie')
+    """
+    wells = getattr(wells, "well_data", wells)
+    parameters = parameters or {}
+    if n_jobs is None:
+        n_jobs = os.cpu_count() or 1
+
+    def _inputs(name):
+        well = wells[name]
+        params = parameters.get(name, {})
+        mnemonics = dict(curves)
+        if not isinstance(params, dict):
+            if depth is None:
+                msg = f"Well '{name}' has zoned parameters but no depth mnemonic was given"
+                raise ValueError(msg)
+            mnemonics["__depth__"] = depth
+        data = {arg: _well_curve(well, mnem) for arg, mnem in mnemonics.items()}
+        return data, params
+
+    results = {}
+
+    if n_jobs == 1:
+        for name in wells:
+            data, params = _inputs(name)
+            size = len(next(iter(data.values())))
+            results[name] = np.empty(size)
+            _evaluate(function, data, params, kwargs, results[name])
+        return results
+
+    pending = {}
+    names = list(wells)
+    try:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            while names or pending:
+                # keep a bounded number of wells in shared memory at a time
+                while names and len(pending) < 4 * n_jobs:
+                    name = names.pop(0)
+                    data, params = _inputs(name)
+                    args = list(data)
+                    size = len(data[args[0]])
+
+                    shm = _share(data[arg] for arg in args)
+                    future = executor.submit(_run_shared, function, args, shm.name, size, params, kwargs)
+                    pending[future] = (name, shm, len(args) + 1, size)
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name, shm, rows, size = pending.pop(future)
+                    try:
+                        future.result()
+                        block = np.ndarray((rows, size), dtype=np.float64, buffer=shm.buf)
+                        results[name] = block[-1].copy()
+                        block = None
+                    finally:
+                        shm.close()
+                        shm.unlink()
+    finally:
+        for _, shm, _, _ in pending.values():
+            shm.close()
+            shm.unlink()
+
+    return {name: results[name] for name in wells}
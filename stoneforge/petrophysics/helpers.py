@@ -1,5 +1,160 @@
 # Ensure petrophysic output data (water saturation, shale volue and porosity) be at range [0, 1]
+import inspect
+import threading
 import numpy as np
+from typing import Annotated, Callable
 
-def correct_petrophysic_estimation_range(petrophysics_data):
-    return np.clip(petrophysics_data, 0.0, 1.0)
+# Number of depth samples evaluated at once by `chunked_apply` when no
+# chunk size is given (~8 MB per float64 curve).
+DEFAULT_CHUNKSIZE = 1_000_000
+
+# Largest scratch buffer (bytes) kept between calls; larger ones are
+# allocated for each call and freed with it.
+SCRATCH_MAX_BYTES = 8 * DEFAULT_CHUNKSIZE
+
+_workspace = threading.local()
+
+
+def correct_petrophysic_estimation_range(petrophysics_data, out=None):
+    return np.clip(petrophysics_data, 0.0, 1.0, out=out)
+
+
+def _clipped_derivatives(raw, derivatives, lower=0.0, upper=1.0):
+    """Zero the partial derivatives where the unclipped result `raw` falls
+    outside [lower, upper], since the clipped output is flat there."""
+    inside = (raw >= lower) & (raw <= upper) | np.isnan(raw)
+    return {name: np.where(inside, d, 0.0) for name, d in derivatives.items()}
+
+
+def _output_array(out, *arrays):
+    """Return `out`, or a new array with the broadcast shape and floating
+    dtype of the inputs (Python scalars do not promote the dtype)."""
+    if out is not None:
+        return out
+    shape = np.broadcast_shapes(*(np.shape(a) for a in arrays))
+    return np.empty(shape, dtype=_result_dtype(*arrays))
+
+
+def _result_dtype(*arrays):
+    """Floating dtype of a result computed from `arrays`."""
+    arrays = [a if isinstance(a, (int, float)) else np.asarray(a) for a in arrays]
+    return np.result_type(*arrays, 0.0)
+
+
+def _scalar_or_array(result):
+    """Unwrap 0-d results so scalar inputs still give scalar outputs."""
+    return result[()] if result.ndim == 0 else result
+
+
+def _scratch(like, slot=0):
+    """Thread-local scratch array shaped like `like`.
+
+    The buffer of each slot is kept between calls and only reallocated when
+    the shape or dtype changes, so kernels that need intermediate arrays do
+    not allocate them again when called repeatedly over the same depth grid.
+    Buffers larger than `SCRATCH_MAX_BYTES` are not kept, so one call on a
+    long log does not pin full-size arrays for the life of the thread.
+    """
+    if like.nbytes > SCRATCH_MAX_BYTES:
+        return np.empty(like.shape, dtype=like.dtype)
+    buffers = getattr(_workspace, "buffers", None)
+    if buffers is None:
+        buffers = _workspace.buffers = {}
+    buffer = buffers.get(slot)
+    if buffer is None or buffer.shape != like.shape or buffer.dtype != like.dtype:
+        buffer = buffers[slot] = np.empty(like.shape, dtype=like.dtype)
+    return buffer
+
+
+def release_scratch() -> None:
+    """Free the scratch buffers kept by the kernels in the calling thread."""
+    _workspace.buffers = {}
+
+
+def chunked_apply(
+    fun: Annotated[Callable, "Petrophysics function to be evaluated"],
+    out: Annotated[np.array, "Output array (may be a np.memmap)"] = None,
+    chunksize: Annotated[int, "Number of samples per chunk"] = None,
+    **kwargs) -> np.array:
+    """Evaluate a petrophysics function over the depth axis in chunks.
+
+    Every argument that is an array with the length of the longest array
+    argument (the depth axis) is sliced along its first axis; scalars (and
+    shorter arrays, e.g. a one-element parameter) are passed unchanged to
+    each call. Memory-mapped inputs
+    are therefore only read one chunk at a time and, when `out` is a
+    memory-mapped array, the working set is bounded by `chunksize`
+    regardless of the size of the logs.
+
+    Parameters
+    ----------
+    fun : callable
+        Function (or façade) to be evaluated. Must be element-wise along the
+        depth axis.
+    out : array_like, optional
+        Array where the result is written, e.g. a ``np.memmap`` or an array
+        from ``np.lib.format.open_memmap``. If not given, an in-memory array
+        is allocated with the dtype of the first chunk result.
+    chunksize : int, optional
+        Number of depth samples evaluated per call. Default is
+        `DEFAULT_CHUNKSIZE`.
+    **kwargs : dict
+        Arguments passed to `fun`.
+
+    Returns
+    -------
+    out : array_like
+        The evaluated log.
+
+    Example
+    -------
+    >>> rhob = np.load('rhob.npy', mmap_mode='r')
+    >>> phi = np.lib.format.open_memmap('phi.npy', mode='w+', dtype=float, shape=rhob.shape)
+    >>> chunked_apply(density_porosity, out=phi, chunksize=500_000, rhob=rhob)
+    """
+    if chunksize is None:
+        chunksize = DEFAULT_CHUNKSIZE
+    if chunksize < 1:
+        raise ValueError("chunksize must be a positive integer")
+
+    for key, value in kwargs.items():
+        if isinstance(value, (list, tuple)):
+            kwargs[key] = np.asarray(value)
+
+    lengths = [np.shape(v)[0] for v in kwargs.values()
+               if isinstance(v, np.ndarray) and v.ndim > 0]
+    if not lengths:
+        result = fun(**kwargs)
+        if out is None:
+            return result
+        out[...] = result
+        return out
+
+    size = max(lengths)
+    sliced = [k for k, v in kwargs.items()
+              if isinstance(v, np.ndarray) and v.ndim > 0 and v.shape[0] == size]
+    # kernels with an `out` argument write each chunk straight into `out`
+    inplace = "out" in inspect.signature(fun).parameters
+
+    for start in range(0, size, chunksize):
+        stop = min(start + chunksize, size)
+        chunk = dict(kwargs)
+        for key in sliced:
+            chunk[key] = kwargs[key][start:stop]
+
+        if inplace and out is not None:
+            fun(**chunk, out=out[start:stop])
+            continue
+
+        result = fun(**chunk)
+
+        if out is None:
+            result = np.asarray(result)
+            shape = (size,) + result.shape[1:] if result.ndim else (size,)
+            out = np.empty(shape, dtype=result.dtype)
+        out[start:stop] = result
+
+    if hasattr(out, "flush"):
+        out.flush()
+
+    return out
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+from typing import Annotated
+
+from .helpers import DEFAULT_CHUNKSIZE, _output_array, _scalar_or_array
+from ..precision import precision_policy
+
+
+def _bin_fraction_above(edges, cutoff):
+    """Fraction of each T2 bin above `cutoff`, linear in log(T2)."""
+    lo, hi = np.log(edges[:-1]), np.log(edges[1:])
+    return np.clip((hi - np.log(cutoff)) / (hi - lo), 0.0, 1.0)
+
+
+def t2_bin_edges(
+    t2: Annotated[np.array, "T2 bin centres (ms)"]) -> np.array:
+    """Edges of the T2 bins, midway between the centres in log(T2).
+
+    Parameters
+    ----------
+    t2 : array_like
+        Increasing T2 values of the bin centres (ms), usually log-spaced.
+
+    Returns
+    -------
+    edges : array_like
+        The ``len(t2) + 1`` bin edges (ms).
+    """
+    log_t2 = np.log(np.asarray(t2, dtype=np.float64))
+    if log_t2.size < 2:
+        raise ValueError("At least two T2 bins are required")
+    mid = 0.5 * (log_t2[1:] + log_t2[:-1])
+    return np.exp(np.concatenate([[2*log_t2[0] - mid[0]], mid, [2*log_t2[-1] - mid[-1]]]))
+
+
+@precision_policy
+def sdr_permeability(
+    phi: Annotated[np.array, "NMR porosity"],
+    t2lm: Annotated[np.array, "T2 logarithmic mean (ms)"],
+    a: Annotated[float, "Formation coefficient"] = 4.0,
+    m: Annotated[float, "Porosity exponent"] = 4.0,
+    n: Annotated[float, "T2 exponent"] = 2.0,
+    out: Annotated[np.array, "Output array"] = None) -> np.array:
+    """Estimate permeability with the Schlumberger-Doll Research (SDR) equation :footcite:t:`kenyon1988`.
+
+    Parameters
+    ----------
+    phi : array_like
+        NMR total porosity (fraction).
+    t2lm : array_like
+        Logarithmic mean of the T2 distribution (ms).
+    a : float, optional
+        Formation dependent coefficient (4 for sandstones).
+    m : float, optional
+        Porosity exponent.
+    n : float, optional
+        T2 exponent.
+    out : array_like, optional
+        Array where the result is stored.
+
+    Returns
+    -------
+    k : array_like
+        Permeability (mD), ``a * phi**m * t2lm**n``.
+    """
+    K = _output_array(out, phi, t2lm)
+    np.power(t2lm, n, out=K)
+    np.multiply(K, a, out=K)
+    K *= np.power(phi, m)
+    return _scalar_or_array(K)
+
+
+@precision_policy
+def timur_coates_permeability(
+    phi: Annotated[np.array, "NMR porosity"],
+    ffi: Annotated[np.array, "Free fluid index"],
+    bvi: Annotated[np.array, "Bulk volume irreducible"],
+    c: Annotated[float, "Formation coefficient"] = 10.0,
+    m: Annotated[float, "Porosity exponent"] = 4.0,
+    n: Annotated[float, "Fluid ratio exponent"] = 2.0,
+    out: Annotated[np.array, "Output array"] = None) -> np.array:
+    """Estimate permeability with the Timur-Coates (free fluid) equation :footcite:t:`coates1999`.
+
+    Parameters
+    ----------
+    phi : array_like
+        NMR effective porosity (fraction).
+    ffi : array_like
+        Free fluid index, the porosity above the T2 cutoff (fraction).
+    bvi : array_like
+        Bulk volume irreducible, the porosity between the clay bound
+        water and the T2 cutoffs (fraction).
+    c : float, optional
+        Formation dependent coefficient (10 for porosity in p.u.).
+    m : float, optional
+        Porosity exponent.
+    n : float, optional
+        Fluid ratio exponent.
+    out : array_like, optional
+        Array where the result is stored.
+
+    Returns
+    -------
+    k : array_like
+        Permeability (mD), ``(100*phi / c)**m * (ffi / bvi)**n``.
+    """
+    K = _output_array(out, phi, ffi, bvi)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.divide(ffi, bvi, out=K)
+        np.power(K, n, out=K)
+        K *= np.power(np.multiply(phi, 100 / c), m)
+    return _scalar_or_array(K)
+
+
+def nmr_properties(
+    distribution: Annotated[np.array, "T2 distributions (depth x bins)"],
+    t2: Annotated[np.array, "T2 bin centres (ms)"],
+    t2_cutoff: Annotated[float, "Bound fluid T2 cutoff (ms)"] = 33.0,
+    cbw_cutoff: Annotated[float, "Clay bound water T2 cutoff (ms)"] = 3.0,
+    sdr: Annotated[dict, "Parameters of sdr_permeability"] = None,
+    timur_coates: Annotated[dict, "Parameters of timur_coates_permeability"] = None,
+    chunksize: Annotated[int, "Number of depth samples per chunk"] = None) -> dict:
+    """Porosity partition, T2 log-mean and permeability from NMR T2 distributions.
+
+    Every reduction over the bin axis is a weighted sum of the bin
+    amplitudes, so they are all obtained with a single matrix product of
+    the distributions by a ``(bins x 4)`` weight matrix: total porosity,
+    porosity above each cutoff and the ``sum(amplitude * ln(T2))`` of the
+    log-mean. A bin cut by a cutoff is split in proportion to its width in
+    log(T2). The depth axis is processed in chunks, so memory-mapped
+    distributions are read one chunk at a time.
+
+    Parameters
+    ----------
+    distribution : array_like
+        Porosity increment (fraction) of each T2 bin, with shape
+        ``(n_samples, n_bins)``. May be a ``np.memmap``.
+    t2 : array_like
+        Increasing T2 values of the bin centres (ms).
+    t2_cutoff : float, optional
+        T2 cutoff between bound and free fluid (33 ms for sandstones, 92 ms
+        for carbonates).
+    cbw_cutoff : float, optional
+        T2 cutoff between clay bound water and capillary bound fluid (ms).
+    sdr : dict, optional
+        Parameters of :func:`sdr_permeability`.
+    timur_coates : dict, optional
+        Parameters of :func:`timur_coates_permeability`.
+    chunksize : int, optional
+        Number of depth samples processed at once. Default is
+        `DEFAULT_CHUNKSIZE` divided by the number of bins.
+
+    Returns
+    -------
+    nmr : dict
+        A dictionary of curves containing the following keys:
+        - 'phit': The total porosity.
+        - 'phie': The effective porosity (above the clay bound water cutoff).
+        - 'cbw': The clay bound water.
+        - 'bvi': The capillary bound fluid (bulk volume irreducible).
+        - 'ffi': The free fluid index.
+        - 't2lm': The logarithmic mean of T2 (ms).
+        - 'k_sdr': The SDR permeability (mD).
+        - 'k_timur_coates': The Timur-Coates permeability (mD).
+
+    Example
+    -------
+    >>> spectra = np.load('t2.npy', mmap_mode='r')   # (2_000_000, 64)
+    >>> t2 = np.logspace(-1, 4, 64)
+    >>> nmr = nmr_properties(spectra, t2, t2_cutoff=33.0)
+    >>> phie, k = nmr['phie'], nmr['k_timur_coates']
+    """
+    t2 = np.asarray(t2, dtype=np.float64)
+    shape = np.shape(distribution)
+    if len(shape) != 2 or shape[1] != t2.size:
+        raise ValueError(f"distribution must have shape (n_samples, {t2.size}), got {shape}")
+    if cbw_cutoff > t2_cutoff:
+        raise ValueError("cbw_cutoff must not be greater than t2_cutoff")
+    if chunksize is None:
+        chunksize = max(1, DEFAULT_CHUNKSIZE // t2.size)
+    if chunksize < 1:
+        raise ValueError("chunksize must be a positive integer")
+
+    edges = t2_bin_edges(t2)
+    weights = np.column_stack([
+        np.ones(t2.size),
+        _bin_fraction_above(edges, cbw_cutoff),
+        _bin_fraction_above(edges, t2_cutoff),
+        np.log(t2),
+    ])
+
+    size = shape[0]
+    dtype = np.result_type(getattr(distribution, "dtype", np.float64), np.float32)
+    sums = np.empty((size, weights.shape[1]), dtype=dtype)
+    for start in range(0, size, chunksize):
+        stop = min(start + chunksize, size)
+        block = np.asarray(distribution[start:stop])
+        np.matmul(block, weights.astype(dtype, copy=False), out=sums[start:stop])
+
+    phit, phie, ffi, ln_t2 = sums.T
+    result = {"phit": phit, "phie": phie, "cbw": phit - phie, "bvi": phie - ffi, "ffi": ffi}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result["t2lm"] = np.exp(ln_t2 / phit)
+    result["k_sdr"] = sdr_permeability(phit, result["t2lm"], **(sdr or {}))
+    result["k_timur_coates"] = timur_coates_permeability(phie, ffi, result["bvi"], **(timur_coates or {}))
+
+    return result
@@ -2,10 +2,13 @@
 
 import numpy as np
 from typing import Annotated
-import warnings
+from ..precision import precision_policy, float_array
+from ..validation import check_range
+from .helpers import chunked_apply, _output_array, _result_dtype, _scalar_or_array, _scratch
 #from stoneforge.petrophysics.helpers import correct_petrophysic_estimation_range
 
 
+@precision_policy
 def tixier(
     resd: Annotated[np.array, "Deep resistivity"],
     ress: Annotated[np.array, "Shallow resistivity"], 
@@ -13,6 +16,7 @@ def tixier(
     wd: Annotated[float, "Density of formation water"]=1.10,
     hd: Annotated[float, "Density of formation oil"]=0.8,
     inzone: Annotated[float, "Invasion radius"]=0.75,
+    out: Annotated[np.array, "Output array"] = None,
     ) -> np.array:
     """
     Estimate permeability using the empirical method of :footcite:t:`tixier1949`,(:footcite:t:mohaghegh1997`).
@@ -31,26 +35,38 @@ def tixier(
         Density of formation in g/cm3.
     inzone : array_like, float, optional
         Invasion radius or change in depth in meters.
+    out : array_like, optional
+        Array where the result is stored. It must have the broadcast shape of
+        the inputs and must not overlap them. Repeated calls with the same
+        `out` do not allocate.
+
     Returns
     -------
     k : array_like
         Estimated permeability (mD) from the Tixier empirical relation.
     """
 
-    dres = resd - ress  # Calculate the resistivity difference
+    K = _output_array(out, resd, ress, rw, wd, hd, inzone)
+
+    # Calculate the resistivity difference
+    np.subtract(resd, ress, out=K)
 
     # Calculate the term inside the parentheses
-    term = (2.3 / (rw * (wd - hd))) * (dres / inzone)
+    np.divide(K, inzone, out=K)
+    np.multiply(2.3 / (rw * (wd - hd)), K, out=K)
     
     # Square the term and multiply by 20
-    K = 20 * (term ** 2)
+    np.square(K, out=K)
+    np.multiply(20, K, out=K)
     
-    return K
+    return _scalar_or_array(K)
 
 
+@precision_policy
 def timur(
     phi: Annotated[np.array, "Porosity"],
-    sw: Annotated[np.array, "Water saturation"]
+    sw: Annotated[np.array, "Water saturation"],
+    out: Annotated[np.array, "Output array"] = None,
     ) -> np.array:
     """
     Estimate permeability using the empirical method of :footcite:t:`timur1968`, (:footcite:t:`mohaghegh1997`).
@@ -61,6 +77,10 @@ def timur(
         Porosity (fraction).
     sw : array_like
         Water saturation (fraction).
+    out : array_like, optional
+        Array where the result is stored. It must have the broadcast shape of
+        the inputs and must not overlap them. Repeated calls with the same
+        `out` do not allocate.
 
     Returns
     -------
@@ -68,14 +88,22 @@ def timur(
         Estimated permeability (mD) from the Timur empirical relation.
     """
 
-    return (93 * (phi ** 2.2) / (sw)) ** 2
+    K = _output_array(out, phi, sw)
+    np.power(phi, 2.2, out=K)
+    np.multiply(93, K, out=K)
+    np.divide(K, sw, out=K)
+    np.square(K, out=K)
 
+    return _scalar_or_array(K)
 
+
+@precision_policy
 def coates_dumanoir(
     resd: Annotated[np.array, "Deep resistivity"],
     phi: Annotated[np.array, "Porosity"],
     hd: Annotated[float, "Hidrocarbon density"] = 0.8,
     rw: Annotated[float, "Water-saturated formation resistivity"]=0.02,
+    out: Annotated[np.array, "Output array"] = None,
     ) -> np.ndarray:
     """
     Estimate permeability using the empirical method of Coates and Dumanoir equation (:footcite:t:`dumoir1973,mohaghegh1997`).
@@ -90,6 +118,10 @@ def coates_dumanoir(
         Hidrocarbon density in g/cm3 (standard for 0.8 as crude oil).
     rw : float, optional
         Formation water resistivity in ohm.m (standard for 0.02).
+    out : array_like, optional
+        Array where the result is stored. It must have the broadcast shape of
+        the inputs and must not overlap them. Repeated calls with the same
+        `out` do not allocate.
 
     Returns
     -------
@@ -98,16 +130,33 @@ def coates_dumanoir(
     """
     # Calculating C constant
     c = 23 + 465 * hd - 188 * hd*hd
-    
-    # Calculating W constant
-    w = np.sqrt((((np.log10(rw / resd) + 2.2) ** 2) / 2.0) + (3.75 - phi))
 
-    # Final permeability
-    return ((c * phi ** (2 * w))/((w ** 4) * (rw / resd))) ** 2
+    K = _output_array(out, resd, phi, hd, rw)
+    w = _scratch(K, 0)
+    ratio = _scratch(K, 1)
+    np.divide(rw, resd, out=ratio)
 
+    # Calculating W**2 = (log10(rw/resd) + 2.2)**2 / 2 + 3.75 - phi
+    _dumanoir_w2(ratio, phi, out=w, tmp=K)
+
+    # K = (c * phi**(2*W) / (W**4 * rw/resd))**2, with W**4 = (W**2)**2
+    np.sqrt(w, out=K)
+    np.multiply(2, K, out=K)
+    np.power(phi, K, out=K)
+    np.multiply(c, K, out=K)
+    np.square(w, out=w)
+    np.multiply(w, ratio, out=w)
+    np.divide(K, w, out=K)
+    np.square(K, out=K)
+
+    return _scalar_or_array(K)
+
+
+@precision_policy
 def coates(
     phi: Annotated[np.array, "Porosity"],
-    sw: Annotated[np.array, "Water saturation"]
+    sw: Annotated[np.array, "Water saturation"],
+    out: Annotated[np.array, "Output array"] = None,
     ) -> np.array:
     """
     Estimate permeability using the empirical method of Coates (:footcite:t:`mohaghegh1997,schlumberger2013`).
@@ -118,24 +167,437 @@ def coates(
         Porosity (fraction).
     sw : array_like
         Water saturation (fraction).
-        
+    out : array_like, optional
+        Array where the result is stored. It must have the broadcast shape of
+        the inputs and must not overlap them. Repeated calls with the same
+        `out` do not allocate.
+
     Returns
     -------
     k : array_like
         Estimated permeability (mD) from the Timur empirical relation.
     """
 
-    phi = np.asarray(phi, dtype=float)
-    swirr = np.asarray(sw, dtype=float)
+    phi = float_array(phi)
+    swirr = float_array(sw)
 
     # Basic validity checks
-    if np.any(phi <= 0) or np.any(phi >= 1):
-        print("phi must be in (0, 1) as a fraction.")
-    if np.any(swirr <= 0) or np.any(swirr >= 1):
-        print("swirr must be in (0, 1) as a fraction.")
+    check_range("coates", "phi must be in (0, 1) as a fraction", phi, lower=0.0, upper=1.0, closed=False)
+    check_range("coates", "swirr must be in (0, 1) as a fraction", swirr, lower=0.0, upper=1.0, closed=False)
+
+    K = _output_array(out, phi, swirr)
+    tmp = _scratch(K)
+
+    # 100 * phi**2 * (1 - swirr) / swirr
+    np.square(phi, out=K)
+    np.multiply(100, K, out=K)
+    np.subtract(1, swirr, out=tmp)
+    np.multiply(K, tmp, out=K)
+    np.divide(K, swirr, out=K)
+    np.square(K, out=K)
+
+    return _scalar_or_array(K)
+
+
+@precision_policy
+def tixier_derivatives(
+    resd: Annotated[np.array, "Deep resistivity"],
+    ress: Annotated[np.array, "Shallow resistivity"],
+    rw: Annotated[float, "Water-saturated formation resistivity"]=0.02,
+    wd: Annotated[float, "Density of formation water"]=1.10,
+    hd: Annotated[float, "Density of formation oil"]=0.8,
+    inzone: Annotated[float, "Invasion radius"]=0.75,
+    ) -> dict:
+    """
+    Partial derivatives of :func:`tixier`.
+
+    Parameters
+    ----------
+    resd : array_like
+        Deep resistivity in ohm.m.
+    ress : array_like
+        Shallow resistivity in ohm.m.
+    rw : float, optional
+        Water-saturated formation resistivity in ohm.m.
+    wd : float, optional
+        Density of formation water in g/cm3.
+    hd : float, optional
+        Density of formation in g/cm3.
+    inzone : array_like, float, optional
+        Invasion radius or change in depth in meters.
+
+    Returns
+    -------
+    derivatives : dict
+        Partial derivatives of the permeability keyed by argument name.
+    """
+    resd, ress = np.asarray(resd), np.asarray(ress)
+    # K = 20 * term**2, with term = 2.3 / (rw * (wd - hd)) * (resd - ress) / inzone
+    coef = 2.3 / (rw * (wd - hd))
+    term = coef * ((resd - ress) / inzone)
+    dterm = 40 * term
+    return {
+        "resd": dterm * coef / inzone,
+        "ress": -dterm * coef / inzone,
+        "rw": dterm * -term / rw,
+        "wd": dterm * -term / (wd - hd),
+        "hd": dterm * term / (wd - hd),
+        "inzone": dterm * -term / inzone,
+    }
+
+
+@precision_policy
+def timur_derivatives(
+    phi: Annotated[np.array, "Porosity"],
+    sw: Annotated[np.array, "Water saturation"]
+    ) -> dict:
+    """
+    Partial derivatives of :func:`timur`.
+
+    Parameters
+    ----------
+    phi : array_like
+        Porosity (fraction).
+    sw : array_like
+        Water saturation (fraction).
+
+    Returns
+    -------
+    derivatives : dict
+        Partial derivatives of the permeability keyed by argument name.
+    """
+    phi, sw = np.asarray(phi), np.asarray(sw)
+    K = (93 * (phi ** 2.2) / (sw)) ** 2
+    return {"phi": 4.4 * K / phi, "sw": -2 * K / sw}
+
+
+@precision_policy
+def coates_dumanoir_derivatives(
+    resd: Annotated[np.array, "Deep resistivity"],
+    phi: Annotated[np.array, "Porosity"],
+    hd: Annotated[float, "Hidrocarbon density"] = 0.8,
+    rw: Annotated[float, "Water-saturated formation resistivity"]=0.02,
+    ) -> dict:
+    """
+    Partial derivatives of :func:`coates_dumanoir`.
+
+    Parameters
+    ----------
+    resd : array-like
+        Deep (or True) formation resistivity in ohm.m.
+    phi : array-like
+        Porosity as fraction (m/m).
+    hd : array-like
+        Hidrocarbon density in g/cm3.
+    rw : float, optional
+        Formation water resistivity in ohm.m.
+
+    Returns
+    -------
+    derivatives : dict
+        Partial derivatives of the permeability keyed by argument name.
+    """
+    resd, phi = np.asarray(resd), np.asarray(phi)
+    c = 23 + 465 * hd - 188 * hd*hd
+    u = np.log10(rw / resd) + 2.2
+    w = np.sqrt(((u ** 2) / 2.0) + (3.75 - phi))
+    K = ((c * phi ** (2 * w))/((w ** 4) * (rw / resd))) ** 2
+
+    # d K = K * d(ln K), with ln K = 2 (ln c + 2 w ln phi - 4 ln w - ln rw + ln resd)
+    dw = 2 * (2 * np.log(phi) - 4 / w)   # d ln K / d w
+    du = dw * u / (2 * w)                # d ln K / d u
+    return {
+        "resd": K * (2 / resd - du / (resd * np.log(10))),
+        "phi": K * (4 * w / phi - dw / (2 * w)),
+        "hd": K * 2 * (465 - 376 * hd) / c,
+        "rw": K * (-2 / rw + du / (rw * np.log(10))),
+    }
+
+
+@precision_policy
+def coates_derivatives(
+    phi: Annotated[np.array, "Porosity"],
+    sw: Annotated[np.array, "Water saturation"]
+    ) -> dict:
+    """
+    Partial derivatives of :func:`coates`.
+
+    Parameters
+    ----------
+    phi : array_like
+        Porosity (fraction).
+    sw : array_like
+        Water saturation (fraction).
+
+    Returns
+    -------
+    derivatives : dict
+        Partial derivatives of the permeability keyed by argument name.
+    """
+    phi, swirr = float_array(phi), float_array(sw)
+    K = (100 * phi**2 * (1 - swirr) / swirr)**2
+    return {"phi": 4 * K / phi, "sw": -2 * K / (swirr * (1 - swirr))}
+
+
+_permeability_methods = {
+    "tixier": tixier,
+    "timur": timur,
+    "coates_dumanoir": coates_dumanoir,
+    "coates": coates
+}
+
+_permeability_derivatives = {
+    "tixier": tixier_derivatives,
+    "timur": timur_derivatives,
+    "coates_dumanoir": coates_dumanoir_derivatives,
+    "coates": coates_derivatives
+}
+
+
+# Samples evaluated at once by `permeability_stack` (128 kB per float64 array).
+_STACK_BLOCK = 16384
+
+# logs required by each method
+_permeability_logs = {
+    "tixier": ("resd", "ress"),
+    "timur": ("phi", "sw"),
+    "coates_dumanoir": ("resd", "phi"),
+    "coates": ("phi", "sw")
+}
+
+
+@precision_policy
+def permeability_stack(
+    phi: Annotated[np.array, "Porosity"] = None,
+    sw: Annotated[np.array, "Water saturation"] = None,
+    resd: Annotated[np.array, "Deep resistivity"] = None,
+    ress: Annotated[np.array, "Shallow resistivity"] = None,
+    rw: Annotated[float, "Water-saturated formation resistivity"] = 0.02,
+    wd: Annotated[float, "Density of formation water"] = 1.10,
+    hd: Annotated[float, "Density of formation oil"] = 0.8,
+    inzone: Annotated[float, "Invasion radius"] = 0.75,
+    methods: Annotated[tuple, "Permeability methods"] = ("timur", "coates_dumanoir", "coates"),
+    out: Annotated[np.array, "Output array (may be a np.memmap)"] = None) -> np.array:
+    """Estimate permeability with several methods at once.
+
+    ``ln(phi)`` and ``1/sw`` are computed once and shared by the methods, so
+    the porosity powers of Timur (``phi**2.2``) and Coates-Dumanoir
+    (``phi**(2W)``) cost a single exponential each, and the samples are
+    evaluated in cache-sized blocks so that every method reads the shared
+    terms from cache. The inputs broadcast, e.g. ``(n_realizations,
+    n_samples)`` pseudo-well logs are evaluated for every method without a
+    loop over realizations.
+
+    Parameters
+    ----------
+    phi : array_like, optional
+        Porosity (fraction). Required by 'timur', 'coates_dumanoir' and 'coates'.
+    sw : array_like, optional
+        Water saturation (fraction). Required by 'timur' and 'coates'.
+    resd : array_like, optional
+        Deep resistivity in ohm.m. Required by 'tixier' and 'coates_dumanoir'.
+    ress : array_like, optional
+        Shallow resistivity in ohm.m. Required by 'tixier'.
+    rw : float, optional
+        Formation water resistivity in ohm.m.
+    wd : float, optional
+        Density of formation water in g/cm3 (Tixier).
+    hd : float, optional
+        Hydrocarbon density in g/cm3 (Tixier and Coates-Dumanoir).
+    inzone : float, optional
+        Invasion radius in meters (Tixier).
+    methods : sequence of str, optional
+        Any of 'tixier', 'timur', 'coates_dumanoir' and 'coates'.
+    out : array_like, optional
+        Array with shape ``(len(methods), *shape)`` where the result is
+        stored, `shape` being the broadcast shape of the inputs.
+
+    Returns
+    -------
+    k : array_like
+        Permeability (mD) of each method stacked along the first axis, in the
+        order of `methods`.
+
+    Example
+    -------
+    >>> timur, coates = permeability_stack(phi, sw, methods=("timur", "coates"))
+    """
+    if isinstance(methods, str):
+        methods = (methods,)
+    unknown = [method for method in methods if method not in _permeability_methods]
+    if unknown:
+        raise ValueError(f"Unsupported method '{unknown[0]}'. Choose from: {list(_permeability_methods)}")
+    if not methods:
+        raise ValueError("At least one method must be given")
+
+    inputs = {"phi": phi, "sw": sw, "resd": resd, "ress": ress}
+    for method in methods:
+        for arg in _permeability_logs[method]:
+            if inputs[arg] is None:
+                raise TypeError(f"Missing required argument for method '{method}': '{arg}'")
+    inputs = {name: np.asarray(x) for name, x in inputs.items() if x is not None}
+    params = {"rw": rw, "wd": wd, "hd": hd, "inzone": inzone}
+    shape = np.broadcast_shapes(*(x.shape for x in inputs.values()), *(np.shape(p) for p in params.values()))
+    if out is None:
+        out = np.empty((len(methods),) + shape, dtype=_result_dtype(*inputs.values()))
+    if "coates" in methods:
+        check_range("coates", "phi must be in (0, 1) as a fraction", phi, lower=0.0, upper=1.0, closed=False)
+        check_range("coates", "swirr must be in (0, 1) as a fraction", sw, lower=0.0, upper=1.0, closed=False)
+
+    # the samples are evaluated in blocks small enough for the shared terms
+    # and temporaries of all the methods to stay in cache
+    size = int(np.prod(shape, dtype=np.int64))
+    flat = {name: np.broadcast_to(x, shape).reshape(-1) for name, x in inputs.items()}
+    flat.update({name: np.broadcast_to(x, shape).reshape(-1) for name, x in params.items() if np.ndim(x) > 0})
+    scalars = {name: x for name, x in params.items() if np.ndim(x) == 0}
+    result = out.reshape(len(methods), -1)
+    block = min(_STACK_BLOCK, max(size, 1))
+    work = np.empty((5, block), dtype=out.dtype)
+
+    for start in range(0, size, block):
+        stop = min(start + block, size)
+        view = {name: x[start:stop] for name, x in flat.items()}
+        _permeability_block(methods, **view, **scalars, out=result[:, start:stop],
+                            work=work[:, :stop - start])
+
+    if not np.shares_memory(result, out):
+        out[...] = result.reshape(out.shape)
+    return out
+
+
+def _dumanoir_w2(ratio, phi, out, tmp):
+    """Square of the W exponent of Coates-Dumanoir from rw/resd."""
+    np.log10(ratio, out=out)
+    np.add(out, 2.2, out=out)
+    np.square(out, out=out)
+    np.divide(out, 2.0, out=out)
+    np.subtract(3.75, phi, out=tmp)
+    np.add(out, tmp, out=out)
+    return out
+
+
+def _permeability_block(methods, out, work, phi=None, sw=None, resd=None, ress=None,
+                        rw=0.02, wd=1.10, hd=0.8, inzone=0.75):
+    """Evaluate a block of samples for :func:`permeability_stack`."""
+    ln_phi, inv_sw, ratio, w2, tmp = work
+    if "timur" in methods or "coates_dumanoir" in methods:
+        np.log(phi, out=ln_phi)
+    if "timur" in methods or "coates" in methods:
+        np.divide(1., sw, out=inv_sw)
+
+    for K, method in zip(out, methods):
+        if method == "tixier":
+            # 20 * (2.3 / (rw * (wd - hd)) * (resd - ress) / inzone)**2
+            np.subtract(resd, ress, out=K)
+            np.multiply(K, 2.3 / (rw * (wd - hd) * inzone), out=K)
+            np.square(K, out=K)
+            np.multiply(20, K, out=K)
+
+        elif method == "timur":
+            # (93 * phi**2.2 / sw)**2
+            np.multiply(ln_phi, 2.2, out=K)
+            np.exp(K, out=K)
+            np.multiply(93, K, out=K)
+            np.multiply(K, inv_sw, out=K)
+            np.square(K, out=K)
+
+        elif method == "coates":
+            # (100 * phi**2 * (1 - sw) / sw)**2, with (1 - sw) / sw = 1/sw - 1
+            np.square(phi, out=K)
+            np.multiply(100, K, out=K)
+            np.subtract(inv_sw, 1, out=tmp)
+            np.multiply(K, tmp, out=K)
+            np.square(K, out=K)
+
+        elif method == "coates_dumanoir":
+            # (c * exp(2W ln(phi)) / (W**4 * rw/resd))**2
+            c = 23 + 465 * hd - 188 * hd*hd
+            np.divide(rw, resd, out=ratio)
+            _dumanoir_w2(ratio, phi, out=w2, tmp=tmp)
+            np.sqrt(w2, out=K)
+            np.multiply(K, 2, out=K)
+            np.multiply(K, ln_phi, out=K)
+            np.exp(K, out=K)
+            np.multiply(c, K, out=K)
+            np.square(w2, out=tmp)
+            np.multiply(tmp, ratio, out=tmp)
+            np.divide(K, tmp, out=K)
+            np.square(K, out=K)
+
+
+def permeability(
+    method: Annotated[str, "Chosen permeability method"] = "coates",
+    out: Annotated[np.array, "Output array (may be a np.memmap)"] = None,
+    chunksize: Annotated[int, "Number of samples per chunk"] = None,
+    **kwargs) -> np.array:
+    """Compute permeability from well logs.
+
+    This is a façade for the methods:
+        - tixier: :func:`stoneforge.petrophysics.permeability.tixier`
+        - timur: :func:`stoneforge.petrophysics.permeability.timur`
+        - coates_dumanoir: :func:`stoneforge.petrophysics.permeability.coates_dumanoir`
+        - coates: :func:`stoneforge.petrophysics.permeability.coates`
+
+    Use :func:`permeability_stack` to evaluate several methods in one pass.
+
+    Parameters
+    ----------
+    phi : array_like
+        Porosity (fraction). Required if `method` is "timur",
+        "coates_dumanoir" or "coates".
+    sw : array_like
+        Water saturation (fraction). Required if `method` is "timur" or "coates".
+    resd : array_like
+        Deep resistivity in ohm.m. Required if `method` is "tixier" or
+        "coates_dumanoir".
+    ress : array_like
+        Shallow resistivity in ohm.m. Required if `method` is "tixier".
+    rw, wd, hd, inzone : float, optional
+        Parameters of "tixier" (`rw`, `wd`, `hd`, `inzone`) and
+        "coates_dumanoir" (`rw`, `hd`). The defaults of the method are used
+        when not given.
+    method : str, optional
+        Name of the method to be used.  Should be one of
+            - 'tixier'
+            - 'timur'
+            - 'coates_dumanoir'
+            - 'coates'
+
+        If not given, default method is 'coates'
+    out : array_like, optional
+        Array where the result is written, e.g. a ``np.memmap``. When `out`
+        or `chunksize` is given the logs are evaluated in chunks (see
+        :func:`stoneforge.petrophysics.helpers.chunked_apply`).
+    chunksize : int, optional
+        Number of depth samples evaluated at once.
+
+    Returns
+    -------
+    k : array_like
+        Permeability log (mD) using the defined method.
+    """
+    if method not in _permeability_methods:
+        raise ValueError(f"Unsupported method '{method}'. Choose from: {list(_permeability_methods)}")
+
+    options = {}
+    optional = []
+    if method == "tixier":
+        optional = ["rw", "wd", "hd", "inzone"]
+    elif method == "coates_dumanoir":
+        optional = ["hd", "rw"]
+
+    for arg in _permeability_logs[method]:
+        if arg not in kwargs:
+            msg = f"Missing required argument for method '{method}': '{arg}'"
+            raise TypeError(msg)
+        options[arg] = kwargs[arg]
+    for arg in optional:
+        if arg in kwargs:
+            options[arg] = kwargs[arg]
+
+    fun = _permeability_methods[method]
 
-    numerator = 100 * phi**2 * (1 - swirr)
-    term = numerator / swirr
-    K = term**2
+    if out is None and chunksize is None:
+        return fun(**options)
 
-    return K
\ No newline at end of file
+    return chunked_apply(fun, out=out, chunksize=chunksize, **options)
@@ -2,17 +2,33 @@
 
 import numpy as np
 from typing import Annotated
-import warnings
-from .helpers import correct_petrophysic_estimation_range
+from .helpers import correct_petrophysic_estimation_range, chunked_apply, _output_array, _scalar_or_array, _scratch, _clipped_derivatives
+from ..precision import precision_policy
+from ..validation import check, check_range
 
 #References
 #---------- 
 #.. bibliography::
 
+def _divide_or_nan(function, phi, denominator):
+    """Divide `phi` in place, setting NaN where the denominator is zero."""
+    zero = denominator == 0
+    if not np.any(zero):
+        return np.divide(phi, denominator, out=phi)
+
+    check(function, "This will result in a division by zero", zero)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.divide(phi, denominator, out=phi)
+    np.copyto(phi, np.nan, where=zero)
+    return phi
+
+
+@precision_policy
 def effective_porosity(
     phi: Annotated[np.array, "Porosity log"],
     vsh: Annotated[np.array, "Shale volume"],
-    phi_sh: Annotated[float, "Apparent porosity in shales"] = 0.05) -> np.array:
+    phi_sh: Annotated[float, "Apparent porosity in shales"] = 0.05,
+    out: Annotated[np.array, "Output array"] = None) -> np.array:
     """Calculate the effective porosity from the total porosity and shale volume (:footcite:t:`schon1998physical`).
 
     Parameters
@@ -23,6 +39,10 @@ def effective_porosity(
         Shale volume
     phi_sh : float
         Apparent porosity in shales
+    out : array_like, optional
+        Array where the result is stored. It must have the broadcast shape of
+        the inputs and must not overlap them. Repeated calls with the same
+        `out` do not allocate.
 
     Returns
     -------
@@ -30,15 +50,19 @@ def effective_porosity(
         Effective porosity for the aimed interval (more suitable for the bulk density porosity)
     """
     
-    phie = phi - (vsh * phi_sh)
-    phie = correct_petrophysic_estimation_range(phie)
-    return phie
+    phie = _output_array(out, phi, vsh, phi_sh)
+    np.multiply(vsh, phi_sh, out=phie)
+    np.subtract(phi, phie, out=phie)
+    correct_petrophysic_estimation_range(phie, out=phie)
+    return _scalar_or_array(phie)
 
 
+@precision_policy
 def density_porosity(
     rhob: Annotated[np.array, "Bulk density log"],
     rhom: Annotated[float, "Matrix density"] = 2.65,
-    rhof: Annotated[float, "Fluid density"]= 1.10) -> np.array:
+    rhof: Annotated[float, "Fluid density"]= 1.10,
+    out: Annotated[np.array, "Output array"] = None) -> np.array:
     
     """Estimate the porosity from the bulk density log (:footcite:t:`schon1998physical`). rw: Annotated[float, "Water resistivity"]
 
@@ -50,40 +74,35 @@ def density_porosity(
         Matrix density.
     rhof : float
         Density of the fluid saturating the rock (Usually 1.0 for water and 1.1 for saltwater mud).
-       
+    out : array_like, optional
+        Array where the result is stored. It must have the broadcast shape of
+        the inputs and must not overlap them. Repeated calls with the same
+        `out` do not allocate.
+
     Returns
     -------
     phid : array_like
         Total porosity based on bulk density.
 
     """
-    if rhom == rhof:
-        warnings.warn(UserWarning("This will result in a division by zero"))
-
-        return np.nan
-
-    elif rhom <= rhof:
-        warnings.warn(UserWarning("rhom must be greater than rhof and rhob"))
+    check("density_porosity", "rhom must be greater than rhof and rhob", np.less(rhom, rhof))
 
-        phi = (rhom - rhob) / (rhom - rhof)
+    phi = _output_array(out, rhob, rhom, rhof)
+    np.subtract(rhom, rhob, out=phi)
+    phi = _divide_or_nan("density_porosity", phi, np.subtract(rhom, rhof))
 
-    elif np.any((rhom - rhob) > (rhom - rhof)):
-        warnings.warn(UserWarning("rhob value is lower than rhof"))
-
-        phi = (rhom - rhob) / (rhom - rhof)
-
-    else: 
-        phi = (rhom - rhob) / (rhom - rhof)
-
-
-    phi = correct_petrophysic_estimation_range(phi)
-    return phi
+    # rhob < rhof is the only way to get phi > 1
+    check_range("density_porosity", "rhob value is lower than rhof", phi, upper=1.0)
+    correct_petrophysic_estimation_range(phi, out=phi)
+    return _scalar_or_array(phi)
 
 
+@precision_policy
 def neutron_porosity(
     nphi: Annotated[np.array, "Neutron porosity log"],
     vsh: Annotated[np.array, "Shale volume"],
-    phish: Annotated[float, "Apparent porosity in shales"] = 0.480) -> np.array:
+    phish: Annotated[float, "Apparent porosity in shales"] = 0.480,
+    out: Annotated[np.array, "Output array"] = None) -> np.array:
     """Estimate the effective porosity from the neutron log (:footcite:t:`schon1998physical`).
 
     Parameters
@@ -94,6 +113,10 @@ def neutron_porosity(
         Total volume of shale in the rock, chosen the most representative.
     phi_nsh : int, float
         Apparent porosity read in the shales on and under the layer under study and with the same values used in φN.
+    out : array_like, optional
+        Array where the result is stored. It must have the broadcast shape of
+        the inputs and must not overlap them. Repeated calls with the same
+        `out` do not allocate.
 
     Returns
     -------
@@ -101,25 +124,22 @@ def neutron_porosity(
         Effective porosity from the neutron log for the aimed interval.
 
     """
-    if np.any(nphi < (vsh * phish)):
-        warnings.warn(UserWarning("phin must be a positive value"))
-        phin = nphi - (vsh * phish)
-    
-    elif np.any(nphi - (vsh * phish) > 1):
-        warnings.warn(UserWarning("phin must be a value between 0 and 1"))
-        phin = nphi - (vsh * phish)
+    phin = _output_array(out, nphi, vsh, phish)
+    np.multiply(vsh, phish, out=phin)
+    np.subtract(nphi, phin, out=phin)
 
-    else:
-        phin = nphi - (vsh * phish)
+    check_range("neutron_porosity", "phin must be a value between 0 and 1", phin, lower=0.0, upper=1.0)
 
-    phin = correct_petrophysic_estimation_range(phin)
-    return phin
+    correct_petrophysic_estimation_range(phin, out=phin)
+    return _scalar_or_array(phin)
 
 
+@precision_policy
 def neutron_density_porosity(
     phid: Annotated[np.array, "Porosity from density log"],
     phin: Annotated[np.array, "Porosity from neutron log"],
-    squared: Annotated[bool, "Main operation"]=False) -> np.array:
+    squared: Annotated[bool, "Main operation"]=False,
+    out: Annotated[np.array, "Output array"] = None) -> np.array:
     """Estimate the effective porosity by calculating the mean of Bulk Density porosity and Neutron porosity (:footcite:t:`schon1998physical`).
 
     Parameters
@@ -131,6 +151,10 @@ def neutron_density_porosity(
     squared : bool, optional
         If True, the porosity is calculated using the square root of the mean of the squares of the two porosities.
         If False, the porosity is calculated using the mean of the two porosities. Default is False.
+    out : array_like, optional
+        Array where the result is stored. It must have the broadcast shape of
+        the inputs and must not overlap them. Repeated calls with the same
+        `out` do not allocate.
 
     Returns
     -------
@@ -138,26 +162,29 @@ def neutron_density_porosity(
         Effective porosity from the Bulk Density porosity and Neutron porosity mean.
 
     """
+    phi = _output_array(out, phid, phin)
     if squared == False:
-        if np.any((phid + phin / 2) > 1):
-            warnings.warn(UserWarning("phi must be a value between 0 and 1"))
-            phi = (phid + phin) / 2
-        else:
-            phi = (phid + phin) / 2
+        np.add(phid, phin, out=phi)
+        np.divide(phi, 2, out=phi)
     elif squared == True:
-        if np.any((phid**2 + phin**2 / 2) > 1):
-            warnings.warn(UserWarning("phi must be a value between 0 and 1"))
-            phi = np.sqrt( (phid**2 + phin**2) / 2)
-        else:
-            phi = np.sqrt( (phid**2 + phin**2) / 2)
-    phi = correct_petrophysic_estimation_range(phi)
-    return phi
+        squares = _scratch(phi)
+        np.multiply(phid, phid, out=phi)
+        np.multiply(phin, phin, out=squares)
+        np.add(phi, squares, out=phi)
+        np.divide(phi, 2, out=phi)
+        np.sqrt(phi, out=phi)
+
+    check_range("neutron_density_porosity", "phi must be a value between 0 and 1", phi, upper=1.0)
+    correct_petrophysic_estimation_range(phi, out=phi)
+    return _scalar_or_array(phi)
 
 
+@precision_policy
 def sonic_porosity(
     dt: Annotated[np.array, "Sonic log"],
     dtma: Annotated[np.array, "Matrix transit time"] = 55.5,
-    dtf: Annotated[np.array, "Fluid transit time"] = 175) -> np.array:
+    dtf: Annotated[np.array, "Fluid transit time"] = 175,
+    out: Annotated[np.array, "Output array"] = None) -> np.array:
     
     """Estimate the Porosity from sonic using the :footcite:t:`wyllie1956` time-average equation.
 
@@ -169,6 +196,10 @@ def sonic_porosity(
         Acoustic transit time of the matrix (μsec/ft)
     dtf : int, float
         Acoustic transit time of the fluids, usually water (μsec/ft)
+    out : array_like, optional
+        Array where the result is stored. It must have the broadcast shape of
+        the inputs and must not overlap them. Repeated calls with the same
+        `out` do not allocate.
               
     Returns
     -------
@@ -176,28 +207,22 @@ def sonic_porosity(
         Porosity from sonic.
 
     """
-    if dtf == dtma:
-        warnings.warn(UserWarning("This will result in a division by zero"))
-        return np.nan
-
-    elif np.any(dt <= dtma) or dtf <= dtma:
-        warnings.warn(UserWarning("dt and dtf must be greater than dtma"))
-        phidt = (dt - dtma) / (dtf - dtma)
+    check("sonic_porosity", "dtf must be greater than dtma", np.less(dtf, dtma))
 
-    elif np.any(dt - dtma > dtf - dtma):
-        warnings.warn(UserWarning("dt value is greather than dtf"))
-        phidt = (dt - dtma) / (dtf - dtma)
+    phidt = _output_array(out, dt, dtma, dtf)
+    np.subtract(dt, dtma, out=phidt)
+    phidt = _divide_or_nan("sonic_porosity", phidt, np.subtract(dtf, dtma))
 
-    else:
-        phidt = (dt - dtma) / (dtf - dtma)
-        
-    phidt = correct_petrophysic_estimation_range(phidt)
-    return phidt
+    check_range("sonic_porosity", "dt must be between dtma and dtf", phidt, lower=0.0, upper=1.0)
+    correct_petrophysic_estimation_range(phidt, out=phidt)
+    return _scalar_or_array(phidt)
 
 # TODO: change eventually to gaymard_poupon porosity to adress proper reference
+@precision_policy
 def gaymard_porosity( 
     phid: Annotated[np.array, "Porosity from density log"],
-    phin: Annotated[np.array, "Porosity from neutron log"]) -> np.array:
+    phin: Annotated[np.array, "Porosity from neutron log"],
+    out: Annotated[np.array, "Output array"] = None) -> np.array:
     
     """Estimate the effective porosity using :footcite:t:`gaymardpoupon1968` method.
 
@@ -207,6 +232,10 @@ def gaymard_porosity(
         Density porosity (porosity calculated using density log)
     phin : int, float
         Neutron porosity (porosity calculated using neutron log)
+    out : array_like, optional
+        Array where the result is stored. It must have the broadcast shape of
+        the inputs and must not overlap them. Repeated calls with the same
+        `out` do not allocate.
 
     Returns
     -------
@@ -214,10 +243,204 @@ def gaymard_porosity(
         Effective porosity using Gaymard-Poupon method
 
     """
-    phie = (0.5 * (phid*phid + phin*phin)) ** 0.5
+    phie = _output_array(out, phid, phin)
+    squares = _scratch(phie)
+    np.multiply(phid, phid, out=phie)
+    np.multiply(phin, phin, out=squares)
+    np.add(phie, squares, out=phie)
+    np.multiply(phie, 0.5, out=phie)
+    np.power(phie, 0.5, out=phie)
+
+    correct_petrophysic_estimation_range(phie, out=phie)
+    return _scalar_or_array(phie)
+
+
+@precision_policy
+def effective_porosity_derivatives(
+    phi: Annotated[np.array, "Porosity log"],
+    vsh: Annotated[np.array, "Shale volume"],
+    phi_sh: Annotated[float, "Apparent porosity in shales"] = 0.05) -> dict:
+    """Partial derivatives of :func:`effective_porosity`.
+
+    Parameters
+    ----------
+    phi : array_like
+        Total porosity log.
+    vsh : array_like
+        Shale volume log.
+    phi_sh : float
+        Apparent porosity in shales.
+
+    Returns
+    -------
+    derivatives : dict
+        Partial derivatives keyed by argument name. They are zero where the
+        porosity is clipped to [0, 1].
+    """
+    phi, vsh = np.asarray(phi), np.asarray(vsh)
+    raw = phi - vsh * phi_sh
+    derivatives = {
+        "phi": np.ones_like(raw),
+        "vsh": -phi_sh * np.ones_like(raw),
+        "phi_sh": -vsh * np.ones_like(raw),
+    }
+    return _clipped_derivatives(raw, derivatives)
+
+
+@precision_policy
+def density_porosity_derivatives(
+    rhob: Annotated[np.array, "Bulk density log"],
+    rhom: Annotated[float, "Matrix density"] = 2.65,
+    rhof: Annotated[float, "Fluid density"] = 1.10) -> dict:
+    """Partial derivatives of :func:`density_porosity`.
+
+    Parameters
+    ----------
+    rhob : array_like
+        Bulk density log.
+    rhom : float
+        Matrix density.
+    rhof : float
+        Density of the fluid saturating the rock.
+
+    Returns
+    -------
+    derivatives : dict
+        Partial derivatives keyed by argument name. They are zero where the
+        porosity is clipped to [0, 1].
+    """
+    rhob = np.asarray(rhob)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d = np.subtract(rhom, rhof)
+        raw = (rhom - rhob) / d
+        derivatives = {
+            "rhob": -1 / d * np.ones_like(raw),
+            "rhom": (rhob - rhof) / d**2,
+            "rhof": raw / d,
+        }
+    return _clipped_derivatives(raw, derivatives)
+
+
+@precision_policy
+def neutron_porosity_derivatives(
+    nphi: Annotated[np.array, "Neutron porosity log"],
+    vsh: Annotated[np.array, "Shale volume"],
+    phish: Annotated[float, "Apparent porosity in shales"] = 0.480) -> dict:
+    """Partial derivatives of :func:`neutron_porosity`.
+
+    Parameters
+    ----------
+    nphi : array_like
+        Neutron porosity log.
+    vsh : array_like
+        Shale volume log.
+    phish : float
+        Apparent porosity in shales.
+
+    Returns
+    -------
+    derivatives : dict
+        Partial derivatives keyed by argument name. They are zero where the
+        porosity is clipped to [0, 1].
+    """
+    nphi, vsh = np.asarray(nphi), np.asarray(vsh)
+    raw = nphi - vsh * phish
+    derivatives = {
+        "nphi": np.ones_like(raw),
+        "vsh": -phish * np.ones_like(raw),
+        "phish": -vsh * np.ones_like(raw),
+    }
+    return _clipped_derivatives(raw, derivatives)
+
+
+@precision_policy
+def neutron_density_porosity_derivatives(
+    phid: Annotated[np.array, "Porosity from density log"],
+    phin: Annotated[np.array, "Porosity from neutron log"],
+    squared: Annotated[bool, "Main operation"] = False) -> dict:
+    """Partial derivatives of :func:`neutron_density_porosity`.
+
+    Parameters
+    ----------
+    phid : array_like
+        Porosity from the density log.
+    phin : array_like
+        Porosity from the neutron log.
+    squared : bool, optional
+        Whether the root mean square is used instead of the mean.
+
+    Returns
+    -------
+    derivatives : dict
+        Partial derivatives keyed by argument name. They are zero where the
+        porosity is clipped to [0, 1].
+    """
+    phid, phin = np.asarray(phid), np.asarray(phin)
+    if squared:
+        return gaymard_porosity_derivatives(phid, phin)
+    raw = (phid + phin) / 2
+    derivatives = {"phid": np.full_like(raw, 0.5), "phin": np.full_like(raw, 0.5)}
+    return _clipped_derivatives(raw, derivatives)
 
-    phie = correct_petrophysic_estimation_range(phie)
-    return phie
+
+@precision_policy
+def sonic_porosity_derivatives(
+    dt: Annotated[np.array, "Sonic log"],
+    dtma: Annotated[np.array, "Matrix transit time"] = 55.5,
+    dtf: Annotated[np.array, "Fluid transit time"] = 175) -> dict:
+    """Partial derivatives of :func:`sonic_porosity`.
+
+    Parameters
+    ----------
+    dt : array_like
+        Sonic log reading (μsec/ft).
+    dtma : int, float
+        Acoustic transit time of the matrix (μsec/ft).
+    dtf : int, float
+        Acoustic transit time of the fluids (μsec/ft).
+
+    Returns
+    -------
+    derivatives : dict
+        Partial derivatives keyed by argument name. They are zero where the
+        porosity is clipped to [0, 1].
+    """
+    dt = np.asarray(dt)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d = np.subtract(dtf, dtma)
+        raw = (dt - dtma) / d
+        derivatives = {
+            "dt": 1 / d * np.ones_like(raw),
+            "dtma": (dt - dtf) / d**2,
+            "dtf": -raw / d,
+        }
+    return _clipped_derivatives(raw, derivatives)
+
+
+@precision_policy
+def gaymard_porosity_derivatives(
+    phid: Annotated[np.array, "Porosity from density log"],
+    phin: Annotated[np.array, "Porosity from neutron log"]) -> dict:
+    """Partial derivatives of :func:`gaymard_porosity`.
+
+    Parameters
+    ----------
+    phid : array_like
+        Density porosity.
+    phin : array_like
+        Neutron porosity.
+
+    Returns
+    -------
+    derivatives : dict
+        Partial derivatives keyed by argument name. They are zero where the
+        porosity is clipped to [0, 1].
+    """
+    phid, phin = np.asarray(phid), np.asarray(phin)
+    raw = np.sqrt((phid**2 + phin**2) / 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        derivatives = {"phid": phid / (2 * raw), "phin": phin / (2 * raw)}
+    return _clipped_derivatives(raw, derivatives)
 
 
 _porosity_methods = {
@@ -229,8 +452,20 @@ _porosity_methods = {
     "effective": effective_porosity
 }
 
+_porosity_derivatives = {
+    "density": density_porosity_derivatives,
+    "neutron": neutron_porosity_derivatives,
+    "neutron-density": neutron_density_porosity_derivatives,
+    "sonic": sonic_porosity_derivatives,
+    "gaymard": gaymard_porosity_derivatives,
+    "effective": effective_porosity_derivatives
+}
+
 def porosity(
-    method: Annotated[str, "Chosen porosity method"] = "density", **kwargs) -> np.array:
+    method: Annotated[str, "Chosen porosity method"] = "density",
+    out: Annotated[np.array, "Output array (may be a np.memmap)"] = None,
+    chunksize: Annotated[int, "Number of samples per chunk"] = None,
+    **kwargs) -> np.array:
     """Compute porosity from well logs.
 
     This is a façade for the methods:
@@ -241,6 +476,10 @@ def porosity(
         - gaymard: :func:`stoneforge.petrophysics.porosity.gaymard_porosity`
         - effective: :func:`stoneforge.petrophysics.porosity.effective_porosity`
 
+    Matrix and fluid parameters may also be given as per-sample arrays
+    (e.g. from :meth:`stoneforge.preprocessing.zone_table.expand`) that
+    broadcast against the logs.
+
     Parameters
     ----------
     rhob : array_like
@@ -267,6 +506,8 @@ def porosity(
         Neutron porosity (porosity calculated using neutron log). Required if `method` is "neutron-density" or "gaymard.
     phi : int, float
         Total porisity. Required if `method` is "effective".
+    phi_sh : int, float, array_like, optional
+        Apparent porosity in shales. Used if `method` is "effective" (default 0.05).
     method : str, optional
         Name of the method to be used.  Should be one of
         
@@ -278,6 +519,12 @@ def porosity(
             - 'effective'
             
         If not given, default method is 'density'
+    out : array_like, optional
+        Array where the result is written, e.g. a ``np.memmap``. When `out`
+        or `chunksize` is given the logs are evaluated in chunks (see
+        :func:`stoneforge.petrophysics.helpers.chunked_apply`).
+    chunksize : int, optional
+        Number of depth samples evaluated at once.
 
     Returns
     -------
@@ -288,6 +535,7 @@ def porosity(
     options = {}
 
     required = []
+    optional = []
     if method == "density":
         required = ["rhob", "rhom", "rhof"]
     elif method == "neutron":
@@ -300,13 +548,20 @@ def porosity(
         required = ["phid", "phin"]
     elif method == "effective":
         required = ["phi", "vsh"]
+        optional = ["phi_sh"]
 
     for arg in required:
         if arg not in kwargs:
             msg = f"Missing required argument for method '{method}': '{arg}'"
             raise TypeError(msg)
         options[arg] = kwargs[arg]
+    for arg in optional:
+        if arg in kwargs:
+            options[arg] = kwargs[arg]
 
     fun = _porosity_methods[method]
 
-    return fun(**options)
+    if out is None and chunksize is None:
+        return fun(**options)
+
+    return chunked_apply(fun, out=out, chunksize=chunksize, **options)
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+from typing import Annotated, Callable
+
+from . import porosity, shale_volume, water_saturation, permeability
+
+# Kernels and their derivatives registered next to each façade.
+_registries = [
+    (porosity._porosity_methods, porosity._porosity_derivatives),
+    (shale_volume._vshale_methods, shale_volume._vshale_derivatives),
+    (water_saturation._sw_methods, water_saturation._sw_derivatives),
+    (permeability._permeability_methods, permeability._permeability_derivatives),
+]
+
+# keyed by the kernel name and by the method name of its façade
+_derivative_methods = {
+    "gammarayindex": (shale_volume.gammarayindex, shale_volume.gammarayindex_derivatives),
+}
+for _methods, _derivatives in _registries:
+    for _method, _derivative in _derivatives.items():
+        _kernel = _methods[_method]
+        _derivative_methods[_kernel.__name__] = _derivative_methods[_method] = (_kernel, _derivative)
+
+
+def propagate(
+    function: Annotated[Callable, "Petrophysics function or its name"],
+    std: Annotated[dict, "Standard deviation of each uncertain argument"],
+    correlation: Annotated[dict, "Correlation coefficient of pairs of arguments"] = None,
+    **kwargs) -> dict:
+    """First-order (linearised) propagation of uncertainties through a
+    petrophysics function.
+
+    The output variance is obtained from the analytical partial derivatives
+    of the function, ``var = sum_i (df/dx_i * std_i)**2`` plus the cross
+    terms of correlated arguments, so a single vectorised pass gives the
+    standard deviation curve. The linearisation holds while the standard
+    deviations are small compared to the curvature of the formula; where
+    the output is clipped to [0, 1] its derivatives, and thus its standard
+    deviation, are zero.
+
+    Parameters
+    ----------
+    function : callable or str
+        One of the porosity, shale volume, water saturation or permeability
+        functions (e.g. ``density_porosity`` or ``'density_porosity'``), or
+        the method name of its façade (e.g. ``'density'`` or ``'larionov'``).
+    std : dict
+        Standard deviation of the uncertain arguments, keyed by argument
+        name. Values may be scalars or curves.
+    correlation : dict, optional
+        Correlation coefficients keyed by pairs of argument names, e.g.
+        ``{('rhom', 'rhof'): 0.5}``. Arguments are independent otherwise.
+    **kwargs : dict
+        Arguments of `function`.
+
+    Returns
+    -------
+    propagation : dict
+        A dictionary containing the following keys:
+        - 'value': The function result.
+        - 'std': The standard deviation of the result.
+        - 'contributions': The standard deviation contributed by each argument alone.
+
+    Example
+    -------
+    >>> result = propagate('archie', {'rw': 0.005, 'm': 0.1, 'phi': 0.01}, rt=rt, phi=phi, rw=0.03)
+    >>> sw, sw_std = result['value'], result['std']
+    """
+    name = function if isinstance(function, str) else function.__name__
+    if name not in _derivative_methods:
+        raise ValueError(f"Unsupported function '{name}'. Choose from: {list(_derivative_methods)}")
+    kernel, derivatives = _derivative_methods[name]
+
+    value = kernel(**kwargs)
+    partials = derivatives(**kwargs)
+
+    terms = {}
+    for arg, sigma in std.items():
+        if arg not in partials:
+            raise TypeError(f"'{name}' has no argument '{arg}'")
+        terms[arg] = partials[arg] * sigma
+
+    variance = sum(term**2 for term in terms.values())
+    for (x, y), rho in (correlation or {}).items():
+        if x in terms and y in terms:
+            variance = variance + 2 * rho * terms[x] * terms[y]
+
+    return {
+        "value": value,
+        "std": np.sqrt(np.maximum(variance, 0.0) * np.ones_like(value)),
+        "contributions": {arg: np.abs(term) for arg, term in terms.items()},
+    }
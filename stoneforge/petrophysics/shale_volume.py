@@ -3,12 +3,15 @@
 import numpy as np
 from typing import Annotated
 #from stoneforge.petrophysics.helpers import correct_petrophysic_estimation_range
-from .helpers import correct_petrophysic_estimation_range
+from .helpers import correct_petrophysic_estimation_range, chunked_apply, _output_array, _result_dtype, _scalar_or_array, _scratch, _clipped_derivatives
+from ..precision import precision_policy
 
+@precision_policy
 def gammarayindex(
     gr: Annotated[np.array, "Gamma Ray log"],
     grmin: Annotated[float, "Clean GR value"],
-    grmax: Annotated[float, "hale/clay value"]) -> np.array:
+    grmax: Annotated[float, "hale/clay value"],
+    out: Annotated[np.array, "Output array"] = None) -> np.array:
     """Calculates the gamma ray index :footcite:t:`schon1998physical`.
 
     Parameters
@@ -18,27 +21,90 @@ def gammarayindex(
     grmin : float
         Clean sand GR value.
     grmax : float
-        Shale/clay value. 
+        Shale/clay value.
+    out : array_like, optional
+        Array where the result is stored. It must have the broadcast shape of
+        the inputs and must not overlap them. Repeated calls with the same
+        `out` do not allocate.
 
     Returns
     -------
     igr : array_like
         The gamma ray index varying between 0.0 (clean sand) and 1.0 (shale).
     """
-    if grmin == grmax:
+    if np.any(np.equal(grmin, grmax)):
         msg = "Division by zero. The value of grmin is equal to the value of grmax."
         raise ZeroDivisionError(msg)
 
-    igr = (gr - grmin) / (grmax - grmin)
-    igr = np.clip(igr, 0.0, 1.0)
-
-    return igr
+    igr = _output_array(out, gr, grmin, grmax)
+    np.subtract(gr, grmin, out=igr)
+    np.divide(igr, grmax - grmin, out=igr)
+    np.clip(igr, 0.0, 1.0, out=igr)
+
+    return _scalar_or_array(igr)
+
+# Shale volume models as functions of the gamma ray index. They write into
+# `out`, which may be `igr` itself.
+
+def _linear_from_igr(igr, out):
+    if out is not igr:
+        np.copyto(out, igr)
+    return out
+
+
+def _larionov_old_from_igr(igr, out):
+    # 0.33 * (2 ** (2 * igr) - 1)
+    np.multiply(igr, 2., out=out)
+    np.exp2(out, out=out)
+    np.subtract(out, 1, out=out)
+    np.multiply(out, 0.33, out=out)
+    return correct_petrophysic_estimation_range(out, out=out)
+
+
+def _larionov_from_igr(igr, out):
+    # 0.083 * (2 ** (3.71 * igr) - 1)
+    np.multiply(igr, 3.71, out=out)
+    np.exp2(out, out=out)
+    np.subtract(out, 1, out=out)
+    np.multiply(out, 0.083, out=out)
+    return correct_petrophysic_estimation_range(out, out=out)
+
+
+def _clavier_from_igr(igr, out):
+    # 1.7 - sqrt(3.38 - (igr + 0.7) ** 2)
+    np.add(igr, 0.7, out=out)
+    np.square(out, out=out)
+    np.subtract(3.38, out, out=out)
+    np.sqrt(out, out=out)
+    np.subtract(1.7, out, out=out)
+    return correct_petrophysic_estimation_range(out, out=out)
+
+
+def _stieber_from_igr(igr, out):
+    # igr / (3 - 2 * igr) written as 1 / (3 / igr - 2), which needs no
+    # second buffer (igr = 0 gives 1 / inf = 0)
+    with np.errstate(divide="ignore"):
+        np.divide(3, igr, out=out)
+    np.subtract(out, 2, out=out)
+    np.divide(1, out, out=out)
+    return correct_petrophysic_estimation_range(out, out=out)
+
+
+_igr_models = {
+    "linear": _linear_from_igr,
+    "larionov": _larionov_from_igr,
+    "larionov_old": _larionov_old_from_igr,
+    "clavier": _clavier_from_igr,
+    "stieber": _stieber_from_igr,
+}
 
 
+@precision_policy
 def vshale_linear(
     gr: Annotated[np.array, "Gamma Ray log"],
     grmin: Annotated[float, "Clean GR value"],
-    grmax: Annotated[float, "hale/clay value"]) -> np.array:
+    grmax: Annotated[float, "hale/clay value"],
+    out: Annotated[np.array, "Output array"] = None) -> np.array:
     """Estimate the shale volume from the linear model :footcite:t:`schon1998physical`.
 
     Parameters
@@ -48,7 +114,11 @@ def vshale_linear(
     grmin : int, float
         Clean sand GR value.
     grmax : int, float
-        Shale/clay value. 
+        Shale/clay value.
+    out : array_like, optional
+        Array where the result is stored. It must have the broadcast shape of
+        the inputs and must not overlap them. Repeated calls with the same
+        `out` do not allocate.
 
     Returns
     -------
@@ -56,16 +126,17 @@ def vshale_linear(
         Shale Volume for the aimed interval using the Linear method.
 
     """ 
-    vshale = gammarayindex(gr, grmin, grmax)
-    vshale = correct_petrophysic_estimation_range(vshale)
+    vshale = gammarayindex(gr, grmin, grmax, out=_output_array(out, gr, grmin, grmax))
   
     return vshale
 
 
+@precision_policy
 def vshale_larionov_old(
     gr: Annotated[np.array, "Gamma Ray log"],
     grmin: Annotated[float, "Clean GR value"],
-    grmax: Annotated[float, "hale/clay value"]) -> np.array:
+    grmax: Annotated[float, "hale/clay value"],
+    out: Annotated[np.array, "Output array"] = None) -> np.array:
     """Estimate the shale volume from the Larionov model for old rocks :footcite:t:`larionov1969borehole, schon1998physical`.
 
     Parameters
@@ -75,7 +146,11 @@ def vshale_larionov_old(
     grmin : int, float
         Clean sand GR value.
     grmax : int, float
-        Shale/clay value.  
+        Shale/clay value.
+    out : array_like, optional
+        Array where the result is stored. It must have the broadcast shape of
+        the inputs and must not overlap them. Repeated calls with the same
+        `out` do not allocate.
 
     Returns
     -------
@@ -83,16 +158,18 @@ def vshale_larionov_old(
         Shale Volume for the aimed interval using the Larionov method.
         
     """
-    igr = gammarayindex(gr, grmin, grmax)
-    vshale = 0.33 * (2. ** (2. * igr) - 1)
-    vshale = correct_petrophysic_estimation_range(vshale)
-    return vshale
+    vshale = _output_array(out, gr, grmin, grmax)
+    gammarayindex(gr, grmin, grmax, out=vshale)
+    _larionov_old_from_igr(vshale, out=vshale)
+    return _scalar_or_array(vshale)
 
 
+@precision_policy
 def vshale_larionov(
     gr: Annotated[np.array, "Gamma Ray log"],
     grmin: Annotated[float, "Clean GR value"],
-    grmax: Annotated[float, "hale/clay value"]) -> np.array:
+    grmax: Annotated[float, "hale/clay value"],
+    out: Annotated[np.array, "Output array"] = None) -> np.array:
     """Estimate the shale volume from the Larionov model for young rocks :footcite:t:`larionov1969borehole, schon1998physical`.
 
     Parameters
@@ -103,23 +180,29 @@ def vshale_larionov(
         Clean sand GR value.
     grmax : int, float
         Shale/clay value.
-         
+    out : array_like, optional
+        Array where the result is stored. It must have the broadcast shape of
+        the inputs and must not overlap them. Repeated calls with the same
+        `out` do not allocate.
+
     Returns
     -------
     vshale : array_like
         Shale Volume for the aimed interval using the Larionov method.
     """
-    igr = gammarayindex(gr, grmin, grmax)
-    vshale = 0.083 * (2 ** (3.71 * igr) - 1)
-    vshale = correct_petrophysic_estimation_range(vshale)
+    vshale = _output_array(out, gr, grmin, grmax)
+    gammarayindex(gr, grmin, grmax, out=vshale)
+    _larionov_from_igr(vshale, out=vshale)
 
-    return vshale
+    return _scalar_or_array(vshale)
 
 
+@precision_policy
 def vshale_clavier(
     gr: Annotated[np.array, "Gamma Ray log"],
     grmin: Annotated[float, "Clean GR value"],
-    grmax: Annotated[float, "hale/clay value"]) -> np.array:
+    grmax: Annotated[float, "hale/clay value"],
+    out: Annotated[np.array, "Output array"] = None) -> np.array:
     """Estimate the shale volume from the Clavier model :footcite:t:`clavier1971, schon1998physical`.
 
     Parameters
@@ -130,23 +213,29 @@ def vshale_clavier(
         Clean sand GR value.
     grmax : int, float
         Shale/clay value.
-         
+    out : array_like, optional
+        Array where the result is stored. It must have the broadcast shape of
+        the inputs and must not overlap them. Repeated calls with the same
+        `out` do not allocate.
+
     Returns
     -------
     vshale : array_like
         Shale Volume for the aimed interval using the Clavier method.
     """
-    igr = gammarayindex(gr, grmin, grmax)
-    vshale = 1.7 - np.sqrt(3.38 - (igr + 0.7) ** 2)
-    vshale = correct_petrophysic_estimation_range(vshale)
+    vshale = _output_array(out, gr, grmin, grmax)
+    gammarayindex(gr, grmin, grmax, out=vshale)
+    _clavier_from_igr(vshale, out=vshale)
 
-    return vshale
+    return _scalar_or_array(vshale)
 
 
+@precision_policy
 def vshale_stieber(
     gr: Annotated[np.array, "Gamma Ray log"],
     grmin: Annotated[float, "Clean GR value"],
-    grmax: Annotated[float, "hale/clay value"]) -> np.array:
+    grmax: Annotated[float, "hale/clay value"],
+    out: Annotated[np.array, "Output array"] = None) -> np.array:
     """Estimate the shale volume from the Stieber model :footcite:t:`stieber1970, schon1998physical`.
 
     Parameters
@@ -157,20 +246,85 @@ def vshale_stieber(
         Clean sand GR value.
     grmax : int, float
         Shale/clay value.
-         
+    out : array_like, optional
+        Array where the result is stored. It must have the broadcast shape of
+        the inputs and must not overlap them. Repeated calls with the same
+        `out` do not allocate.
+
     Returns
     -------
     vshale : array_like
         Shale Volume for the aimed interval using the Stieber method.
 
     """
-    igr = gammarayindex(gr, grmin, grmax)
-    vshale = igr / (3 - 2 * igr)
-    vshale = correct_petrophysic_estimation_range(vshale)
+    vshale = _output_array(out, gr, grmin, grmax)
+    gammarayindex(gr, grmin, grmax, out=vshale)
+    _stieber_from_igr(vshale, out=vshale)
 
-    return vshale
+    return _scalar_or_array(vshale)
+
+
+@precision_policy
+def vshale_stack(
+    gr: Annotated[np.array, "Gamma Ray log"],
+    grmin: Annotated[float, "Clean GR value"],
+    grmax: Annotated[float, "hale/clay value"],
+    methods: Annotated[tuple, "Gamma ray based methods"] = ("linear", "larionov", "larionov_old", "clavier", "stieber"),
+    out: Annotated[np.array, "Output array (may be a np.memmap)"] = None) -> np.array:
+    """Estimate the shale volume with several gamma ray methods at once.
 
+    The gamma ray index is computed once and shared by all methods, instead
+    of once per :func:`vshale` call.
 
+    Parameters
+    ----------
+    gr : array_like
+        Gamma Ray log.
+    grmin : int, float
+        Clean sand GR value.
+    grmax : int, float
+        Shale/clay value.
+    methods : sequence of str, optional
+        Any of 'linear', 'larionov', 'larionov_old', 'clavier' and
+        'stieber'. Default is all of them.
+    out : array_like, optional
+        Array with shape ``(len(methods), *gr.shape)`` where the result is
+        stored.
+
+    Returns
+    -------
+    vshale : array_like
+        Shale volume of each method stacked along the first axis, in the
+        order of `methods`.
+
+    Example
+    -------
+    >>> linear, stieber = vshale_stack(gr, 20, 150, methods=("linear", "stieber"))
+    """
+    if isinstance(methods, str):
+        methods = (methods,)
+    unknown = [m for m in methods if m not in _igr_models]
+    if unknown:
+        raise ValueError(f"Unsupported method '{unknown[0]}'. Choose from: {list(_igr_models)}")
+
+    if not methods:
+        raise ValueError("At least one method must be given")
+    if out is None:
+        shape = np.broadcast_shapes(np.shape(gr), np.shape(grmin), np.shape(grmax))
+        out = np.empty((len(methods),) + shape, dtype=_result_dtype(gr, grmin, grmax))
+
+    # the gamma ray index is kept in the last row, which is converted in
+    # place once every other method has been evaluated from it
+    igr = out[-1]
+    gammarayindex(gr, grmin, grmax, out=igr)
+    for row, method in zip(out[:-1], methods[:-1]):
+        _igr_models[method](igr, out=row)
+    _igr_models[methods[-1]](igr, out=igr)
+
+    return out
+
+
+@precision_policy
 def vshale_neu_den(
     nphi: Annotated[np.array, "Neutron porosity log"],
     rhob: Annotated[np.array, "Bulk density log"],
@@ -179,7 +333,8 @@ def vshale_neu_den(
     fluid_n: Annotated[float, "fluid neutron point"] = 1.00,
     fluid_d: Annotated[float, "fluid density point"] = 1.10,
     clay_n: Annotated[float, "Clay neutron point"] = 0.47,
-    clay_d: Annotated[float, "Clay density point"] = 2.71) -> np.array:
+    clay_d: Annotated[float, "Clay density point"] = 2.71,
+    out: Annotated[np.array, "Output array"] = None) -> np.array:
     """Estimates the shale volume from neutron and density logs method (three points method) :footcite:t:`passeybhuyan1994`.
 
     Parameters
@@ -200,6 +355,10 @@ def vshale_neu_den(
         Neutron porosity value from clay point (base standard shale).
     clay_d : 2.71, float
         Bulk density value from clay point (base standard shale).
+    out : array_like, optional
+        Array where the result is stored. It must have the broadcast shape of
+        the inputs and must not overlap them. Repeated calls with the same
+        `out` do not allocate.
 
     Returns
     -------
@@ -207,17 +366,26 @@ def vshale_neu_den(
         Shale volume from neutron and density logs method.
 
     """
-    x1 = (fluid_d - clean_d) * (nphi - clean_n)
-    x2 = (rhob - clean_d) * (fluid_n - clean_n)
     x3 = (fluid_d - clean_d) * (clay_n - clean_n)
     x4 = (clay_d - clean_d) * (fluid_n - clean_n)
-    vshale = (x1-x2) / (x3-x4)
-    vshale = correct_petrophysic_estimation_range(vshale)
-    return vshale
-
+    vshale = _output_array(out, nphi, rhob, x3, x4)
+    # x1 = (fluid_d - clean_d) * (nphi - clean_n)
+    np.subtract(nphi, clean_n, out=vshale)
+    np.multiply(vshale, fluid_d - clean_d, out=vshale)
+    # x2 = (rhob - clean_d) * (fluid_n - clean_n)
+    x2 = _scratch(vshale)
+    np.subtract(rhob, clean_d, out=x2)
+    np.multiply(x2, fluid_n - clean_n, out=x2)
+    np.subtract(vshale, x2, out=vshale)
+    np.divide(vshale, x3 - x4, out=vshale)
+    correct_petrophysic_estimation_range(vshale, out=vshale)
+    return _scalar_or_array(vshale)
+
+@precision_policy
 def vshale_nrm(
     phit: Annotated[np.array, "Total porosity log"],
-    phie: Annotated[np.array, "Effective porosity log"]) -> np.array:
+    phie: Annotated[np.array, "Effective porosity log"],
+    out: Annotated[np.array, "Output array"] = None) -> np.array:
     """Estimate the shale volume from NMR curves :footcite:t:`passeybhuyan1994`.
 
     Parameters
@@ -226,17 +394,276 @@ def vshale_nrm(
         Total porosity log from nmr.
     phie : int, float
         Effective porosity log from nmr.
-         
+    out : array_like, optional
+        Array where the result is stored. It must have the broadcast shape of
+        the inputs and must not overlap them. Repeated calls with the same
+        `out` do not allocate.
+
     Returns
     -------
     vshale : array_like
         Shale Volume for the aimed interval using NMR curves.
 
     """
-    cbw = phie - phit
-    vshale = cbw / phit
-    vshale = correct_petrophysic_estimation_range(vshale)
-    return vshale
+    vshale = _output_array(out, phit, phie)
+    # clay bound water (phie - phit) over phit
+    np.subtract(phie, phit, out=vshale)
+    np.divide(vshale, phit, out=vshale)
+    correct_petrophysic_estimation_range(vshale, out=vshale)
+    return _scalar_or_array(vshale)
+
+
+def _igr_derivatives(gr, grmin, grmax):
+    """Gamma ray index and its partial derivatives (zero where it is clipped)."""
+    gr = np.asarray(gr)
+    g = np.subtract(grmax, grmin)
+    raw = (gr - grmin) / g
+    derivatives = {
+        "gr": 1 / g * np.ones_like(raw),
+        "grmin": (gr - grmax) / g**2,
+        "grmax": -raw / g,
+    }
+    return np.clip(raw, 0.0, 1.0), _clipped_derivatives(raw, derivatives)
+
+
+@precision_policy
+def gammarayindex_derivatives(
+    gr: Annotated[np.array, "Gamma Ray log"],
+    grmin: Annotated[float, "Clean GR value"],
+    grmax: Annotated[float, "hale/clay value"]) -> dict:
+    """Partial derivatives of :func:`gammarayindex`.
+
+    Parameters
+    ----------
+    gr : array_like
+        Gamma Ray log.
+    grmin : int, float
+        Clean sand GR value.
+    grmax : int, float
+        Shale/clay value.
+
+    Returns
+    -------
+    derivatives : dict
+        Partial derivatives keyed by argument name. They are zero where the
+        gamma ray index is clipped to [0, 1].
+    """
+    return _igr_derivatives(gr, grmin, grmax)[1]
+
+
+@precision_policy
+def vshale_linear_derivatives(
+    gr: Annotated[np.array, "Gamma Ray log"],
+    grmin: Annotated[float, "Clean GR value"],
+    grmax: Annotated[float, "hale/clay value"]) -> dict:
+    """Partial derivatives of :func:`vshale_linear`.
+
+    Parameters
+    ----------
+    gr : array_like
+        Gamma Ray log.
+    grmin : int, float
+        Clean sand GR value.
+    grmax : int, float
+        Shale/clay value.
+
+    Returns
+    -------
+    derivatives : dict
+        Partial derivatives keyed by argument name. They are zero where the
+        gamma ray index or the shale volume are clipped to [0, 1].
+    """
+    # vshale = igr
+    return _igr_derivatives(gr, grmin, grmax)[1]
+
+
+@precision_policy
+def vshale_larionov_old_derivatives(
+    gr: Annotated[np.array, "Gamma Ray log"],
+    grmin: Annotated[float, "Clean GR value"],
+    grmax: Annotated[float, "hale/clay value"]) -> dict:
+    """Partial derivatives of :func:`vshale_larionov_old`.
+
+    Parameters
+    ----------
+    gr : array_like
+        Gamma Ray log.
+    grmin : int, float
+        Clean sand GR value.
+    grmax : int, float
+        Shale/clay value.
+
+    Returns
+    -------
+    derivatives : dict
+        Partial derivatives keyed by argument name. They are zero where the
+        gamma ray index or the shale volume are clipped to [0, 1].
+    """
+    igr, derivatives = _igr_derivatives(gr, grmin, grmax)
+    vshale = 0.33 * (2**(2 * igr) - 1)
+    dvsh = 0.33 * 2 * np.log(2) * 2**(2 * igr)
+    return _clipped_derivatives(vshale, {k: dvsh * d for k, d in derivatives.items()})
+
+
+@precision_policy
+def vshale_larionov_derivatives(
+    gr: Annotated[np.array, "Gamma Ray log"],
+    grmin: Annotated[float, "Clean GR value"],
+    grmax: Annotated[float, "hale/clay value"]) -> dict:
+    """Partial derivatives of :func:`vshale_larionov`.
+
+    Parameters
+    ----------
+    gr : array_like
+        Gamma Ray log.
+    grmin : int, float
+        Clean sand GR value.
+    grmax : int, float
+        Shale/clay value.
+
+    Returns
+    -------
+    derivatives : dict
+        Partial derivatives keyed by argument name. They are zero where the
+        gamma ray index or the shale volume are clipped to [0, 1].
+    """
+    igr, derivatives = _igr_derivatives(gr, grmin, grmax)
+    vshale = 0.083 * (2**(3.71 * igr) - 1)
+    dvsh = 0.083 * 3.71 * np.log(2) * 2**(3.71 * igr)
+    return _clipped_derivatives(vshale, {k: dvsh * d for k, d in derivatives.items()})
+
+
+@precision_policy
+def vshale_clavier_derivatives(
+    gr: Annotated[np.array, "Gamma Ray log"],
+    grmin: Annotated[float, "Clean GR value"],
+    grmax: Annotated[float, "hale/clay value"]) -> dict:
+    """Partial derivatives of :func:`vshale_clavier`.
+
+    Parameters
+    ----------
+    gr : array_like
+        Gamma Ray log.
+    grmin : int, float
+        Clean sand GR value.
+    grmax : int, float
+        Shale/clay value.
+
+    Returns
+    -------
+    derivatives : dict
+        Partial derivatives keyed by argument name. They are zero where the
+        gamma ray index or the shale volume are clipped to [0, 1].
+    """
+    igr, derivatives = _igr_derivatives(gr, grmin, grmax)
+    vshale = 1.7 - np.sqrt(3.38 - (igr + 0.7)**2)
+    dvsh = (igr + 0.7) / np.sqrt(3.38 - (igr + 0.7)**2)
+    return _clipped_derivatives(vshale, {k: dvsh * d for k, d in derivatives.items()})
+
+
+@precision_policy
+def vshale_stieber_derivatives(
+    gr: Annotated[np.array, "Gamma Ray log"],
+    grmin: Annotated[float, "Clean GR value"],
+    grmax: Annotated[float, "hale/clay value"]) -> dict:
+    """Partial derivatives of :func:`vshale_stieber`.
+
+    Parameters
+    ----------
+    gr : array_like
+        Gamma Ray log.
+    grmin : int, float
+        Clean sand GR value.
+    grmax : int, float
+        Shale/clay value.
+
+    Returns
+    -------
+    derivatives : dict
+        Partial derivatives keyed by argument name. They are zero where the
+        gamma ray index or the shale volume are clipped to [0, 1].
+    """
+    igr, derivatives = _igr_derivatives(gr, grmin, grmax)
+    vshale = igr / (3 - 2 * igr)
+    dvsh = 3 / (3 - 2 * igr)**2
+    return _clipped_derivatives(vshale, {k: dvsh * d for k, d in derivatives.items()})
+
+
+@precision_policy
+def vshale_neu_den_derivatives(
+    nphi: Annotated[np.array, "Neutron porosity log"],
+    rhob: Annotated[np.array, "Bulk density log"],
+    clean_n: Annotated[float, "Clean neutron point"] = -0.15,
+    clean_d: Annotated[float, "Clean density point"] = 2.65,
+    fluid_n: Annotated[float, "fluid neutron point"] = 1.00,
+    fluid_d: Annotated[float, "fluid density point"] = 1.10,
+    clay_n: Annotated[float, "Clay neutron point"] = 0.47,
+    clay_d: Annotated[float, "Clay density point"] = 2.71) -> dict:
+    """Partial derivatives of :func:`vshale_neu_den`.
+
+    Parameters
+    ----------
+    nphi : array_like
+        Neutron porosity log.
+    rhob : array_like
+        Bulk density log.
+    clean_n, clean_d : float
+        Neutron porosity and bulk density of the clean point.
+    fluid_n, fluid_d : float
+        Neutron porosity and bulk density of the fluid point.
+    clay_n, clay_d : float
+        Neutron porosity and bulk density of the clay point.
+
+    Returns
+    -------
+    derivatives : dict
+        Partial derivatives keyed by argument name. They are zero where the
+        shale volume is clipped to [0, 1].
+    """
+    nphi, rhob = np.asarray(nphi), np.asarray(rhob)
+    # vshale = num / den, with num = x1 - x2 and den = x3 - x4
+    num = (fluid_d - clean_d) * (nphi - clean_n) - (rhob - clean_d) * (fluid_n - clean_n)
+    den = (fluid_d - clean_d) * (clay_n - clean_n) - (clay_d - clean_d) * (fluid_n - clean_n)
+    vshale = num / den
+    # (d num, d den) of each argument
+    partials = {
+        "nphi": (fluid_d - clean_d, 0.0),
+        "rhob": (-(fluid_n - clean_n), 0.0),
+        "clean_n": (-(fluid_d - clean_d) + (rhob - clean_d), -(fluid_d - clean_d) + (clay_d - clean_d)),
+        "clean_d": (-(nphi - clean_n) + (fluid_n - clean_n), -(clay_n - clean_n) + (fluid_n - clean_n)),
+        "fluid_n": (-(rhob - clean_d), -(clay_d - clean_d)),
+        "fluid_d": (nphi - clean_n, clay_n - clean_n),
+        "clay_n": (0.0, fluid_d - clean_d),
+        "clay_d": (0.0, -(fluid_n - clean_n)),
+    }
+    derivatives = {k: (dn - vshale * dd) / den for k, (dn, dd) in partials.items()}
+    return _clipped_derivatives(vshale, derivatives)
+
+
+@precision_policy
+def vshale_nrm_derivatives(
+    phit: Annotated[np.array, "Total porosity log"],
+    phie: Annotated[np.array, "Effective porosity log"]) -> dict:
+    """Partial derivatives of :func:`vshale_nrm`.
+
+    Parameters
+    ----------
+    phit : array_like
+        Total porosity log from nmr.
+    phie : array_like
+        Effective porosity log from nmr.
+
+    Returns
+    -------
+    derivatives : dict
+        Partial derivatives keyed by argument name. They are zero where the
+        shale volume is clipped to [0, 1].
+    """
+    phit, phie = np.asarray(phit), np.asarray(phie)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vshale = (phie - phit) / phit
+        derivatives = {"phit": -phie / phit**2, "phie": 1 / phit * np.ones_like(vshale)}
+    return _clipped_derivatives(vshale, derivatives)
 
 
 _vshale_methods = {
@@ -249,9 +676,22 @@ _vshale_methods = {
     "nrm": vshale_nrm
 }
 
+_vshale_derivatives = {
+    "linear": vshale_linear_derivatives,
+    "larionov": vshale_larionov_derivatives,
+    "larionov_old": vshale_larionov_old_derivatives,
+    "clavier": vshale_clavier_derivatives,
+    "stieber": vshale_stieber_derivatives,
+    "neu_den": vshale_neu_den_derivatives,
+    "nrm": vshale_nrm_derivatives,
+}
+
 
 def vshale(
-    method: Annotated[str, "Chosen vshale method"] = "density", **kwargs) -> np.array:
+    method: Annotated[str, "Chosen vshale method"] = "density",
+    out: Annotated[np.array, "Output array (may be a np.memmap)"] = None,
+    chunksize: Annotated[int, "Number of samples per chunk"] = None,
+    **kwargs) -> np.array:
     """Compute the shale volume from gamma ray log.
 
     This is a façade for the methods:
@@ -263,6 +703,9 @@ def vshale(
         - vshale_neu_den: :func:`stoneforge.petrophysics.shale_volume.vshale_neu_den`
         - vshale_nrm: :func:`stoneforge.petrophysics.shale_volume.vshale_nrm`
 
+    The clean and shale baselines may also be per-sample arrays (e.g.
+    from :meth:`stoneforge.preprocessing.zone_table.expand`).
+
     Parameters
     ----------
     gr : array_like
@@ -283,6 +726,12 @@ def vshale(
             - 'nrm'
             
         If not given, default method is 'linear'
+    out : array_like, optional
+        Array where the result is written, e.g. a ``np.memmap``. When `out`
+        or `chunksize` is given the logs are evaluated in chunks (see
+        :func:`stoneforge.petrophysics.helpers.chunked_apply`).
+    chunksize : int, optional
+        Number of depth samples evaluated at once.
 
     Returns
     -------
@@ -316,4 +765,7 @@ def vshale(
     
     fun = _vshale_methods[method]
 
-    return fun(**options)
\ No newline at end of file
+    if out is None and chunksize is None:
+        return fun(**options)
+
+    return chunked_apply(fun, out=out, chunksize=chunksize, **options)
\ No newline at end of file
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+
+import inspect
+import numpy as np
+from typing import Annotated
+
+from .porosity import density_porosity, neutron_porosity, sonic_porosity, effective_porosity
+from .water_saturation import archie, simandoux, indonesia, fertl
+from .helpers import correct_petrophysic_estimation_range
+from ..precision import float_array
+
+# Working memory (bytes) used by the temporaries of one chunk of a sweep.
+DEFAULT_SWEEP_BYTES = 256 * 2**20
+
+# Number of cube-sized temporaries a sweep chunk may hold besides the output.
+_TEMPORARIES = 3
+
+
+# The sweep formulas group the terms so that every subexpression is evaluated
+# on the smallest broadcast shape that holds it: a term that depends only on
+# the logs and `m` (e.g. phi**m) is computed once per value of `m`, not once
+# per grid point.
+
+def _archie_sweep(rt, phi, rw, a, m, n, out):
+    # log-space form, ((a*rw) / (phi**m * rt))**(1/n): each grid point costs
+    # an add, a divide and a single exp
+    with np.errstate(divide="ignore"):
+        logs = -np.log(rt) - m * np.log(phi)
+        np.add(np.log(a * rw), logs, out=out)
+    np.divide(out, n, out=out)
+    np.exp(out, out=out)
+    return out
+
+
+def _simandoux_sweep(rt, phi, vsh, rw, rsh, a, m, n, out):
+    q = (1 - vsh) / phi**m
+    c = (a * rw) * q
+    d = c * (vsh / (2 * rsh))
+    np.square(d, out=out)
+    out += c * (1 / rt)
+    np.sqrt(out, out=out)
+    out -= d
+    np.power(out, 2 / n, out=out)
+    return out
+
+
+def _indonesia_sweep(rt, phi, vsh, rw, rsh, a, m, n, out):
+    e = vsh**(1 - 0.5 * vsh) / rsh**0.5
+    f = phi**(m / 2) / (a * rw)**0.5
+    np.add(e, f, out=out)
+    np.divide((1. / rt)**0.5, out, out=out)
+    np.power(out, 1 / n, out=out)
+    return out
+
+
+def _fertl_sweep(rt, phi, vsh, rw, a, m, alpha, out):
+    half = alpha * vsh / 2
+    np.square(half, out=out)
+    out += (a * rw) * (1 / rt)
+    np.sqrt(out, out=out)
+    out -= half
+    out *= phi**(-m / 2)
+    return out
+
+
+_sweep_methods = {
+    "archie": (archie, _archie_sweep),
+    "simandoux": (simandoux, _simandoux_sweep),
+    "indonesia": (indonesia, _indonesia_sweep),
+    "fertl": (fertl, _fertl_sweep),
+    "density": (density_porosity, None),
+    "neutron": (neutron_porosity, None),
+    "sonic": (sonic_porosity, None),
+    "effective": (effective_porosity, None),
+}
+
+
+def sweep(
+    method: Annotated[str, "Saturation or porosity model"],
+    grid: Annotated[dict, "Parameter name to the values to be swept"],
+    depth: Annotated[np.array, "Depth of the log samples"] = None,
+    out: Annotated[np.array, "Output array (may be a np.memmap)"] = None,
+    max_bytes: Annotated[int, "Working memory budget in bytes"] = None,
+    **kwargs) -> dict:
+    """Evaluate a saturation or porosity model over a grid of parameters.
+
+    The parameter axes are broadcast against the depth axis, so the whole
+    grid is evaluated with array operations instead of one call per
+    parameter combination, and the terms that do not depend on every
+    parameter (e.g. ``phi**m``, ``1/rt``) are computed once and shared by
+    the grid points. The depth axis is processed in chunks whose temporaries
+    fit in `max_bytes`.
+
+    Parameters
+    ----------
+    method : str
+        One of the saturation models 'archie', 'simandoux', 'indonesia' and
+        'fertl' or the porosity models 'density', 'neutron', 'sonic' and
+        'effective'.
+    grid : dict
+        Values of the swept parameters, e.g. ``{'rw': [0.02, 0.03], 'm': [1.8, 2.0, 2.2]}``.
+        Each entry becomes an axis of the result, in the order given.
+    depth : array_like, optional
+        Depth coordinates of the logs. Defaults to the sample index.
+    out : array_like, optional
+        Array with shape ``(*grid sizes, n_samples)`` where the result is
+        written, e.g. a ``np.memmap`` when the result cube does not fit in
+        memory.
+    max_bytes : int, optional
+        Memory budget for the temporaries of each chunk. Default is
+        `DEFAULT_SWEEP_BYTES`.
+    **kwargs : dict
+        Logs and fixed parameters of the model (see the model functions).
+        Parameters that are neither swept nor given use the defaults of the
+        model function.
+
+    Returns
+    -------
+    sweep : dict
+        A dictionary containing the following keys:
+        - 'values': The result cube, with one axis per swept parameter and a last depth axis.
+        - 'dims': The names of the axes of 'values'.
+        - 'coords': The coordinates of each axis, keyed by its name.
+
+    Example
+    -------
+    >>> result = sweep("archie", {"rw": [0.02, 0.05], "m": [1.8, 2.0, 2.2]}, rt=rt, phi=phi, n=2.0)
+    >>> result["values"].shape
+    (2, 3, 5000)
+    """
+    if method not in _sweep_methods:
+        raise ValueError(f"Unsupported method '{method}'. Choose from: {list(_sweep_methods)}")
+    if max_bytes is None:
+        max_bytes = DEFAULT_SWEEP_BYTES
+
+    fun, fast = _sweep_methods[method]
+    signature = inspect.signature(fun).parameters
+    unknown = [name for name in list(grid) + list(kwargs) if name not in signature or name == "out"]
+    if unknown:
+        raise TypeError(f"Unexpected arguments for method '{method}': {', '.join(unknown)}")
+    if repeated := [name for name in kwargs if name in grid]:
+        raise ValueError(f"Arguments both swept and given: {', '.join(repeated)}")
+
+    coords = {name: float_array(np.ravel(values)) for name, values in grid.items()}
+    shape = tuple(len(values) for values in coords.values())
+
+    # swept parameters are reshaped to (..., k_i, ..., 1) so that they
+    # broadcast against each other and against the depth axis
+    params = {}
+    for axis, (name, values) in enumerate(coords.items()):
+        view = [1] * (len(shape) + 1)
+        view[axis] = len(values)
+        params[name] = values.reshape(view)
+
+    logs = {}
+    for name, value in kwargs.items():
+        if np.ndim(value) > 0:
+            logs[name] = float_array(value)
+        else:
+            params[name] = value
+    missing = [name for name, p in signature.items()
+               if p.default is inspect.Parameter.empty and name not in logs and name not in params]
+    if missing:
+        raise TypeError(f"Missing required arguments for method '{method}': {', '.join(missing)}")
+    if not logs:
+        raise ValueError("At least one log must be given")
+
+    size = len(next(iter(logs.values())))
+    if depth is None:
+        depth = np.arange(size)
+    dtype = np.result_type(*logs.values(), *coords.values())
+    if out is None:
+        out = np.empty(shape + (size,), dtype=dtype)
+
+    if fast is not None:
+        defaults = {name: p.default for name, p in signature.items()
+                    if p.default is not inspect.Parameter.empty and name != "out"}
+        params = {**defaults, **params}
+
+    # depth samples per chunk such that the temporaries fit in the budget
+    cells = int(np.prod(shape, dtype=np.int64))
+    chunksize = max(1, int(max_bytes // (_TEMPORARIES * cells * np.dtype(dtype).itemsize)))
+
+    for start in range(0, size, chunksize):
+        stop = min(start + chunksize, size)
+        chunk = {name: value[start:stop] for name, value in logs.items()}
+        block = out[..., start:stop]
+        if fast is not None:
+            fast(**chunk, **params, out=block)
+            correct_petrophysic_estimation_range(block, out=block)
+        else:
+            fun(**chunk, **params, out=block)
+
+    if hasattr(out, "flush"):
+        out.flush()
+
+    return {
+        "values": out,
+        "dims": tuple(coords) + ("depth",),
+        "coords": {**coords, "depth": np.asarray(depth)},
+    }
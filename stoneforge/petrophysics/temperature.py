@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+from typing import Annotated
+
+from .helpers import _output_array, _scalar_or_array
+from ..precision import precision_policy
+
+# Temperature offset of the Arps equation for each unit.
+_ARPS_OFFSET = {"C": 21.5, "F": 6.77}
+
+
+def temperature_profile(
+    depth: Annotated[np.array, "Depth of the samples"],
+    surface_temperature: Annotated[float, "Temperature at the surface depth"] = None,
+    gradient: Annotated[float, "Geothermal gradient (degree per depth unit)"] = None,
+    bht: Annotated[np.array, "Bottom hole temperatures"] = None,
+    bht_depth: Annotated[np.array, "Depth of the bottom hole temperatures"] = None,
+    surface_depth: Annotated[float, "Depth of the surface (or mudline)"] = 0.0) -> np.array:
+    """Formation temperature at every depth sample.
+
+    The profile is piecewise linear through the known points: the surface
+    temperature at `surface_depth` and the bottom hole temperature (BHT)
+    readings. Above the first and below the last point it is extended with
+    `gradient` or, if not given, with the gradient of the nearest segment.
+    Typical uses are:
+
+    - ``surface_temperature`` and ``gradient``;
+    - ``surface_temperature`` and one or more BHT readings;
+    - two or more BHT readings, or one BHT reading and ``gradient``.
+
+    Parameters
+    ----------
+    depth : array_like
+        Depth of the samples.
+    surface_temperature : float, optional
+        Temperature at `surface_depth` (°C or °F).
+    gradient : float, optional
+        Geothermal gradient, in temperature units per depth unit (e.g.
+        0.03 °C/m).
+    bht : float or array_like, optional
+        Bottom hole temperature readings, e.g. from several logging runs.
+    bht_depth : float or array_like, optional
+        Depth of each BHT reading.
+    surface_depth : float, optional
+        Depth of the surface temperature (0, or the mudline offshore).
+
+    Returns
+    -------
+    temperature : array_like
+        Temperature at each depth sample, in the unit of the inputs.
+
+    Example
+    -------
+    >>> temperature = temperature_profile(depth, surface_temperature=25.0, bht=[85.0, 112.0], bht_depth=[2100.0, 3050.0])
+    >>> rw_curve = arps_rw(0.05, temperature, reference_temperature=25.0)
+    """
+    points_depth = []
+    points_temperature = []
+    if surface_temperature is not None:
+        points_depth.append(float(surface_depth))
+        points_temperature.append(float(surface_temperature))
+    if bht is not None:
+        if bht_depth is None:
+            raise ValueError("bht_depth is required with bht")
+        bht, bht_depth = np.ravel(bht).astype(float), np.ravel(bht_depth).astype(float)
+        if bht.shape != bht_depth.shape:
+            raise ValueError("bht and bht_depth must have the same length")
+        points_depth.extend(bht_depth)
+        points_temperature.extend(bht)
+
+    points_depth = np.asarray(points_depth)
+    points_temperature = np.asarray(points_temperature)
+    order = np.argsort(points_depth)
+    points_depth, points_temperature = points_depth[order], points_temperature[order]
+    if np.any(np.diff(points_depth) == 0):
+        raise ValueError("The temperature points must be at different depths")
+    if points_depth.size == 0 or (points_depth.size == 1 and gradient is None):
+        raise ValueError("At least two temperature points, or one point and the gradient, are required")
+
+    if gradient is not None:
+        top_gradient = bottom_gradient = float(gradient)
+    else:
+        slopes = np.diff(points_temperature) / np.diff(points_depth)
+        top_gradient, bottom_gradient = slopes[0], slopes[-1]
+
+    depth = np.asarray(depth, dtype=float)
+    temperature = np.interp(depth, points_depth, points_temperature)
+    temperature = np.where(depth < points_depth[0],
+                           points_temperature[0] + top_gradient * (depth - points_depth[0]), temperature)
+    temperature = np.where(depth > points_depth[-1],
+                           points_temperature[-1] + bottom_gradient * (depth - points_depth[-1]), temperature)
+    return _scalar_or_array(temperature)
+
+
+@precision_policy
+def arps_rw(
+    rw: Annotated[np.array, "Water resistivity at the reference temperature"],
+    temperature: Annotated[np.array, "Formation temperature"],
+    reference_temperature: Annotated[float, "Temperature of the Rw measurement"] = 25.0,
+    unit: Annotated[str, "Temperature unit, 'C' or 'F'"] = "C",
+    out: Annotated[np.array, "Output array"] = None) -> np.array:
+    """Correct the water resistivity to formation temperature with the Arps equation :footcite:t:`arps1953`.
+
+    Parameters
+    ----------
+    rw : int, float, array_like
+        Water resistivity (ohm.m) measured at `reference_temperature`.
+    temperature : array_like
+        Formation temperature of each sample, e.g. from
+        :func:`temperature_profile`.
+    reference_temperature : int, float, array_like
+        Temperature at which `rw` was measured.
+    unit : str, optional
+        Unit of the temperatures, 'C' (Celsius) or 'F' (Fahrenheit).
+    out : array_like, optional
+        Array where the result is stored.
+
+    Returns
+    -------
+    rw : array_like
+        Water resistivity at formation temperature (ohm.m),
+        ``rw * (reference_temperature + c) / (temperature + c)`` with
+        c = 21.5 °C or 6.77 °F. It can be given directly as `rw` to every
+        water saturation model.
+    """
+    if unit not in _ARPS_OFFSET:
+        raise ValueError(f"Unknown temperature unit '{unit}'. Use 'C' or 'F'")
+    offset = _ARPS_OFFSET[unit]
+    RW = _output_array(out, rw, temperature, reference_temperature)
+    np.add(temperature, offset, out=RW)
+    np.divide(np.add(reference_temperature, offset), RW, out=RW)
+    RW *= rw
+    return _scalar_or_array(RW)
@@ -1,7 +1,14 @@
 import numpy.typing as npt
 import numpy as np
+from .helpers import chunked_apply, _output_array, _scalar_or_array, _scratch
+from ..precision import precision_policy
+from ..preprocessing.rolling import rolling
 
-def passey(dt, rt, dtbaseline, rtbaseline, lom=10.6):
+# Passey overlay scaling: 50 μsec/ft of sonic per decade of resistivity.
+_DT_SCALE = 0.02
+
+@precision_policy
+def passey(dt, rt, dtbaseline, rtbaseline, lom=10.6, out=None):
     """Estimate the Total Organic Carbon Content by Passey method using Sonic log and Resistivy log _.
 
     Parameters
@@ -16,7 +23,11 @@ def passey(dt, rt, dtbaseline, rtbaseline, lom=10.6):
         Resistivity log base line (ohm/m)
     lom : int, float
         Level of maturity
-              
+    out : array_like, optional
+        Array where the result is stored. It must have the broadcast shape of
+        the inputs and must not overlap them. Repeated calls with the same
+        `out` do not allocate.
+
     Returns
     -------
     TOC : array_like
@@ -28,30 +39,164 @@ def passey(dt, rt, dtbaseline, rtbaseline, lom=10.6):
     74, p. 1777–1794.
 
     """
-    dlogrt = (rt - rtbaseline) + 0.02*(dt - dtbaseline)
-    toc = dlogrt*10**(2.297 - 0.1688*lom)
-    return np.clip(toc, 0.0, 100.0)
+    toc = _output_array(out, dt, rt, dtbaseline, rtbaseline, lom)
+    tmp = _scratch(toc)
+    np.subtract(rt, rtbaseline, out=tmp)
+    # dlogrt = (rt - rtbaseline) + 0.02*(dt - dtbaseline)
+    np.subtract(dt, dtbaseline, out=toc)
+    np.multiply(0.02, toc, out=toc)
+    np.add(tmp, toc, out=toc)
+    np.multiply(toc, 10**(2.297 - 0.1688*lom), out=toc)
+    np.clip(toc, 0.0, 100.0, out=toc)
+    return _scalar_or_array(toc)
     
 
+@precision_policy
+def passey_lom_grid(dt, rt, dtbaseline, rtbaseline, lom, out=None):
+    """Passey TOC for many levels of maturity at once.
+
+    The ΔlogR separation does not depend on the level of maturity, so it is
+    computed once and scaled by the factor of every `lom` value in a single
+    outer product.
+
+    Parameters
+    ----------
+    dt : array_like
+        Sonic log reading (acoustic transit time (μsec/ft))
+    rt : array_like
+        Resistivity log reading in log scale (formation resistivity (ohm/m))
+    dtbaseline : int, float, array_like
+        Sonic log base line (μsec/ft)
+    rtbaseline : int, float, array_like
+        Resistivity log base line (ohm/m)
+    lom : array_like
+        Levels of maturity to be evaluated.
+    out : array_like, optional
+        Array of shape ``(len(lom), n_samples)`` where the result is stored.
+
+    Returns
+    -------
+    TOC : array_like
+        Total organic carbon content with shape ``(len(lom), n_samples)``,
+        one row per level of maturity.
+    """
+    dlogr = np.subtract(dt, dtbaseline)
+    dlogr *= _DT_SCALE
+    dlogr += np.subtract(rt, rtbaseline)
+    factor = 10**(2.297 - 0.1688*np.ravel(lom))
+    toc = _output_array(out, factor[:, None], dlogr)
+    np.multiply(factor[:, None], dlogr, out=toc)
+    np.clip(toc, 0.0, 100.0, out=toc)
+    return toc
+
+
+def passey_baseline(dt, rt, window=51, depth=None, tops=None, flat_quantile=0.25, low_quantile=0.25):
+    """Pick the Passey baselines automatically, zone by zone.
+
+    In organic-lean (non-source) rocks the scaled sonic and the resistivity
+    curves overlay: their sum ``rt + 0.02*dt`` is flat, while in source
+    rocks the separation grows. The rolling standard deviation of the sum
+    measures how well the curves overlay. In each zone the baseline samples
+    are those where it is among the lowest `flat_quantile` and the sum is
+    among the lowest `low_quantile`. The baselines are the median sonic of
+    these samples and the resistivity that puts the median of their sum at
+    ΔlogR = 0.
+
+    Parameters
+    ----------
+    dt : array_like
+        Sonic log reading (acoustic transit time (μsec/ft))
+    rt : array_like
+        Resistivity log reading in log scale (formation resistivity (ohm/m))
+    window : int, float
+        Window length of the overlay check, in samples or, when `depth` is
+        given, in depth units.
+    depth : array_like, optional
+        Increasing depth of the samples. Required when `tops` is given.
+    tops : array_like, optional
+        Top depth of each zone; samples above the first top belong to the
+        first zone. Default is a single zone.
+    flat_quantile : float
+        Fraction of the samples of a zone with the best overlay kept as
+        baseline candidates.
+    low_quantile : float
+        Fraction of the samples of a zone with the lowest separation kept as
+        baseline candidates.
+
+    Returns
+    -------
+    baseline : dict
+        A dictionary containing the following keys:
+        - 'dtbaseline': The sonic base line of the zone of each sample.
+        - 'rtbaseline': The resistivity base line of the zone of each sample.
+        - 'baseline': Boolean array, True at the picked baseline samples.
+        The base lines are NaN in zones without valid samples.
+
+    Example
+    -------
+    >>> base = passey_baseline(dt, np.log10(rt), window=30.0, depth=depth, tops=[2100.0, 2450.0])
+    >>> toc = calculate_toc(dt, np.log10(rt), base['dtbaseline'], base['rtbaseline'], lom=10.5)
+    """
+    dt = np.asarray(dt, dtype=float)
+    rt = np.asarray(rt, dtype=float)
+    overlay = rt + _DT_SCALE*dt
+    spread = rolling(overlay, window, depth, min_periods=3).std()
+
+    if tops is None:
+        zone = np.zeros(overlay.size, dtype=np.intp)
+        n_zones = 1
+    else:
+        if depth is None:
+            raise ValueError("depth is required to split the zones at their tops")
+        tops = np.sort(np.ravel(tops))
+        zone = np.clip(np.searchsorted(tops, depth, side='right') - 1, 0, len(tops) - 1)
+        n_zones = len(tops)
+
+    dtbaseline = np.full(n_zones, np.nan)
+    rtbaseline = np.full(n_zones, np.nan)
+    baseline = np.zeros(overlay.size, dtype=bool)
+    valid = ~np.isnan(spread) & ~np.isnan(overlay)
+    for z in range(n_zones):
+        rows = np.flatnonzero((zone == z) & valid)
+        if rows.size == 0:
+            continue
+        picked = rows[(spread[rows] <= np.quantile(spread[rows], flat_quantile))
+                      & (overlay[rows] <= np.quantile(overlay[rows], low_quantile))]
+        if picked.size == 0:
+            picked = rows[spread[rows] <= np.quantile(spread[rows], flat_quantile)]
+        baseline[picked] = True
+        dtbaseline[z] = np.median(dt[picked])
+        rtbaseline[z] = np.median(overlay[picked]) - _DT_SCALE*dtbaseline[z]
+
+    return {"dtbaseline": dtbaseline[zone], "rtbaseline": rtbaseline[zone], "baseline": baseline}
+
+
 _toc_methods = {
     "passey": passey,
 }
 
-def calculate_toc(dt: npt.ArrayLike, rt: npt.ArrayLike, dtbaseline: float, rtbaseline: float, lom: float, method: str = "passey", **kwargs) -> np.ndarray:
+def calculate_toc(dt: npt.ArrayLike, rt: npt.ArrayLike, dtbaseline: float = None, rtbaseline: float = None, lom: float = 10.6,
+                  method: str = "passey", out: npt.ArrayLike = None, chunksize: int = None, **kwargs) -> np.ndarray:
     """Compute total organic carbonc content from well logs.
 
     This is a façade for the methods:
         - passey
-S
+
+    The baselines and `lom` may also be per-sample arrays, e.g. from
+    :meth:`stoneforge.preprocessing.zone_table.expand`. Baselines that are
+    not given are picked by :func:`passey_baseline`, which receives the
+    remaining keyword arguments (`window`, `depth`, `tops`, ...). For many
+    levels of maturity at once see :func:`passey_lom_grid`.
+
     Parameters
     ----------
     dt : array_like
         Sonic log reading (acoustic transit time (μsec/ft))
     rt : array_like
         Resistivity log reading (formation resistivity (ohm/m))
-    dtbaseline : int, float
+    dtbaseline : int, float, optional
         Sonic log base line (μsec/ft)
-    rtbaseline : int, float
+    rtbaseline : int, float, optional
         Resistivity log base line (ohm/m)
     lom : int, float
         Level of maturity
@@ -60,6 +205,12 @@ S
             - 'passey'
             
         If not given, default method is 'passey'
+    out : array_like, optional
+        Array where the result is written, e.g. a ``np.memmap``. When `out`
+        or `chunksize` is given the logs are evaluated in chunks (see
+        :func:`stoneforge.petrophysics.helpers.chunked_apply`).
+    chunksize : int, optional
+        Number of depth samples evaluated at once.
 
     Returns
     -------
@@ -67,5 +218,18 @@ S
         Total organic carbon content for the aimed interval using the defined method.
 
     """
-    
-    return passey(dt, rt, dtbaseline, rtbaseline, lom)
+    if method not in _toc_methods:
+        raise ValueError(f"Unsupported method '{method}'. Choose from: {list(_toc_methods)}")
+
+    if dtbaseline is None or rtbaseline is None:
+        base = passey_baseline(dt, rt, **kwargs)
+        dtbaseline = base["dtbaseline"] if dtbaseline is None else dtbaseline
+        rtbaseline = base["rtbaseline"] if rtbaseline is None else rtbaseline
+
+    options = dict(dt=dt, rt=rt, dtbaseline=dtbaseline, rtbaseline=rtbaseline, lom=lom)
+    fun = _toc_methods[method]
+
+    if out is None and chunksize is None:
+        return fun(**options)
+
+    return chunked_apply(fun, out=out, chunksize=chunksize, **options)
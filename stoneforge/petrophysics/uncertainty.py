@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+
+import os
+import numpy as np
+from typing import Annotated
+from concurrent.futures import ProcessPoolExecutor
+
+from .porosity import porosity
+from .shale_volume import vshale
+from .water_saturation import water_saturation, _sw_methods
+from ..reservoir.net_pay import net_pay_siliciclastic
+
+# Working memory (bytes) used by one block of realizations.
+DEFAULT_BLOCK_BYTES = 64 * 2**20
+
+# Number of (block size x depth) float arrays alive while a block is evaluated.
+_BLOCK_ARRAYS = 8
+
+# Number of (depth x bins) int64 histograms alive per worker (one per curve).
+_HISTOGRAM_ARRAYS = 3
+
+_curves = ("vsh", "phi", "sw")
+
+
+def _draw(rng, spec, size):
+    """Draw `size` realizations of a parameter given its distribution.
+
+    `spec` is either a constant or a tuple with the name of a
+    ``np.random.Generator`` method followed by its arguments, e.g.
+    ``("normal", 2.65, 0.02)``.
+    """
+    if isinstance(spec, tuple) and spec and isinstance(spec[0], str):
+        return getattr(rng, spec[0])(*spec[1:], size=(size, 1))
+    return spec
+
+
+def _evaluate_block(config, rng, size):
+    """Evaluate one block of realizations. Returns the (size, depth) curves
+    and the net pay flags."""
+    env = dict(config["logs"])
+    for name, spec in config["parameters"].items():
+        env[name] = _draw(rng, spec, size)
+
+    sw_defaults = {"a": 1.0, "m": 2.0, "n": 2.0, "rw": 0.02}
+    for name, value in sw_defaults.items():
+        env.setdefault(name, value)
+
+    if config["vshale_method"] is not None:
+        env["vsh"] = vshale(method=config["vshale_method"], **env)
+    if config["porosity_method"] is not None:
+        env["phi"] = porosity(method=config["porosity_method"], **env)
+    env["sw"] = water_saturation(method=config["sw_method"], **env)
+
+    cutoffs = {name: env[name] for name in ("vsh_t", "phi_t", "sw_t") if name in env}
+    shape = (size, config["size"])
+    curves = {name: np.broadcast_to(env[name], shape) for name in _curves if name in env}
+    flags = net_pay_siliciclastic(curves.get("vsh", np.zeros(shape)), curves["phi"], curves["sw"],
+                                  fillzeros=True, **cutoffs)["pay"]
+
+    return curves, np.broadcast_to(flags, shape)
+
+
+def _run_blocks(config, blocks):
+    """Evaluate a set of blocks and reduce them into histograms.
+
+    Each block is a ``(index, seed, size)`` tuple; the seed is a
+    ``np.random.SeedSequence`` independent from the seeds of the other
+    blocks, so the result does not depend on how blocks are spread over
+    processes. The draws only depend on the seed and the block size, so
+    every depth chunk of the logs sees the same realizations.
+    """
+    size, bins = config["size"], config["bins"]
+    # one extra bin per depth collects the NaN samples
+    offsets = np.arange(size)[None, :] * (bins + 1)
+    counts = {}
+    pay = np.zeros(size)
+    net_pay = {}
+
+    for index, seed, block_size in blocks:
+        rng = np.random.default_rng(seed)
+        curves, flags = _evaluate_block(config, rng, block_size)
+
+        for name, values in curves.items():
+            scaled = values * bins
+            np.clip(scaled, 0, bins - 1, out=scaled)
+            np.nan_to_num(scaled, copy=False, nan=bins)
+            idx = scaled.astype(np.int64) + offsets
+            hist = np.bincount(idx.ravel(), minlength=size * (bins + 1))
+            hist = hist.reshape(size, bins + 1)[:, :bins]
+            if name in counts:
+                counts[name] += hist
+            else:
+                counts[name] = hist
+
+        pay += flags.sum(axis=0)
+        net_pay[index] = flags @ config["thickness"]
+
+    return counts, pay, net_pay
+
+
+def _histogram_quantiles(counts, levels):
+    """Quantiles of each row of a histogram over [0, 1] with linear
+    interpolation inside the bins."""
+    size, bins = counts.shape
+    cdf = np.cumsum(counts, axis=1)
+    total = cdf[:, -1].astype(float)
+    result = np.full((len(levels), size), np.nan)
+    edges = np.arange(bins + 1) / bins
+    rows = np.arange(size)
+
+    for i, q in enumerate(levels):
+        target = q * total
+        # first bin whose cumulative count reaches the target
+        b = np.minimum((cdf < target[:, None]).sum(axis=1), bins - 1)
+        below = np.where(b > 0, cdf[rows, b - 1], 0)
+        inside = counts[rows, b]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            frac = np.where(inside > 0, (target - below) / inside, 0.0)
+        result[i] = edges[b] + np.clip(frac, 0.0, 1.0) / bins
+
+    result[:, total == 0] = np.nan
+    return result
+
+
+def monte_carlo(
+    logs: Annotated[dict, "Input logs keyed by argument name"],
+    parameters: Annotated[dict, "Parameter distributions or constants"],
+    porosity_method: Annotated[str, "Porosity method"] = "density",
+    vshale_method: Annotated[str, "Shale volume method"] = "linear",
+    sw_method: Annotated[str, "Water saturation method"] = "archie",
+    n_realizations: Annotated[int, "Number of realizations"] = 1000,
+    quantiles: Annotated[tuple, "Quantile levels"] = (0.1, 0.5, 0.9),
+    depth: Annotated[np.array, "Depth of the log samples"] = None,
+    block_size: Annotated[int, "Realizations evaluated at once"] = None,
+    bins: Annotated[int, "Histogram bins of the [0, 1] curves"] = 1000,
+    seed: Annotated[int, "Seed of the random generator"] = None,
+    n_jobs: Annotated[int, "Number of worker processes"] = 1) -> dict:
+    """Monte Carlo uncertainty of porosity, shale volume, water saturation and net pay.
+
+    Parameter realizations are drawn with a seeded ``np.random.Generator`` and
+    evaluated in vectorised blocks: each parameter is drawn as a
+    ``(block_size, 1)`` array that broadcasts against the logs, so one call
+    to :func:`porosity`, :func:`vshale`, :func:`water_saturation` and
+    :func:`stoneforge.reservoir.net_pay.net_pay_siliciclastic` evaluates the
+    whole block. Each block is reduced into per-depth histograms right away,
+    so the realizations x depth ensemble is never held in memory; quantiles
+    are interpolated from the histograms (resolution ``1/bins``).
+
+    The logs are processed in depth chunks so that the histograms of a
+    chunk (``bins + 1`` counts per sample and curve, for every worker) and
+    the arrays of a block together fit in `DEFAULT_BLOCK_BYTES`; every chunk
+    is evaluated with the same realizations.
+
+    Parameters
+    ----------
+    logs : dict
+        Input logs keyed by the argument names of the methods, e.g.
+        ``{'rhob': rhob, 'gr': gr, 'rt': rt}``. A 'vsh' or 'phi' log can be
+        given instead of computing it (set the method to None).
+    parameters : dict
+        Parameters keyed by argument name. Each one is a constant or a tuple
+        with the name of a ``np.random.Generator`` distribution and its
+        arguments, e.g. ``{'rhom': ('normal', 2.65, 0.02), 'm': ('uniform', 1.8, 2.2),
+        'rhof': 1.0}``. The net pay cutoffs are 'vsh_t', 'phi_t' and 'sw_t'.
+    porosity_method : str or None
+        Method of :func:`stoneforge.petrophysics.porosity.porosity`.
+    vshale_method : str or None
+        Method of :func:`stoneforge.petrophysics.shale_volume.vshale`.
+    sw_method : str
+        Method of :func:`stoneforge.petrophysics.water_saturation.water_saturation`.
+    n_realizations : int
+        Number of realizations.
+    quantiles : tuple
+        Quantile levels (non-exceedance probabilities) to be computed.
+    depth : array_like, optional
+        Depth of the log samples, used for the net pay thickness. If not
+        given, the thickness is the number of samples.
+    block_size : int, optional
+        Number of realizations evaluated at once. Default fits a block of a
+        depth chunk in half of `DEFAULT_BLOCK_BYTES`.
+    bins : int
+        Number of histogram bins over [0, 1].
+    seed : int, optional
+        Seed of the random generator. Each block draws from an independent
+        stream spawned from it, so results do not depend on `n_jobs`.
+    n_jobs : int
+        Number of worker processes. If 1, blocks are evaluated in the
+        current process.
+
+    Returns
+    -------
+    uncertainty : dict
+        A dictionary containing the following keys:
+        - 'quantiles': The quantile levels.
+        - 'phi', 'sw' and 'vsh': Arrays with one quantile curve per level.
+        - 'pay_probability': The fraction of realizations flagged as pay at each depth.
+        - 'net_pay': The net pay quantiles.
+        - 'net_pay_samples': The net pay of every realization.
+
+    Example
+    -------
+    >>> result = monte_carlo({'rhob': rhob, 'gr': gr, 'rt': rt},
+    ...                      {'rhom': ('normal', 2.65, 0.02), 'rhof': 1.0, 'grmin': ('uniform', 15, 25),
+    ...                       'grmax': ('uniform', 120, 150), 'rw': ('lognormal', np.log(0.03), 0.2),
+    ...                       'm': ('triangular', 1.8, 2.0, 2.3), 'n': 2.0},
+    ...                      n_realizations=5000, seed=42, n_jobs=4)
+    >>> p10, p50, p90 = result['sw']
+    """
+    if sw_method not in _sw_methods:
+        raise ValueError(f"Unsupported method '{sw_method}'. Choose from: {list(_sw_methods)}")
+
+    logs = {name: np.asarray(value, dtype=float) for name, value in logs.items()}
+    size = len(next(iter(logs.values())))
+    if depth is None:
+        thickness = np.ones(size)
+    else:
+        thickness = np.abs(np.gradient(np.asarray(depth, dtype=float))) if size > 1 else np.ones(size)
+
+    if n_jobs is None:
+        n_jobs = os.cpu_count() or 1
+
+    # half of the budget holds the histograms of every worker (and their sum
+    # in this process), the other half the arrays of a block
+    budget = DEFAULT_BLOCK_BYTES // 2
+    copies = n_jobs + 1 if n_jobs > 1 else 1
+    chunk = budget // (copies * _HISTOGRAM_ARRAYS * (bins + 1) * 8)
+    chunk = int(min(max(chunk, 1), max(size, 1)))
+    if block_size is None:
+        block_size = budget // (_BLOCK_ARRAYS * 8 * chunk)
+    block_size = int(max(1, min(block_size, n_realizations)))
+
+    sizes = [min(block_size, n_realizations - start) for start in range(0, n_realizations, block_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    blocks = list(zip(range(len(sizes)), seeds, sizes))
+
+    levels = np.asarray(quantiles, dtype=float)
+    result = {"quantiles": levels}
+    pay = np.zeros(size)
+    net_pay = np.zeros(n_realizations)
+    starts = np.cumsum([0] + sizes)
+
+    executor = ProcessPoolExecutor(max_workers=n_jobs) if n_jobs > 1 and len(blocks) > 1 else None
+    try:
+        for start in range(0, size, chunk):
+            stop = min(start + chunk, size)
+            config = {
+                "logs": {name: value[start:stop] for name, value in logs.items()},
+                "parameters": parameters,
+                "porosity_method": porosity_method,
+                "vshale_method": vshale_method,
+                "sw_method": sw_method,
+                "size": stop - start,
+                "bins": bins,
+                "thickness": thickness[start:stop],
+            }
+            if executor is None:
+                partials = [_run_blocks(config, blocks)]
+            else:
+                futures = [executor.submit(_run_blocks, config, blocks[i::n_jobs]) for i in range(n_jobs)]
+                partials = [future.result() for future in futures]
+
+            counts = {}
+            for part_counts, part_pay, part_net_pay in partials:
+                for name, hist in part_counts.items():
+                    counts[name] = counts[name] + hist if name in counts else hist
+                pay[start:stop] += part_pay
+                for index, values in part_net_pay.items():
+                    net_pay[starts[index]:starts[index + 1]] += values
+
+            for name in _curves:
+                if name in counts:
+                    if name not in result:
+                        result[name] = np.full((len(levels), size), np.nan)
+                    result[name][:, start:stop] = _histogram_quantiles(counts[name], levels)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    result["pay_probability"] = pay / n_realizations
+    result["net_pay"] = np.quantile(net_pay, levels)
+    result["net_pay_samples"] = net_pay
+
+    return result
@@ -2,18 +2,21 @@
 
 import numpy as np
 from typing import Annotated
-import warnings
 #from stoneforge.petrophysics.helpers import correct_petrophysic_estimation_range
-from .helpers import correct_petrophysic_estimation_range
+from .helpers import correct_petrophysic_estimation_range, chunked_apply, _output_array, _result_dtype, _scalar_or_array, _scratch, _clipped_derivatives
+from ..precision import precision_policy
+from ..validation import check, check_range
 
     
+@precision_policy
 def archie(
     rt: Annotated[np.array, "Formation resistivity"],
     phi: Annotated[np.array, "Porosity"],
     rw: Annotated[float, "Water resistivity"] = 0.02,
     a: Annotated[float, "Clean density point"] = 1.00,
     m: Annotated[float, "fluid neutron point"] = 2.00,
-    n: Annotated[float, "fluid density point"] = 2.00) -> np.array:
+    n: Annotated[float, "fluid density point"] = 2.00,
+    out: Annotated[np.array, "Output array"] = None) -> np.array:
     """Estimate the Water Saturation from :footcite:t:`archie1942` (standard values from :footcite:t:`archie1952,aapg2014archie`).
 
     Parameters
@@ -22,7 +25,7 @@ def archie(
         Formation resistivity.    
     phi : array_like
         Porosity.
-    rw : float
+    rw : float, array_like
         Water resistivity.  
     a : float
         Tortuosity factor.
@@ -30,6 +33,10 @@ def archie(
         Cementation exponent.
     n : float
         Saturation exponent.
+    out : array_like, optional
+        Array where the result is stored. It must have the broadcast shape of
+        the inputs and must not overlap them. Repeated calls with the same
+        `out` do not allocate.
 
     Returns
     -------
@@ -37,18 +44,20 @@ def archie(
         Water saturation from Archie equation.
 
     """
-    if np.any(((a*rw) / (phi**m * rt))**(1/n) > 1):
-        warnings.warn(UserWarning("saturation of water must be a value between 0 and 1"))
-        sw = ((a*rw) / (phi**m * rt))**(1/n)
-        sw = correct_petrophysic_estimation_range(sw)
-        return sw
+    sw = _output_array(out, rt, phi, rw, a, m, n)
+    # ((a*rw) / (phi**m * rt))**(1/n)
+    np.power(phi, m, out=sw)
+    np.multiply(sw, rt, out=sw)
+    np.divide(a*rw, sw, out=sw)
+    np.power(sw, 1/n, out=sw)
 
-    else:
-        sw = ((a*rw) / (phi**m * rt))**(1/n)
-        sw = correct_petrophysic_estimation_range(sw)
-        return sw
+    check_range("archie", "saturation of water must be a value between 0 and 1", sw, upper=1.0)
 
+    correct_petrophysic_estimation_range(sw, out=sw)
+    return _scalar_or_array(sw)
 
+
+@precision_policy
 def simandoux(
     rt: Annotated[np.array, "Formation resistivity"],
     phi: Annotated[np.array, "Porosity"],
@@ -57,7 +66,8 @@ def simandoux(
     rsh: Annotated[float, "Shale resistivity"] = 4.00,
     a: Annotated[float, "Clean density point"] = 1.00,
     m: Annotated[float, "fluid neutron point"] = 2.00,
-    n: Annotated[float, "fluid density point"] = 2.00) -> np.array:
+    n: Annotated[float, "fluid density point"] = 2.00,
+    out: Annotated[np.array, "Output array"] = None) -> np.array:
     """Estimate water saturation from :footcite:t:`simandoux1963` equation (standard values from :footcite:t:`geoloil2012sw,aapg2014archie`).
 
     Parameters
@@ -66,7 +76,7 @@ def simandoux(
         Porosity.
     vsh : array_like
         Clay volume log.
-    rw : float
+    rw : float, array_like
         Water resistivity.
     rsh : float
         Clay resistivity.
@@ -78,6 +88,10 @@ def simandoux(
         Cementation exponent.
     n : float
         Saturation exponent.
+    out : array_like, optional
+        Array where the result is stored. It must have the broadcast shape of
+        the inputs and must not overlap them. Repeated calls with the same
+        `out` do not allocate.
 
     Returns
     -------
@@ -85,16 +99,34 @@ def simandoux(
         Water saturation from Simandoux equation.
 
     """
-    C = (1 - vsh) * a * rw / phi**m
-    D = C * vsh / (2*rsh)
-    E = C / rt
-    sw = ((D**2 + E)**0.5 - D)**(2/n)
-
-    sw = correct_petrophysic_estimation_range(sw)
-
-    return sw
-
-
+    sw = _output_array(out, rt, phi, vsh, rw, rsh, a, m, n)
+    D = _scratch(sw, 0)
+    tmp = _scratch(sw, 1)
+
+    # C = (1 - vsh) * a * rw / phi**m, kept in `sw`
+    np.subtract(1, vsh, out=sw)
+    np.multiply(sw, a, out=sw)
+    np.multiply(sw, rw, out=sw)
+    np.power(phi, m, out=tmp)
+    np.divide(sw, tmp, out=sw)
+    # D = C * vsh / (2*rsh)
+    np.multiply(sw, vsh, out=D)
+    np.divide(D, 2*rsh, out=D)
+    # E = C / rt
+    np.divide(sw, rt, out=sw)
+    # ((D**2 + E)**0.5 - D)**(2/n)
+    np.square(D, out=tmp)
+    np.add(tmp, sw, out=sw)
+    np.sqrt(sw, out=sw)
+    np.subtract(sw, D, out=sw)
+    np.power(sw, 2/n, out=sw)
+
+    correct_petrophysic_estimation_range(sw, out=sw)
+
+    return _scalar_or_array(sw)
+
+
+@precision_policy
 def indonesia(
     rt: Annotated[np.array, "Formation resistivity"],
     phi: Annotated[np.array, "Porosity"],
@@ -103,7 +135,8 @@ def indonesia(
     rsh: Annotated[float, "Shale resistivity"] = 4.00,
     a: Annotated[float, "Clean density point"] = 1.00,
     m: Annotated[float, "fluid neutron point"] = 2.00,
-    n: Annotated[float, "fluid density point"] = 2.00) -> np.array:
+    n: Annotated[float, "fluid density point"] = 2.00,
+    out: Annotated[np.array, "Output array"] = None) -> np.array:
     """Estimate water saturation from :footcite:t:`poupon-leveaux1971` equation (standard values from :footcite:t:`geoloil2012sw,aapg2014archie`).
 
     Parameters
@@ -112,7 +145,7 @@ def indonesia(
         Porosity.
     vsh : array_like
         Clay volume log.
-    rw : float
+    rw : float, array_like
         Water resistivity.
     rsh : float
         Clay resistivity.
@@ -124,6 +157,10 @@ def indonesia(
         Cementation exponent.
     n : float
         Saturation exponent.
+    out : array_like, optional
+        Array where the result is stored. It must have the broadcast shape of
+        the inputs and must not overlap them. Repeated calls with the same
+        `out` do not allocate.
 
     Returns
     -------
@@ -132,16 +169,30 @@ def indonesia(
 
     """
     #sw = ((1/rt)**0.5 / ((vsh**(1 - 0.5*vsh) / (rsh)**0.5) + (phi**m / a*rw)**0.5))**(2/n)
-    C = (1./rt) ** 0.5
-    D = 1 - 0.5*vsh
-    E = (vsh**D)/(rsh**0.5)
-    F = ((phi**m)/(a*rw))**0.5
-    sw = (C/(E+F))**(1/n)
-    sw = correct_petrophysic_estimation_range(sw)
-
-    return sw
-
-
+    sw = _output_array(out, rt, phi, vsh, rw, rsh, a, m, n)
+    tmp = _scratch(sw)
+
+    # E = vsh**D / rsh**0.5, with D = 1 - 0.5*vsh
+    np.multiply(0.5, vsh, out=sw)
+    np.subtract(1, sw, out=sw)
+    np.power(vsh, sw, out=sw)
+    np.divide(sw, rsh**0.5, out=sw)
+    # E + F, with F = (phi**m / (a*rw))**0.5
+    np.power(phi, m, out=tmp)
+    np.divide(tmp, a*rw, out=tmp)
+    np.sqrt(tmp, out=tmp)
+    np.add(sw, tmp, out=sw)
+    # (C / (E + F))**(1/n), with C = (1/rt)**0.5
+    np.divide(1., rt, out=tmp)
+    np.sqrt(tmp, out=tmp)
+    np.divide(tmp, sw, out=sw)
+    np.power(sw, 1/n, out=sw)
+    correct_petrophysic_estimation_range(sw, out=sw)
+
+    return _scalar_or_array(sw)
+
+
+@precision_policy
 def fertl(
     rt: Annotated[np.array, "Formation resistivity"],
     phi: Annotated[np.array, "Porosity"],
@@ -149,7 +200,8 @@ def fertl(
     rw: Annotated[float, "Water resistivity"] = 0.02,
     a: Annotated[float, "Clean density point"] = 1.00,
     m: Annotated[float, "fluid neutron point"] = 2.00,
-    alpha: Annotated[float, "fluid density point"] = 0.30) -> np.array:
+    alpha: Annotated[float, "fluid density point"] = 0.30,
+    out: Annotated[np.array, "Output array"] = None) -> np.array:
     """Estimate water saturation from :footcite:t:`fertl1975` equation (standard values from :footcite:t:`aapg2014archie`).
 
     Parameters
@@ -160,7 +212,7 @@ def fertl(
         Porosity (must be effective).
     vsh : array_like
         Clay volume log.
-    rw : float
+    rw : float, array_like
         Water resistivity.     
     a : int, float
         Tortuosity factor.
@@ -168,6 +220,10 @@ def fertl(
         Cementation exponent.
     alpha : float
         Alpha parameter from Fertl equation.
+    out : array_like, optional
+        Array where the result is stored. It must have the broadcast shape of
+        the inputs and must not overlap them. Repeated calls with the same
+        `out` do not allocate.
 
     Returns
     -------
@@ -175,23 +231,628 @@ def fertl(
         Water saturation from Fertl equation.
         
     """
-    sw = phi**(-m/2) * ((a*rw/rt + (alpha*vsh/2)**2)**0.5 - (alpha*vsh/2))
-    sw = correct_petrophysic_estimation_range(sw)
+    sw = _output_array(out, rt, phi, vsh, rw, a, m, alpha)
+    half = _scratch(sw, 0)
+    tmp = _scratch(sw, 1)
+
+    # phi**(-m/2) * ((a*rw/rt + (alpha*vsh/2)**2)**0.5 - alpha*vsh/2)
+    np.multiply(alpha, vsh, out=half)
+    np.divide(half, 2, out=half)
+    np.divide(a*rw, rt, out=sw)
+    np.square(half, out=tmp)
+    np.add(sw, tmp, out=sw)
+    np.sqrt(sw, out=sw)
+    np.subtract(sw, half, out=sw)
+    np.power(phi, -m/2, out=tmp)
+    np.multiply(tmp, sw, out=sw)
+    correct_petrophysic_estimation_range(sw, out=sw)
+
+    return _scalar_or_array(sw)
+
+
+def juhasz_b(
+    rw: Annotated[np.array, "Water resistivity"],
+    temperature: Annotated[np.array, "Formation temperature (°C)"] = 25.0) -> np.array:
+    """Equivalent conductance of the clay exchange cations from :footcite:t:`juhasz1981`.
 
+    Parameters
+    ----------
+    rw : array_like
+        Water resistivity at formation temperature (ohm.m).
+    temperature : array_like
+        Formation temperature (°C).
 
+    Returns
+    -------
+    b : array_like
+        Equivalent conductance B ((S/m)/(meq/cm³)) of the Waxman-Smits equation.
+    """
+    t = temperature
+    return (-1.28 + 0.225*t - 4.059e-4*t**2) / (1 + np.power(rw, 1.23) * (0.045*t - 0.27))
+
+
+def _solve_saturation(function, ct, A, B, n, tol, maxiter):
+    """Solve ``A * S**n + B * S**(n-1) = ct`` for S in [0, 1] at every sample.
+
+    Safeguarded Newton iteration over all samples at once: each sample keeps
+    a bracket [lo, hi] of the root and a step that leaves it is replaced by
+    a bisection step. Converged samples are dropped from the working set, so
+    the cost of an iteration is proportional to the samples still active.
+    Samples whose root is above 1 are set to 1 (fully water saturated).
+    """
+    scalar_n = np.ndim(n) == 0
+    arrays = [np.asarray(x, dtype=np.float64) for x in ((ct, A, B) if scalar_n else (ct, A, B, n))]
+    arrays = [x.ravel() for x in np.broadcast_arrays(*arrays)]
+    sw = np.full(arrays[0].shape, np.nan)
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        ct, A, B = arrays[:3]
+        valid = np.isfinite(ct) & np.isfinite(A) & np.isfinite(B) & (A > 0)
+        # f(1) <= 0 means the root is at or above 1
+        saturated = valid & (A + B - ct <= 0)
+        sw[saturated] = 1.0
+        idx = np.flatnonzero(valid & ~saturated)
+        if idx.size < sw.size:
+            arrays = [x[idx] for x in arrays]
+        ct, A, B = arrays[:3]
+        if not scalar_n:
+            n = arrays[3]
+
+        # first guess: the exact root for n = 2, 2*ct / (B + (B**2 + 4*A*ct)**0.5)
+        s = np.sqrt(B*B + 4*A*ct)
+        s += B
+        np.divide(2*ct, s, out=s)
+        np.clip(s, 1e-12, 1.0, out=s)
+        lo, hi = np.zeros(idx.size), np.ones(idx.size)
+
+        for _ in range(maxiter):
+            if idx.size == 0:
+                break
+            p = s if scalar_n and n == 2 else s**(n - 1)
+            f = p * (A*s + B) - ct
+            df = p * (n*A*s + (n - 1)*B) / s
+
+            below = f < 0
+            np.copyto(lo, s, where=below)
+            np.copyto(hi, s, where=~below)
+
+            new = s - f / df
+            bisect = ~((new >= lo) & (new <= hi))
+            new[bisect] = 0.5 * (lo[bisect] + hi[bisect])
+
+            done = np.abs(new - s) <= tol
+            sw[idx[done]] = new[done]
+            keep = ~done
+            idx, s, lo, hi = idx[keep], new[keep], lo[keep], hi[keep]
+            ct, A, B = ct[keep], A[keep], B[keep]
+            if not scalar_n:
+                n = n[keep]
+
+    # unconverged samples keep their last iterate
+    sw[idx] = s
+    unconverged = np.zeros(sw.shape, dtype=bool)
+    unconverged[idx] = True
+    check(function, f"did not converge in {maxiter} iterations", unconverged)
     return sw
 
 
+@precision_policy
+def waxman_smits(
+    rt: Annotated[np.array, "Formation resistivity"],
+    phi: Annotated[np.array, "Porosity"],
+    qv: Annotated[np.array, "Cation exchange capacity per unit pore volume"],
+    rw: Annotated[float, "Water resistivity"] = 0.02,
+    a: Annotated[float, "Tortuosity factor"] = 1.00,
+    m: Annotated[float, "Clay-corrected cementation exponent"] = 2.00,
+    n: Annotated[float, "Clay-corrected saturation exponent"] = 2.00,
+    b: Annotated[float, "Equivalent conductance of the clay cations"] = None,
+    temperature: Annotated[float, "Formation temperature (°C)"] = 25.0,
+    tol: Annotated[float, "Absolute tolerance on the saturation"] = 1e-10,
+    maxiter: Annotated[int, "Maximum number of iterations"] = 50,
+    out: Annotated[np.array, "Output array"] = None) -> np.array:
+    """Estimate water saturation from :footcite:t:`waxman-smits1968` equation.
+
+    Solves ``1/rt = phi**m * sw**n / a * (1/rw + b*qv/sw)`` for every sample
+    with a vectorised safeguarded Newton iteration (see
+    :func:`dual_water`).
+
+    Parameters
+    ----------
+    rt : array_like
+        True resistivity.
+    phi : array_like
+        Porosity (total).
+    qv : array_like
+        Cation exchange capacity per unit pore volume (meq/cm³).
+    rw : float, array_like
+        Water resistivity.
+    a : float
+        Tortuosity factor.
+    m : float
+        Clay-corrected cementation exponent (m*).
+    n : float
+        Clay-corrected saturation exponent (n*).
+    b : float, optional
+        Equivalent conductance of the clay exchange cations
+        ((S/m)/(meq/cm³)). If not given, it is computed from `rw` and
+        `temperature` with :func:`juhasz_b`.
+    temperature : float
+        Formation temperature (°C), used only if `b` is not given.
+    tol : float
+        Absolute tolerance on the water saturation.
+    maxiter : int
+        Maximum number of iterations. Samples that do not converge keep
+        their last iterate and are reported by :mod:`stoneforge.validation`.
+    out : array_like, optional
+        Array where the result is stored.
+
+    Returns
+    -------
+    sw : array_like
+        Water saturation from Waxman-Smits equation.
+    """
+    sw = _output_array(out, rt, phi, qv, rw, a, m, n)
+    if b is None:
+        b = juhasz_b(rw, temperature)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pm = np.power(phi, m) / a
+        result = _solve_saturation("waxman_smits", 1 / np.asarray(rt), pm / rw, pm * b * qv, n, tol, maxiter)
+    sw[...] = result.reshape(sw.shape)
+
+    correct_petrophysic_estimation_range(sw, out=sw)
+    return _scalar_or_array(sw)
+
+
+@precision_policy
+def dual_water(
+    rt: Annotated[np.array, "Formation resistivity"],
+    phi: Annotated[np.array, "Total porosity"],
+    swb: Annotated[np.array, "Bound water saturation"],
+    rw: Annotated[float, "Free water resistivity"] = 0.02,
+    rwb: Annotated[float, "Bound water resistivity"] = 0.10,
+    a: Annotated[float, "Tortuosity factor"] = 1.00,
+    m: Annotated[float, "Cementation exponent"] = 2.00,
+    n: Annotated[float, "Saturation exponent"] = 2.00,
+    tol: Annotated[float, "Absolute tolerance on the saturation"] = 1e-10,
+    maxiter: Annotated[int, "Maximum number of iterations"] = 50,
+    out: Annotated[np.array, "Output array"] = None) -> np.array:
+    """Estimate total water saturation from the :footcite:t:`clavier1984` dual-water equation.
+
+    Solves ``1/rt = phi**m * swt**n / a * (1/rw + swb/swt * (1/rwb - 1/rw))``
+    for every sample. The iteration runs over all the samples at once: a
+    Newton step is taken where it stays inside the bracket of the root and a
+    bisection step elsewhere, and converged samples leave the working set.
+
+    Parameters
+    ----------
+    rt : array_like
+        True resistivity.
+    phi : array_like
+        Total porosity.
+    swb : array_like
+        Bound water saturation (fraction of the total porosity).
+    rw : float, array_like
+        Free water resistivity.
+    rwb : float
+        Bound water resistivity.
+    a : float
+        Tortuosity factor.
+    m : float
+        Cementation exponent.
+    n : float
+        Saturation exponent.
+    tol : float
+        Absolute tolerance on the water saturation.
+    maxiter : int
+        Maximum number of iterations. Samples that do not converge keep
+        their last iterate and are reported by :mod:`stoneforge.validation`.
+    out : array_like, optional
+        Array where the result is stored.
+
+    Returns
+    -------
+    swt : array_like
+        Total water saturation from the dual-water equation.
+    """
+    sw = _output_array(out, rt, phi, swb, rw, rwb, a, m, n)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pm = np.power(phi, m) / a
+        B = pm * swb * (1 / rwb - 1 / rw)
+        result = _solve_saturation("dual_water", 1 / np.asarray(rt), pm / rw, B, n, tol, maxiter)
+    sw[...] = result.reshape(sw.shape)
+
+    correct_petrophysic_estimation_range(sw, out=sw)
+    return _scalar_or_array(sw)
+
+
+# closed-form models evaluated by `water_saturation_stack`
+_stack_methods = ("archie", "simandoux", "indonesia", "fertl")
+
+
+@precision_policy
+def water_saturation_stack(
+    rt: Annotated[np.array, "Formation resistivity"],
+    phi: Annotated[np.array, "Porosity"],
+    vsh: Annotated[np.array, "Shale volume"] = None,
+    rw: Annotated[float, "Water resistivity"] = 0.02,
+    rsh: Annotated[float, "Shale resistivity"] = 4.00,
+    a: Annotated[float, "Tortuosity factor"] = 1.00,
+    m: Annotated[float, "Cementation exponent"] = 2.00,
+    n: Annotated[float, "Saturation exponent"] = 2.00,
+    alpha: Annotated[float, "Alpha parameter from Fertl equation"] = 0.30,
+    methods: Annotated[tuple, "Water saturation methods"] = _stack_methods,
+    dtype: Annotated[str, "Floating dtype of the computation"] = None,
+    out: Annotated[np.array, "Output array"] = None) -> np.array:
+    """Estimate the water saturation with several methods at once.
+
+    The terms shared by the models (``phi**m``, its square root, ``1/rt``
+    and ``a*rw``) are computed once for all of them instead of once per
+    :func:`water_saturation` call.
+
+    Parameters
+    ----------
+    rt : array_like
+        True resistivity.
+    phi : array_like
+        Porosity (must be effective).
+    vsh : array_like, optional
+        Clay volume log. Required by 'simandoux', 'indonesia' and 'fertl'.
+    rw : float, array_like
+        Water resistivity.
+    rsh : float
+        Clay resistivity.
+    a : float
+        Tortuosity factor.
+    m : float
+        Cementation exponent.
+    n : float
+        Saturation exponent.
+    alpha : float
+        Alpha parameter from Fertl equation.
+    methods : sequence of str, optional
+        Any of 'archie', 'simandoux', 'indonesia' and 'fertl'. Default is
+        all of them.
+    dtype : str or np.dtype, optional
+        Floating dtype used for the computation and the output, e.g.
+        'float32' to halve the memory traffic (see
+        :mod:`stoneforge.precision` for the accuracy envelope). Default is
+        the dtype of the inputs.
+    out : array_like, optional
+        Array with shape ``(len(methods), *rt.shape)`` where the result is
+        stored.
+
+    Returns
+    -------
+    sw : array_like
+        Water saturation of each method stacked along the first axis, in the
+        order of `methods`.
+    """
+    if isinstance(methods, str):
+        methods = (methods,)
+    unknown = [method for method in methods if method not in _stack_methods]
+    if unknown:
+        raise ValueError(f"Unsupported method '{unknown[0]}'. Choose from: {list(_stack_methods)}")
+    if vsh is None and set(methods) - {"archie"}:
+        raise TypeError("Missing required argument 'vsh'")
+
+    if dtype is None:
+        dtype = _result_dtype(rt, phi, *(() if vsh is None else (vsh,)))
+    dtype = np.dtype(dtype)
+    rt = np.asarray(rt, dtype=dtype)
+    phi = np.asarray(phi, dtype=dtype)
+    if vsh is not None:
+        vsh = np.asarray(vsh, dtype=dtype)
+    shape = np.broadcast_shapes(rt.shape, phi.shape, np.shape(vsh))
+    if out is None:
+        out = np.empty((len(methods),) + shape, dtype=dtype)
+
+    # shared terms
+    like = out[0]
+    arw = a * rw
+    pm = np.power(phi, m, out=_scratch(like, "phi**m"))
+    inv_rt = np.divide(1., rt, out=_scratch(like, "1/rt"))
+    if {"indonesia", "fertl"} & set(methods):
+        sqrt_pm = np.sqrt(pm, out=_scratch(like, "phi**(m/2)"))
+    tmp = _scratch(like, "tmp")
+    tmp2 = _scratch(like, "tmp2")
+
+    for sw, method in zip(out, methods):
+        if method == "archie":
+            # (a*rw / (phi**m * rt))**(1/n)
+            np.multiply(inv_rt, arw, out=sw)
+            np.divide(sw, pm, out=sw)
+            np.power(sw, 1/n, out=sw)
+            check_range("archie", "saturation of water must be a value between 0 and 1", sw, upper=1.0)
+
+        elif method == "simandoux":
+            # C = (1 - vsh) * a*rw / phi**m, D = C * vsh / (2*rsh), E = C / rt
+            np.subtract(1, vsh, out=sw)
+            np.multiply(sw, arw, out=sw)
+            np.divide(sw, pm, out=sw)
+            np.multiply(sw, vsh, out=tmp)
+            np.divide(tmp, 2*rsh, out=tmp)
+            np.multiply(sw, inv_rt, out=sw)
+            # ((D**2 + E)**0.5 - D)**(2/n)
+            np.square(tmp, out=tmp2)
+            np.add(sw, tmp2, out=sw)
+            np.sqrt(sw, out=sw)
+            np.subtract(sw, tmp, out=sw)
+            np.power(sw, 2/n, out=sw)
+
+        elif method == "indonesia":
+            # ((1/rt)**0.5 / (vsh**(1 - 0.5*vsh) / rsh**0.5 + (phi**m / (a*rw))**0.5))**(1/n)
+            np.multiply(0.5, vsh, out=sw)
+            np.subtract(1, sw, out=sw)
+            np.power(vsh, sw, out=sw)
+            np.divide(sw, rsh**0.5, out=sw)
+            np.divide(sqrt_pm, arw**0.5, out=tmp)
+            np.add(sw, tmp, out=sw)
+            np.sqrt(inv_rt, out=tmp)
+            np.divide(tmp, sw, out=sw)
+            np.power(sw, 1/n, out=sw)
+
+        elif method == "fertl":
+            # ((a*rw/rt + (alpha*vsh/2)**2)**0.5 - alpha*vsh/2) / phi**(m/2)
+            np.multiply(alpha / 2, vsh, out=tmp)
+            np.multiply(inv_rt, arw, out=sw)
+            np.square(tmp, out=tmp2)
+            np.add(sw, tmp2, out=sw)
+            np.sqrt(sw, out=sw)
+            np.subtract(sw, tmp, out=sw)
+            np.divide(sw, sqrt_pm, out=sw)
+
+        correct_petrophysic_estimation_range(sw, out=sw)
+
+    return out
+
+
+@precision_policy
+def archie_derivatives(
+    rt: Annotated[np.array, "Formation resistivity"],
+    phi: Annotated[np.array, "Porosity"],
+    rw: Annotated[float, "Water resistivity"] = 0.02,
+    a: Annotated[float, "Clean density point"] = 1.00,
+    m: Annotated[float, "fluid neutron point"] = 2.00,
+    n: Annotated[float, "fluid density point"] = 2.00) -> dict:
+    """Partial derivatives of :func:`archie`.
+
+    Parameters
+    ----------
+    rt : array_like
+        Formation resistivity.
+    phi : array_like
+        Porosity.
+    rw : float, array_like
+        Water resistivity.
+    a : float
+        Tortuosity factor.
+    m : float
+        Cementation exponent.
+    n : float
+        Saturation exponent.
+
+    Returns
+    -------
+    derivatives : dict
+        Partial derivatives keyed by argument name. They are zero where the
+        water saturation is clipped to [0, 1].
+    """
+    rt, phi = np.asarray(rt), np.asarray(phi)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sw = ((a*rw) / (phi**m * rt))**(1/n)
+        # d sw = sw * d(ln sw), with ln sw = (ln a + ln rw - m ln phi - ln rt) / n
+        derivatives = {
+            "rt": -sw / (n * rt),
+            "phi": -m * sw / (n * phi),
+            "rw": sw / (n * rw),
+            "a": sw / (n * a),
+            "m": -sw * np.log(phi) / n,
+            "n": -sw * np.log(sw) / n,
+        }
+    return _clipped_derivatives(sw, derivatives)
+
+
+@precision_policy
+def simandoux_derivatives(
+    rt: Annotated[np.array, "Formation resistivity"],
+    phi: Annotated[np.array, "Porosity"],
+    vsh: Annotated[np.array, "Shale volume"],
+    rw: Annotated[float, "Water resistivity"] = 0.02,
+    rsh: Annotated[float, "Shale resistivity"] = 4.00,
+    a: Annotated[float, "Clean density point"] = 1.00,
+    m: Annotated[float, "fluid neutron point"] = 2.00,
+    n: Annotated[float, "fluid density point"] = 2.00) -> dict:
+    """Partial derivatives of :func:`simandoux`.
+
+    Parameters
+    ----------
+    rt : array_like
+        True resistivity.
+    phi : array_like
+        Porosity.
+    vsh : array_like
+        Clay volume log.
+    rw : float, array_like
+        Water resistivity.
+    rsh : float
+        Clay resistivity.
+    a : float
+        Tortuosity factor.
+    m : float
+        Cementation exponent.
+    n : float
+        Saturation exponent.
+
+    Returns
+    -------
+    derivatives : dict
+        Partial derivatives keyed by argument name. They are zero where the
+        water saturation is clipped to [0, 1].
+    """
+    rt, phi, vsh = np.asarray(rt), np.asarray(phi), np.asarray(vsh)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        C = (1 - vsh) * a * rw / phi**m
+        D = C * vsh / (2*rsh)
+        E = C / rt
+        R = (D**2 + E)**0.5
+        S = R - D
+        sw = S**(2/n)
+
+        dsw = (2/n) * sw / S      # d sw / d S
+        dD = D / R - 1            # d S / d D
+        dE = 1 / (2 * R)          # d S / d E
+        dC = dD * vsh / (2*rsh) + dE / rt
+        derivatives = {
+            "rt": dsw * dE * -E / rt,
+            "phi": dsw * dC * -m * C / phi,
+            "vsh": dsw * (dC * -a * rw / phi**m + dD * C / (2*rsh)),
+            "rw": dsw * dC * C / rw,
+            "rsh": dsw * dD * -D / rsh,
+            "a": dsw * dC * C / a,
+            "m": dsw * dC * -C * np.log(phi),
+            "n": -sw * np.log(sw) / n,
+        }
+    return _clipped_derivatives(sw, derivatives)
+
+
+@precision_policy
+def indonesia_derivatives(
+    rt: Annotated[np.array, "Formation resistivity"],
+    phi: Annotated[np.array, "Porosity"],
+    vsh: Annotated[np.array, "Shale volume"],
+    rw: Annotated[float, "Water resistivity"] = 0.02,
+    rsh: Annotated[float, "Shale resistivity"] = 4.00,
+    a: Annotated[float, "Clean density point"] = 1.00,
+    m: Annotated[float, "fluid neutron point"] = 2.00,
+    n: Annotated[float, "fluid density point"] = 2.00) -> dict:
+    """Partial derivatives of :func:`indonesia`.
+
+    Parameters
+    ----------
+    rt : array_like
+        True resistivity.
+    phi : array_like
+        Porosity.
+    vsh : array_like
+        Clay volume log.
+    rw : float, array_like
+        Water resistivity.
+    rsh : float
+        Clay resistivity.
+    a : float
+        Tortuosity factor.
+    m : float
+        Cementation exponent.
+    n : float
+        Saturation exponent.
+
+    Returns
+    -------
+    derivatives : dict
+        Partial derivatives keyed by argument name. They are zero where the
+        water saturation is clipped to [0, 1].
+    """
+    rt, phi, vsh = np.asarray(rt), np.asarray(phi), np.asarray(vsh)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        C = (1./rt) ** 0.5
+        E = (vsh**(1 - 0.5*vsh))/(rsh**0.5)
+        F = ((phi**m)/(a*rw))**0.5
+        sw = (C/(E+F))**(1/n)
+
+        # d sw = sw * d(ln sw), with ln sw = (ln C - ln(E + F)) / n
+        g = -sw / (n * (E + F))
+        derivatives = {
+            "rt": -0.5 * sw / (n * rt),
+            "phi": g * 0.5 * m * F / phi,
+            "vsh": g * E * (-0.5 * np.log(vsh) + (1 - 0.5*vsh) / vsh),
+            "rw": g * -0.5 * F / rw,
+            "rsh": g * -0.5 * E / rsh,
+            "a": g * -0.5 * F / a,
+            "m": g * 0.5 * F * np.log(phi),
+            "n": -sw * np.log(sw) / n,
+        }
+    return _clipped_derivatives(sw, derivatives)
+
+
+@precision_policy
+def fertl_derivatives(
+    rt: Annotated[np.array, "Formation resistivity"],
+    phi: Annotated[np.array, "Porosity"],
+    vsh: Annotated[np.array, "Shale volume"],
+    rw: Annotated[float, "Water resistivity"] = 0.02,
+    a: Annotated[float, "Clean density point"] = 1.00,
+    m: Annotated[float, "fluid neutron point"] = 2.00,
+    alpha: Annotated[float, "fluid density point"] = 0.30) -> dict:
+    """Partial derivatives of :func:`fertl`.
+
+    Parameters
+    ----------
+    rt : array_like
+        True resistivity.
+    phi : array_like
+        Porosity (must be effective).
+    vsh : array_like
+        Clay volume log.
+    rw : float, array_like
+        Water resistivity.
+    a : int, float
+        Tortuosity factor.
+    m : int, float
+        Cementation exponent.
+    alpha : float
+        Alpha parameter from Fertl equation.
+
+    Returns
+    -------
+    derivatives : dict
+        Partial derivatives keyed by argument name. They are zero where the
+        water saturation is clipped to [0, 1].
+    """
+    rt, phi, vsh = np.asarray(rt), np.asarray(phi), np.asarray(vsh)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # sw = P * (R - h), with P = phi**(-m/2), R = (Q + h**2)**0.5, Q = a*rw/rt
+        P = phi**(-m/2)
+        Q = a*rw/rt
+        h = alpha*vsh/2
+        R = (Q + h**2)**0.5
+        sw = P * (R - h)
+
+        dQ = P / (2 * R)          # d sw / d Q
+        dh = P * (h / R - 1)      # d sw / d h
+        derivatives = {
+            "rt": dQ * -Q / rt,
+            "phi": -m / 2 * sw / phi,
+            "vsh": dh * alpha / 2,
+            "rw": dQ * Q / rw,
+            "a": dQ * Q / a,
+            "m": -0.5 * np.log(phi) * sw,
+            "alpha": dh * vsh / 2,
+        }
+    return _clipped_derivatives(sw, derivatives)
+
+
 _sw_methods = {
     "archie": archie,
     "simandoux": simandoux,
     "indonesia": indonesia,
-    "fertl": fertl
+    "fertl": fertl,
+    "waxman_smits": waxman_smits,
+    "dual_water": dual_water
+}
+
+_sw_derivatives = {
+    "archie": archie_derivatives,
+    "simandoux": simandoux_derivatives,
+    "indonesia": indonesia_derivatives,
+    "fertl": fertl_derivatives
 }
 
 
 def water_saturation(rw: float, rt: np.array, phi: np.array,
                      a: float, m: float, method: str = "archie",
+                     out: np.array = None, chunksize: int = None,
                      **kwargs) -> np.array:
     """Compute water saturation from resistivity log.
 
@@ -200,11 +861,19 @@ def water_saturation(rw: float, rt: np.array, phi: np.array,
         - simandoux
         - indonesia
         - fertl
+        - waxman_smits
+        - dual_water
+
+    Every parameter (`rw`, `a`, `m`, `n`, `rsh`, `alpha`) may also be a
+    per-sample array, e.g. from :meth:`stoneforge.preprocessing.zone_table.expand`,
+    so zoned parameters are evaluated in a single call.
 
     Parameters
     ----------
-    rw : int, float
-        Water resistivity.
+    rw : int, float, array_like
+        Water resistivity. A per-sample curve, e.g. corrected to formation
+        temperature by :func:`stoneforge.petrophysics.temperature.arps_rw`,
+        is evaluated in the same single call as a constant.
     rt : array_like
         True resistivity.
     phi : array_like
@@ -223,6 +892,12 @@ def water_saturation(rw: float, rt: np.array, phi: np.array,
         Clay resistivity. Required if `method` is "simandoux" or "indonesia".
     alpha : array_like
         Alpha parameter from Fertl equation. Required if `method` is "fertl"
+    qv : array_like
+        Cation exchange capacity per unit pore volume. Required if `method`
+        is "waxman_smits", which also accepts `b` and `temperature`.
+    swb, rwb : array_like, float
+        Bound water saturation and resistivity. Required if `method` is
+        "dual_water".
     method : str, optional
         Name of the method to be used.  Should be one of
         
@@ -230,8 +905,16 @@ def water_saturation(rw: float, rt: np.array, phi: np.array,
             - 'simandoux'
             - 'indonesia'
             - 'fertl'
+            - 'waxman_smits'
+            - 'dual_water'
             
         If not given, default method is 'archie'
+    out : array_like, optional
+        Array where the result is written, e.g. a ``np.memmap``. When `out`
+        or `chunksize` is given the logs are evaluated in chunks (see
+        :func:`stoneforge.petrophysics.helpers.chunked_apply`).
+    chunksize : int, optional
+        Number of depth samples evaluated at once.
 
     Returns
     -------
@@ -242,6 +925,7 @@ def water_saturation(rw: float, rt: np.array, phi: np.array,
     options = {}
     
     required = []
+    optional = []
     if method == "archie":
         required = ["n"]
     elif method == "simandoux":
@@ -250,16 +934,27 @@ def water_saturation(rw: float, rt: np.array, phi: np.array,
         required = ["n", "vsh", "rsh"]
     elif method == "fertl":
         required = ["vsh", "alpha"]
+    elif method == "waxman_smits":
+        required = ["n", "qv"]
+        optional = ["b", "temperature", "tol", "maxiter"]
+    elif method == "dual_water":
+        required = ["n", "swb", "rwb"]
+        optional = ["tol", "maxiter"]
     
     for arg in required:
         if arg not in kwargs:
             msg = f"Missing required argument for method '{method}': '{arg}'"
             raise TypeError(msg)
         options[arg] = kwargs[arg]
+    for arg in optional:
+        if arg in kwargs:
+            options[arg] = kwargs[arg]
     
     fun = _sw_methods[method]
 
+    options.update(rt=rt, phi=phi, rw=rw, a=a, m=m)
 
-    sw = fun(rw, rt, phi, a, m, **options)
-    
-    return sw
\ No newline at end of file
+    if out is None and chunksize is None:
+        return fun(**options)
+
+    return chunked_apply(fun, out=out, chunksize=chunksize, **options)
\ No newline at end of file
@@ -1,6 +1,11 @@
 
 from .data_management import project
 from .data_management import depth_zones
+from .data_management import zone_table
+from .rolling import rolling, window_bounds
+from .depth_matching import estimate_depth_shift, apply_depth_shift
+from .well_correlation import dtw, dtw_batch
+from .qc import rolling_median, hampel, bad_hole_flags, despike, log_qc
 from .data_processing import well_train_test_split
 from .data_processing import data_assemble
 from .data_processing import predict_processing
@@ -345,4 +345,126 @@ def depth_zones(
         bot = ranges[i+1]
         _zones[i] = df[df[dept].between(top, bot)]
     
-    return _zones
\ No newline at end of file
+    return _zones
+# ============================================ #
+
+class zone_table():
+    """Zone parameter table: petrophysical parameters that change with depth.
+
+    Each zone starts at its top depth and extends down to the top of the
+    next zone; samples above the first top belong to the first zone. The
+    table expands into per-sample parameter arrays through a single
+    ``np.searchsorted`` over the zone tops, so a well with any number of
+    zones is evaluated with one vectorised call of the petrophysics
+    functions instead of one call per zone.
+
+    Example
+    -------
+    >>> zones = zone_table([(1000.0, {'rw': 0.03, 'rhom': 2.65}),
+    ...                     (1500.0, {'rw': 0.05, 'rhom': 2.71})])
+    >>> params = zones.expand(depth)  # {'rw': array, 'rhom': array}
+    >>> phi = porosity(method='density', rhob=rhob, rhof=1.0, rhom=params['rhom'])
+    >>> sw = water_saturation(rt=rt, phi=phi, a=1.0, m=2.0, n=2.0, **zones.expand(depth, ['rw']))
+    """
+
+    def __init__(
+        self,
+        zones : Annotated [list, "(top, parameters) pairs or {top: parameters}"],
+        defaults : Annotated [dict, "Values of the parameters missing in a zone"] = None):
+        """Creates the table from the zone tops and their parameters.
+
+        Parameters
+        ----------
+        zones : list or dict
+            Zones as a list of ``(top, parameters)`` tuples or a
+            ``{top: parameters}`` dictionary, where ``parameters`` is a
+            dictionary of parameter values. The order does not matter.
+        defaults : dict, optional
+            Values used for the parameters that are missing in a zone.
+        """
+
+        if isinstance(zones, dict):
+            zones = list(zones.items())
+        if not zones:
+            raise ValueError("A zone table needs at least one zone")
+        defaults = defaults or {}
+
+        zones = sorted(zones, key=lambda zone: zone[0])
+        self.tops = np.array([top for top, _ in zones], dtype=float)
+        if np.any(np.diff(self.tops) == 0):
+            raise ValueError("Zone tops must be unique")
+
+        names = list(defaults)
+        for _, params in zones:
+            names += [name for name in params if name not in names]
+
+        self.values = {}
+        for name in names:
+            column = []
+            for top, params in zones:
+                if name in params:
+                    column.append(params[name])
+                elif name in defaults:
+                    column.append(defaults[name])
+                else:
+                    raise ValueError(f"Zone at {top} has no value for '{name}' and no default was given")
+            self.values[name] = np.asarray(column)
+
+    # ============================================ #
+
+    def __len__(self):
+        return len(self.tops)
+
+    def __contains__(self, name):
+        return name in self.values
+
+    @property
+    def parameters(self) -> list:
+        """Names of the parameters in the table."""
+        return list(self.values)
+
+    # ============================================ #
+
+    def index(
+        self,
+        depth : Annotated [np.array, "Depth of the samples"]) -> np.array:
+        """Returns the zone index of each depth sample.
+
+        Parameters
+        ----------
+        depth : array_like
+            Depth of the samples. It does not need to be sorted.
+
+        Returns
+        -------
+        index : array_like
+            Index of the zone (in order of increasing top) of each sample.
+        """
+
+        idx = np.searchsorted(self.tops, depth, side='right') - 1
+        return np.clip(idx, 0, len(self.tops) - 1)
+
+    # ============================================ #
+
+    def expand(
+        self,
+        depth : Annotated [np.array, "Depth of the samples"],
+        names : Annotated [list, "Parameters to be expanded"] = None) -> dict:
+        """Expands the table into per-sample parameter arrays.
+
+        Parameters
+        ----------
+        depth : array_like
+            Depth of the samples.
+        names : list, optional
+            Parameters to be expanded. Default is all of them.
+
+        Returns
+        -------
+        dict
+            Per-sample array of each parameter, with the shape of `depth`.
+        """
+
+        idx = self.index(depth)
+        names = self.parameters if names is None else names
+        return {name: self.values[name][idx] for name in names}
@@ -0,0 +1,185 @@
+import numpy as np
+from typing import Annotated
+
+
+def _sampling_step(depth):
+    """Step of a regularly sampled, increasing depth curve."""
+    depth = np.asarray(depth, dtype=float)
+    if depth.ndim != 1 or depth.size < 2:
+        raise ValueError("depth must be a one-dimensional curve with at least two samples")
+    steps = np.diff(depth)
+    step = (depth[-1] - depth[0]) / (depth.size - 1)
+    if step <= 0 or np.any(np.abs(steps - step) > 1e-6 * max(abs(step), 1.0) + 1e-9 * np.abs(depth[1:])):
+        raise ValueError("depth must be increasing and regularly sampled")
+    return step
+
+
+def _centred(segments):
+    """Segments minus their mean, with NaN set to zero, and valid counts."""
+    valid = ~np.isnan(segments)
+    count = valid.sum(axis=-1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(valid, segments, 0.0).sum(axis=-1) / count
+    return np.where(valid, segments - mean[:, None], 0.0), count
+
+
+def estimate_depth_shift(
+    reference: Annotated[np.array, "Reference curve (e.g. GR of the main pass)"],
+    offset: Annotated[np.array, "Curve of the run to be matched"],
+    depth: Annotated[np.array, "Regularly sampled depth of both curves"],
+    window: Annotated[float, "Correlation window length (depth units)"] = 20.0,
+    step: Annotated[float, "Distance between window centres (depth units)"] = None,
+    max_shift: Annotated[float, "Largest shift searched (depth units)"] = 5.0,
+    min_correlation: Annotated[float, "Lowest accepted peak correlation"] = 0.5) -> dict:
+    """Estimate a piecewise depth-shift function between two logging runs.
+
+    The offset curve is cut into windows of length `window` every `step`
+    and each window is cross-correlated with the reference over lags of up
+    to `max_shift`. All the windows are correlated at once with a batched
+    real FFT, and the correlation is normalised by the energy of the
+    reference under every lag (sliding sums of squares). The peak lag is
+    refined to a fraction of a sample by fitting a parabola through the
+    peak and its neighbours. Windows whose peak correlation is below
+    `min_correlation`, or whose peak is at the edge of the search range,
+    are rejected, and the shift of every sample is linearly interpolated
+    between the accepted window centres.
+
+    Both curves must be on the same regularly sampled depth grid; resample
+    them first otherwise.
+
+    Parameters
+    ----------
+    reference : array_like
+        Reference curve, e.g. the GR of the main pass.
+    offset : array_like
+        Same kind of curve from the run to be matched.
+    depth : array_like
+        Increasing, regularly sampled depth of both curves.
+    window : float, optional
+        Length of the correlation windows (depth units).
+    step : float, optional
+        Distance between consecutive window centres (depth units). Default
+        is half the window.
+    max_shift : float, optional
+        Largest absolute shift searched (depth units).
+    min_correlation : float, optional
+        Lowest normalised peak correlation for a window to be accepted.
+
+    Returns
+    -------
+    match : dict
+        A dictionary containing the following keys:
+        - 'shift': The shift of every sample (depth units), to be added to
+          the depth of the offset run; see :func:`apply_depth_shift`.
+        - 'centre': The depth of the window centres.
+        - 'window_shift': The shift estimated in each window (NaN where
+          rejected).
+        - 'correlation': The peak normalised correlation of each window.
+
+    Example
+    -------
+    >>> match = estimate_depth_shift(main['GR'], repeat['GR'], depth, window=30.0, max_shift=4.0)
+    >>> matched = apply_depth_shift(np.stack([repeat['GR'], repeat['RHOB']]), depth, match['shift'])
+    """
+    reference = np.asarray(reference, dtype=float)
+    offset = np.asarray(offset, dtype=float)
+    depth = np.asarray(depth, dtype=float)
+    if reference.shape != depth.shape or offset.shape != depth.shape:
+        raise ValueError("reference, offset and depth must have the same shape")
+    dz = _sampling_step(depth)
+    length = max(int(round(window / dz)), 3)
+    lag = max(int(round(max_shift / dz)), 1)
+    stride = max(int(round((0.5 * window if step is None else step) / dz)), 1)
+    size = depth.size
+    if size < length:
+        raise ValueError("The curves are shorter than the correlation window")
+
+    starts = np.arange(0, size - length + 1, stride)
+    index = np.arange(length)
+    # reference segments cover the window plus the searched lags
+    extended = np.pad(reference, lag, constant_values=np.nan)
+    ref = extended[starts[:, None] + np.arange(length + 2 * lag)]
+    off = offset[starts[:, None] + index]
+
+    ref, _ = _centred(ref)
+    off, count = _centred(off)
+    nfft = 1 << int(length + 2 * lag - 1).bit_length()
+    spectrum = np.fft.rfft(ref, nfft) * np.conj(np.fft.rfft(off, nfft))
+    corr = np.fft.irfft(spectrum, nfft)[:, :2 * lag + 1]
+
+    energy = np.zeros((len(starts), length + 2 * lag + 1))
+    np.cumsum(ref * ref, axis=1, out=energy[:, 1:])
+    ref_energy = energy[:, length:] - energy[:, :-length]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        corr /= np.sqrt(ref_energy * (off * off).sum(axis=1)[:, None])
+    corr[~np.isfinite(corr)] = -np.inf
+
+    peak = np.argmax(corr, axis=1)
+    rows = np.arange(len(starts))
+    best = corr[rows, peak]
+    interior = (peak > 0) & (peak < 2 * lag) & (count >= length // 2) & (best >= min_correlation)
+    left = corr[rows, np.maximum(peak - 1, 0)]
+    right = corr[rows, np.minimum(peak + 1, 2 * lag)]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        curvature = left - 2 * best + right
+        fraction = np.where(interior & (curvature < 0), 0.5 * (left - right) / curvature, 0.0)
+
+    window_shift = np.where(interior, (peak - lag + fraction) * dz, np.nan)
+    centre = depth[starts] + 0.5 * (length - 1) * dz
+    accepted = ~np.isnan(window_shift)
+    if accepted.any():
+        shift = np.interp(depth, centre[accepted], window_shift[accepted])
+    else:
+        shift = np.zeros(size)
+
+    return {
+        "shift": shift,
+        "centre": centre,
+        "window_shift": window_shift,
+        "correlation": np.where(np.isfinite(best), best, np.nan),
+    }
+
+
+def apply_depth_shift(
+    curves: Annotated[np.array, "Curve or (n_curves, n_samples) stack of curves"],
+    depth: Annotated[np.array, "Regularly sampled depth of the curves"],
+    shift: Annotated[np.array, "Shift of every sample (depth units)"]) -> np.array:
+    """Resample the curves of a run onto the reference depths.
+
+    The value at depth ``d`` is the curve at ``d - shift(d)``, linearly
+    interpolated. The interpolation indices and weights are computed once
+    and applied to all the curves with one gather, so every curve of the
+    run is shifted together. The resampled depths are kept increasing, so
+    the shift never reverses the order of the samples.
+
+    Parameters
+    ----------
+    curves : array_like
+        A curve, or a ``(n_curves, n_samples)`` array with every curve of
+        the run.
+    depth : array_like
+        Increasing, regularly sampled depth of the curves.
+    shift : array_like or float
+        Shift of every sample, e.g. ``estimate_depth_shift(...)['shift']``.
+
+    Returns
+    -------
+    shifted : array_like
+        The curves on the reference depths, NaN outside the logged
+        interval.
+    """
+    depth = np.asarray(depth, dtype=float)
+    dz = _sampling_step(depth)
+    curves = np.asarray(curves, dtype=float)
+    source = np.maximum.accumulate(depth - np.broadcast_to(shift, depth.shape))
+
+    position = (source - depth[0]) / dz
+    inside = (position >= 0) & (position <= depth.size - 1)
+    below = np.clip(np.floor(position).astype(np.intp), 0, depth.size - 2)
+    weight = position - below
+
+    shifted = curves[..., below] * (1.0 - weight) + curves[..., below + 1] * weight
+    # exact sample positions must not pick up a NaN neighbour
+    shifted = np.where(weight == 0.0, curves[..., below], shifted)
+    shifted[..., ~inside] = np.nan
+    return shifted
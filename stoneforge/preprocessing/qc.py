@@ -0,0 +1,375 @@
+import numpy as np
+from typing import Annotated
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Number of window elements (samples x window length) sorted at once; small
+# enough for the sorted windows to stay in cache.
+DEFAULT_CHUNKSIZE = 1 << 17
+
+# Scale factor that makes the median absolute deviation a consistent
+# estimator of the standard deviation of normally distributed data.
+MAD_SCALE = 1.4826
+
+# Curves that are never despiked by `log_qc`.
+_SKIP = ("DEPT", "DEPTH", "MD", "TVD", "TVDSS", "CALI", "BS")
+
+
+def _as_curves(curves):
+    """2D float view (n_curves, n_samples) of one curve or a stack of curves."""
+    curves = np.asarray(curves)
+    if not np.issubdtype(curves.dtype, np.floating):
+        curves = curves.astype(np.float64)
+    if curves.ndim == 0 or curves.ndim > 2:
+        raise ValueError(f"curves must be a 1D curve or a 2D (n_curves, n_samples) array, got shape {curves.shape}")
+    return curves.reshape(-1, curves.shape[-1])
+
+
+def _window_median(block, count, half):
+    """Median of the valid samples of each window of a block of windows."""
+    window = 2 * half + 1
+    median = np.partition(block, half, axis=-1)[..., half]
+
+    # NaN sorts last, so windows with missing samples take their median
+    # from the sorted valid samples
+    rows, cols = np.nonzero(count < window)
+    if rows.size:
+        median[rows, cols] = _valid_median(np.sort(block[rows, cols], axis=-1), count[rows, cols])
+    return median
+
+
+def _valid_median(ordered, count):
+    """Median of the first `count` (valid) values of each sorted row."""
+    lo = np.take_along_axis(ordered, (np.maximum(count - 1, 0) // 2)[:, None], axis=-1)[:, 0]
+    hi = np.take_along_axis(ordered, (count // 2)[:, None], axis=-1)[:, 0]
+    return np.where(count > 0, 0.5 * (lo + hi), np.nan)
+
+
+def _window_median_mad(block, count, half):
+    """Median and median absolute deviation about it of each window.
+
+    With the window sorted, the deviations below and above the median
+    ``s[h]`` form two sorted sequences, ``s[h] - s[h::-1]`` and
+    ``s[h+1:] - s[h]``. The (h+1)-th smallest of their union is the
+    minimum over the splits ``i + j = h + 1`` of ``max(a[i-1], b[j-1])``,
+    an elementwise expression, so a single sort gives both statistics.
+    """
+    window = 2 * half + 1
+    shape = block.shape[:-1]
+    ordered = np.sort(block, axis=-1).reshape(-1, window)
+    count = count.ravel()
+    median = ordered[:, half].copy()
+
+    mad = np.subtract(median, ordered[:, 0])
+    a = np.empty_like(mad)
+    b = np.empty_like(mad)
+    for k in range(half):
+        np.subtract(median, ordered[:, half - k], out=a)
+        np.subtract(ordered[:, window - 1 - k], median, out=b)
+        np.maximum(a, b, out=a)
+        np.minimum(mad, a, out=mad)
+
+    rows = np.flatnonzero(count < window)
+    if rows.size:
+        k = count[rows]
+        median[rows] = m = _valid_median(ordered[rows], k)
+        deviation = np.sort(np.abs(ordered[rows] - m[:, None]), axis=-1)
+        mad[rows] = _valid_median(deviation, k)
+    return median.reshape(shape), mad.reshape(shape)
+
+
+def _rolling(curves, window, chunksize, mad=False):
+    """Rolling median, and MAD about it, of the windows of all curves in chunks."""
+    if window < 1:
+        raise ValueError("window must be a positive integer")
+    if chunksize is None:
+        chunksize = DEFAULT_CHUNKSIZE
+    shape = np.shape(curves)
+    x = _as_curves(curves)
+    half = window // 2
+    window = 2 * half + 1
+
+    padded = np.pad(x, ((0, 0), (half, half)), constant_values=np.nan)
+    windows = sliding_window_view(padded, window, axis=-1)
+
+    # number of valid samples of every window
+    valid = np.zeros((padded.shape[0], padded.shape[1] + 1), dtype=np.intp)
+    np.cumsum(~np.isnan(padded), axis=-1, out=valid[:, 1:])
+    count = valid[:, window:] - valid[:, :-window]
+
+    median = np.empty_like(x)
+    deviation = np.empty_like(x) if mad else None
+    step = max(1, chunksize // (window * len(x)))
+    for start in range(0, x.shape[1], step):
+        stop = min(start + step, x.shape[1])
+        block = windows[:, start:stop]
+        k = count[:, start:stop]
+        if mad:
+            median[:, start:stop], deviation[:, start:stop] = _window_median_mad(block, k, half)
+        else:
+            median[:, start:stop] = _window_median(block, k, half)
+
+    if mad:
+        return median.reshape(shape), deviation.reshape(shape)
+    return median.reshape(shape)
+
+
+def rolling_median(
+    curves: Annotated[np.array, "Curve or (n_curves, n_samples) stack of curves"],
+    window: Annotated[int, "Window length (samples)"] = 11,
+    chunksize: Annotated[int, "Window elements selected at once"] = None) -> np.array:
+    """NaN-aware centred rolling median along the last axis.
+
+    The windows are strided views of the NaN-padded curves, so the median
+    of all the windows of all the curves is found with a single
+    vectorised selection (``np.partition``) per chunk. Windows that
+    contain NaN, at the edges and around gaps, are sorted instead (NaN
+    sorts last) and take the median of their valid samples only.
+
+    Parameters
+    ----------
+    curves : array_like
+        A curve, or a ``(n_curves, n_samples)`` array with every curve of a
+        well.
+    window : int, optional
+        Window length in samples. Even lengths are increased by one so the
+        window is centred.
+    chunksize : int, optional
+        Number of window elements (samples times window length) selected
+        at once. Default is `DEFAULT_CHUNKSIZE`.
+
+    Returns
+    -------
+    median : array_like
+        Rolling median with the shape of `curves`. It is NaN only where the
+        whole window is NaN.
+    """
+    return _rolling(curves, window, chunksize)
+
+
+def hampel(
+    curves: Annotated[np.array, "Curve or (n_curves, n_samples) stack of curves"],
+    window: Annotated[int, "Window length (samples)"] = 11,
+    threshold: Annotated[float, "Number of robust standard deviations"] = 3.5,
+    chunksize: Annotated[int, "Window elements selected at once"] = None) -> tuple:
+    """Flag spikes with a Hampel filter (rolling median and MAD).
+
+    A sample is a spike when it departs from the median of its window by
+    more than `threshold` robust standard deviations, estimated by
+    ``MAD_SCALE`` times the median absolute deviation of the window about
+    its median. Both are obtained from a single sort of each window.
+    NaN samples are ignored in the windows and are never flagged.
+
+    Parameters
+    ----------
+    curves : array_like
+        A curve, or a ``(n_curves, n_samples)`` array with every curve of a
+        well.
+    window : int, optional
+        Window length in samples.
+    threshold : float, optional
+        Number of robust standard deviations beyond which a sample is a
+        spike.
+    chunksize : int, optional
+        See :func:`rolling_median`.
+
+    Returns
+    -------
+    flags : array_like
+        Boolean array with the shape of `curves`, True at the spikes.
+    median : array_like
+        The rolling median, e.g. for :func:`despike`.
+    """
+    median, mad = _rolling(curves, window, chunksize, mad=True)
+    with np.errstate(invalid="ignore"):
+        mad *= threshold * MAD_SCALE
+        return np.abs(curves - median) > mad, median
+
+
+def bad_hole_flags(
+    caliper: Annotated[np.array, "Caliper log (in)"],
+    bit_size: Annotated[np.array, "Bit size (in)"],
+    tolerance: Annotated[float, "Allowed enlargement (in)"] = 1.0,
+    drho: Annotated[np.array, "Density correction log (g/cm3)"] = None,
+    drho_limit: Annotated[float, "Largest acceptable density correction (g/cm3)"] = 0.15) -> np.array:
+    """Flag bad hole (washouts) from the caliper and density correction.
+
+    Parameters
+    ----------
+    caliper : array_like
+        Caliper log (in).
+    bit_size : array_like
+        Bit size (in), a constant or the BS curve.
+    tolerance : float, optional
+        Hole enlargement over the bit size above which the hole is bad.
+    drho : array_like, optional
+        Density correction log. Samples whose absolute correction exceeds
+        `drho_limit` are also flagged.
+    drho_limit : float, optional
+        Largest acceptable absolute density correction (g/cm3).
+
+    Returns
+    -------
+    flags : array_like
+        Boolean array, True where the hole is bad. Samples with a missing
+        caliper are not flagged.
+    """
+    with np.errstate(invalid="ignore"):
+        flags = np.subtract(caliper, bit_size) > tolerance
+        if drho is not None:
+            flags |= np.abs(drho) > drho_limit
+    return flags
+
+
+def despike(
+    curves: Annotated[np.array, "Curve or (n_curves, n_samples) stack of curves"],
+    flags: Annotated[np.array, "Samples to be repaired"],
+    depth: Annotated[np.array, "Depth of the samples"] = None,
+    method: Annotated[str, "Repair method"] = "interpolate",
+    median: Annotated[np.array, "Rolling median of the curves"] = None,
+    window: Annotated[int, "Window length (samples)"] = 11) -> np.array:
+    """Repair the flagged samples of the curves.
+
+    Parameters
+    ----------
+    curves : array_like
+        A curve, or a ``(n_curves, n_samples)`` array with every curve of a
+        well.
+    flags : array_like
+        Boolean array, True at the samples to be repaired. A 1D array
+        applies to every curve.
+    depth : array_like, optional
+        Depth of the samples, used by the interpolation. Default is the
+        sample index.
+    method : str, optional
+        Repair method. Should be one of
+            - 'interpolate': linear interpolation between the nearest good
+              samples of the same curve (held constant past the ends).
+            - 'median': replacement by the rolling median.
+            - 'nan': replacement by NaN.
+    median : array_like, optional
+        Rolling median of the curves for the 'median' method. It is
+        computed with `window` if not given.
+    window : int, optional
+        Window length of the rolling median.
+
+    Returns
+    -------
+    repaired : array_like
+        A copy of `curves` with the flagged samples repaired. Samples that
+        were NaN and are not flagged stay NaN.
+    """
+    if method not in ("interpolate", "median", "nan"):
+        raise ValueError(f"Unknown despike method '{method}'. Use 'interpolate', 'median' or 'nan'")
+    shape = np.shape(curves)
+    x = _as_curves(curves).copy()
+    flags = np.broadcast_to(flags, shape).reshape(x.shape)
+
+    if method == "nan":
+        x[flags] = np.nan
+    elif method == "median":
+        if median is None:
+            median = rolling_median(curves, window)
+        x[flags] = np.reshape(median, x.shape)[flags]
+    else:
+        position = np.arange(x.shape[1], dtype=float) if depth is None else np.asarray(depth, dtype=float)
+        good = ~flags & ~np.isnan(x)
+        for i in np.flatnonzero(flags.any(axis=1)):
+            if good[i].any():
+                x[i, flags[i]] = np.interp(position[flags[i]], position[good[i]], x[i, good[i]])
+            else:
+                x[i, flags[i]] = np.nan
+
+    return x.reshape(shape)
+
+
+def log_qc(
+    well: Annotated[dict, "Curves of a well keyed by mnemonic"],
+    window: Annotated[int, "Window length (samples)"] = 11,
+    threshold: Annotated[float, "Number of robust standard deviations"] = 3.5,
+    caliper: Annotated[str, "Mnemonic of the caliper"] = None,
+    bit_size: Annotated[float, "Bit size (in) or its mnemonic"] = None,
+    tolerance: Annotated[float, "Allowed enlargement (in)"] = 1.0,
+    drho: Annotated[str, "Mnemonic of the density correction"] = None,
+    drho_limit: Annotated[float, "Largest acceptable density correction (g/cm3)"] = 0.15,
+    depth: Annotated[str, "Mnemonic of the depth"] = None,
+    method: Annotated[str, "Repair method"] = "interpolate",
+    bad_hole_curves: Annotated[list, "Curves repaired in bad hole"] = (),
+    skip: Annotated[list, "Curves left untouched"] = _SKIP,
+    chunksize: Annotated[int, "Window elements selected at once"] = None) -> tuple:
+    """QC every curve of a well at once: spikes, bad hole and repair.
+
+    The curves are stacked into a ``(n_curves, n_samples)`` array so the
+    rolling medians of the whole well are computed together.
+
+    Parameters
+    ----------
+    well : dict
+        Curves of the well keyed by mnemonic, either arrays or the
+        ``{'data': array, 'unit': str}`` entries of
+        :attr:`stoneforge.preprocessing.project.well_data`.
+    window : int, optional
+        Window length of the spike detector (samples).
+    threshold : float, optional
+        Spike threshold in robust standard deviations.
+    caliper : str, optional
+        Mnemonic of the caliper. Bad hole is only flagged when it and
+        `bit_size` are given.
+    bit_size : float or str, optional
+        Bit size (in), or the mnemonic of the bit size curve.
+    tolerance : float, optional
+        Hole enlargement over the bit size above which the hole is bad.
+    drho : str, optional
+        Mnemonic of the density correction log.
+    drho_limit : float, optional
+        Largest acceptable absolute density correction (g/cm3).
+    depth : str, optional
+        Mnemonic of the depth, used by the interpolation.
+    method : str, optional
+        Repair method, see :func:`despike`.
+    bad_hole_curves : list, optional
+        Mnemonics of the curves that are also repaired where the hole is
+        bad, e.g. ``['RHOB', 'NPHI']``.
+    skip : list, optional
+        Mnemonics of the curves that are neither flagged nor repaired.
+    chunksize : int, optional
+        See :func:`rolling_median`.
+
+    Returns
+    -------
+    repaired : dict
+        The repaired curves keyed by mnemonic (skipped curves unchanged).
+    flags : dict
+        Boolean arrays keyed by mnemonic with the repaired samples, plus
+        'BAD_HOLE' when bad hole was evaluated.
+
+    Example
+    -------
+    >>> proj = project('path/to/well/logs')
+    >>> proj.import_folder(ext='.las')
+    >>> proj.import_several_wells()
+    >>> curves, flags = log_qc(proj.well_data['well1'], caliper='CALI', bit_size=12.25,
+    ...                        drho='DRHO', depth='DEPT', bad_hole_curves=['RHOB', 'NPHI'])
+    """
+    data = {name: np.asarray(curve["data"] if isinstance(curve, dict) else curve) for name, curve in well.items()}
+    names = [name for name in data if name not in skip]
+    if not names:
+        return dict(data), {}
+
+    stack = np.stack([data[name] for name in names]).astype(np.float64, copy=False)
+    flags, median = hampel(stack, window, threshold, chunksize)
+
+    result = {}
+    if caliper is not None and bit_size is not None:
+        bs = data[bit_size] if isinstance(bit_size, str) else bit_size
+        bad = bad_hole_flags(data[caliper], bs, tolerance, None if drho is None else data[drho], drho_limit)
+        for name in bad_hole_curves:
+            flags[names.index(name)] |= bad
+        result["BAD_HOLE"] = bad
+
+    repaired = despike(stack, flags, None if depth is None else data[depth], method, median)
+    curves = dict(data)
+    for i, name in enumerate(names):
+        curves[name] = repaired[i]
+        result[name] = flags[i]
+
+    return curves, result
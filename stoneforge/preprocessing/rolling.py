@@ -0,0 +1,343 @@
+import numpy as np
+from typing import Annotated
+
+
+def window_bounds(
+    size: Annotated[int, "Number of samples"],
+    window: Annotated[float, "Window length (samples or depth units)"],
+    depth: Annotated[np.array, "Increasing depth of the samples"] = None) -> tuple:
+    """Half-open bounds ``[lo, hi)`` of the centred window of every sample.
+
+    Parameters
+    ----------
+    size : int
+        Number of samples.
+    window : int or float
+        Window length. Without `depth` it is a number of samples (even
+        lengths are increased by one so the window is centred); with
+        `depth` it is a length in depth units, and the window of a sample
+        holds every sample within ``window / 2`` of its depth.
+    depth : array_like, optional
+        Increasing depth of the samples. The sampling may be irregular.
+
+    Returns
+    -------
+    lo, hi : array_like
+        Index of the first sample of each window and one past its last.
+    """
+    if window <= 0:
+        raise ValueError("window must be positive")
+    if depth is None:
+        half = int(window) // 2
+        index = np.arange(size)
+        return np.maximum(index - half, 0), np.minimum(index + half + 1, size)
+
+    depth = np.asarray(depth, dtype=float)
+    if depth.shape != (size,):
+        raise ValueError(f"depth must have shape ({size},), got {depth.shape}")
+    if np.any(np.diff(depth) < 0) or np.isnan(depth).any():
+        raise ValueError("depth must be increasing and without NaN")
+    lo = np.searchsorted(depth, depth - 0.5 * window, side="left")
+    hi = np.searchsorted(depth, depth + 0.5 * window, side="right")
+    return lo, hi
+
+
+class rolling():
+    """Rolling-window statistics of a curve with NaN masking.
+
+    The window of every sample is reduced to its bounds ``[lo, hi)``, so
+    windows of a fixed number of samples and depth windows on irregular
+    sampling are handled alike. Every statistic is then answered for all
+    the windows at once from a structure built once per curve:
+
+    - mean and variance from prefix Welford moments restarted every
+      window length, so long or drifting records do not lose precision,
+      O(n);
+    - minimum and maximum from a sparse table of the NaN-ignoring
+      extremes of power of two blocks, O(n log w);
+    - quantiles from a wavelet matrix over the ranks of the samples, an
+      order-statistics structure that finds the k-th smallest value of any
+      window in O(log n) vectorised steps.
+
+    NaN samples are excluded from the windows; statistics of windows with
+    fewer than `min_periods` valid samples are NaN. The structures are
+    built on first use and reused by later calls.
+
+    Example
+    -------
+    >>> roll = rolling(gr, window=15.0, depth=depth)  # 15 m windows
+    >>> baseline = roll.quantile(0.5)
+    >>> noise = roll.std()
+    >>> p10, p90 = roll.quantile([0.1, 0.9])
+    """
+
+    def __init__(
+        self,
+        curve : Annotated [np.array, "Curve"],
+        window : Annotated [float, "Window length (samples or depth units)"],
+        depth : Annotated [np.array, "Increasing depth of the samples"] = None,
+        min_periods : Annotated [int, "Valid samples required in a window"] = 1):
+        """Prepares the windows of the curve.
+
+        Parameters
+        ----------
+        curve : array_like
+            The curve, with NaN at the missing samples.
+        window : int or float
+            Window length in samples, or in depth units when `depth` is
+            given (see :func:`window_bounds`).
+        depth : array_like, optional
+            Increasing depth of the samples.
+        min_periods : int, optional
+            Minimum number of valid samples of a window for its statistics
+            not to be NaN.
+        """
+
+        self.curve = np.asarray(curve, dtype=float)
+        if self.curve.ndim != 1:
+            raise ValueError("curve must be one-dimensional")
+        self.lo, self.hi = window_bounds(self.curve.size, window, depth)
+        self.min_periods = max(int(min_periods), 1)
+
+        self._valid = ~np.isnan(self.curve)
+        prefix = np.zeros(self.curve.size + 1, dtype=np.intp)
+        np.cumsum(self._valid, out=prefix[1:])
+        self.count = prefix[self.hi] - prefix[self.lo]
+        self._moments = None
+        self._tables = None
+        self._matrix = None
+
+    # ============================================ #
+
+    def _finish(self, values):
+        values[self.count < self.min_periods] = np.nan
+        return values
+
+    def _prefix_moments(self):
+        """Count, mean and M2 (Welford) of the valid samples of each block.
+
+        The prefix moments restart every `_block` samples, the longest
+        window, and each block is centred on its own mean, so the sums only
+        grow over one window length whatever the length (or drift) of the
+        record. Row k holds the moments of samples ``[k*block, k*block + o)``
+        for every offset o.
+        """
+        if self._moments is None:
+            size = self.curve.size
+            block = max(int((self.hi - self.lo).max()) if size else 1, 1)
+            n_blocks = max(-(-size // block), 1)
+            pad = n_blocks * block - size
+            valid = np.pad(self._valid, (0, pad)).reshape(n_blocks, block)
+            x = np.pad(np.where(self._valid, self.curve, 0.0), (0, pad)).reshape(n_blocks, block)
+
+            total = valid.sum(axis=1)
+            shift = x.sum(axis=1) / np.maximum(total, 1)
+            x = np.where(valid, x - shift[:, None], 0.0)
+
+            count = np.zeros((n_blocks, block + 1))
+            np.cumsum(valid, axis=1, out=count[:, 1:])
+            mean = np.zeros((n_blocks, block + 1))
+            np.cumsum(x, axis=1, out=mean[:, 1:])
+            np.divide(mean, count, out=mean, where=count > 0)
+            # Welford: M2_k = M2_{k-1} + (x_k - mean_{k-1}) * (x_k - mean_k)
+            m2 = np.zeros((n_blocks, block + 1))
+            np.cumsum((x - mean[:, :-1]) * (x - mean[:, 1:]) * valid, axis=1, out=m2[:, 1:])
+            self._block = block
+            self._moments = (count, mean, m2, shift)
+        return self._moments
+
+    def _window_moments(self):
+        """Count, mean and M2 of every window.
+
+        A window spans at most two blocks. Its part in the first block is
+        found by inverting Chan's merge of two prefixes of that block, and
+        it is merged with the prefix of the next block it reaches.
+        """
+        count, mean, m2, shift = self._prefix_moments()
+        block = self._block
+        k = self.lo // block
+        b = self.lo - k * block
+        a = np.minimum(self.hi - k * block, block)
+
+        n_a, n_b = count[k, a], count[k, b]
+        n_first = n_a - n_b
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean_first = (n_a * mean[k, a] - n_b * mean[k, b]) / n_first
+            delta = mean_first - mean[k, b]
+            m2_first = m2[k, a] - m2[k, b] - delta * delta * n_b * n_first / n_a
+        empty = n_first == 0
+        mean_first[empty], m2_first[empty] = 0.0, 0.0
+        mean_first += shift[k]
+
+        # part of the window in the next block
+        spill = np.maximum(self.hi - (k + 1) * block, 0)
+        nxt = np.minimum(k + 1, len(count) - 1)
+        n_second = np.where(spill > 0, count[nxt, spill], 0.0)
+        mean_second = np.where(n_second > 0, mean[nxt, spill] + shift[nxt], 0.0)
+        m2_second = np.where(n_second > 0, m2[nxt, spill], 0.0)
+
+        n = n_first + n_second
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean_w = (n_first * mean_first + n_second * mean_second) / n
+            delta = mean_second - mean_first
+            m2_w = m2_first + m2_second + delta * delta * n_first * n_second / n
+        np.maximum(m2_w, 0.0, out=m2_w)
+        return n, mean_w, m2_w
+
+    # ============================================ #
+
+    def mean(self) -> np.array:
+        """Rolling mean.
+
+        Returns
+        -------
+        mean : array_like
+            Mean of the valid samples of each window.
+        """
+        _, mean, _ = self._window_moments()
+        return self._finish(mean)
+
+    def var(
+        self,
+        ddof : Annotated [int, "Delta degrees of freedom"] = 1) -> np.array:
+        """Rolling variance from block-wise Welford moments.
+
+        Parameters
+        ----------
+        ddof : int, optional
+            Delta degrees of freedom; the divisor is ``count - ddof``.
+
+        Returns
+        -------
+        var : array_like
+            Variance of the valid samples of each window.
+        """
+        n, _, m2 = self._window_moments()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            var = m2 / (n - ddof)
+        var[n - ddof <= 0] = np.nan
+        return self._finish(var)
+
+    def std(
+        self,
+        ddof : Annotated [int, "Delta degrees of freedom"] = 1) -> np.array:
+        """Rolling standard deviation, see :meth:`var`."""
+        return np.sqrt(self.var(ddof))
+
+    # ============================================ #
+
+    def _extreme(self, ufunc):
+        """NaN-ignoring extreme of every window from a sparse table."""
+        if self._tables is None:
+            self._tables = {}
+        if ufunc not in self._tables:
+            longest = int((self.hi - self.lo).max()) if self.curve.size else 1
+            table = [self.curve]
+            span = 1
+            while 2 * span <= longest:
+                previous = table[-1]
+                table.append(ufunc(previous[:-span], previous[span:]))
+                span *= 2
+            self._tables[ufunc] = table
+
+        table = self._tables[ufunc]
+        length = np.maximum(self.hi - self.lo, 1)
+        level = np.log2(length).astype(np.intp)
+        level = np.minimum(level, len(table) - 1)
+        out = np.empty(self.curve.size)
+        for k in np.unique(level):
+            rows = np.flatnonzero(level == k)
+            span = 1 << k
+            out[rows] = ufunc(table[k][self.lo[rows]], table[k][self.hi[rows] - span])
+        return self._finish(out)
+
+    def min(self) -> np.array:
+        """Rolling minimum of the valid samples of each window."""
+        return self._extreme(np.fmin)
+
+    def max(self) -> np.array:
+        """Rolling maximum of the valid samples of each window."""
+        return self._extreme(np.fmax)
+
+    # ============================================ #
+
+    def _wavelet_matrix(self):
+        """Wavelet matrix over the ranks of the samples (NaN ranked last).
+
+        Level l stores, for the sequence of ranks reordered by the higher
+        bits, the prefix count of zeros of bit ``levels - 1 - l``; stably
+        moving the zeros first gives the sequence of the next level.
+        """
+        if self._matrix is None:
+            size = self.curve.size
+            order = np.argsort(self.curve, kind="stable")
+            ranks = np.empty(size, dtype=np.intp)
+            ranks[order] = np.arange(size)
+            levels = max(1, int(size - 1).bit_length())
+            zeros = np.zeros((levels, size + 1), dtype=np.intp)
+            for level in range(levels):
+                bit = (ranks >> (levels - 1 - level)) & 1
+                np.cumsum(bit == 0, out=zeros[level, 1:])
+                ranks = np.concatenate([ranks[bit == 0], ranks[bit == 1]])
+            self._matrix = (order, zeros)
+        return self._matrix
+
+    def _kth(self, lo, hi, k):
+        """Index of the k-th smallest sample (0-based) of each window."""
+        order, zeros = self._wavelet_matrix()
+        levels = len(zeros)
+        rank = np.zeros(lo.size, dtype=np.intp)
+        for level in range(levels):
+            z = zeros[level]
+            z_lo, z_hi = z[lo], z[hi]
+            n_zeros = z_hi - z_lo
+            one = k >= n_zeros
+            k = np.where(one, k - n_zeros, k)
+            lo = np.where(one, z[-1] + lo - z_lo, z_lo)
+            hi = np.where(one, z[-1] + hi - z_hi, z_hi)
+            rank |= one.astype(np.intp) << (levels - 1 - level)
+        return order[rank]
+
+    def quantile(
+        self,
+        q : Annotated [float, "Quantile(s) in [0, 1]"]) -> np.array:
+        """Rolling quantiles from the wavelet matrix.
+
+        NaN samples rank after every valid one, so the k-th smallest sample
+        of a window with ``count`` valid samples is valid for any
+        ``k < count``. Quantiles are interpolated linearly between order
+        statistics, as ``np.nanquantile``.
+
+        Parameters
+        ----------
+        q : float or array_like
+            Quantile or sequence of quantiles, in [0, 1].
+
+        Returns
+        -------
+        quantile : array_like
+            Rolling quantile, with shape ``(len(q), n_samples)`` when `q` is
+            a sequence.
+        """
+        q = np.asarray(q, dtype=float)
+        if np.any((q < 0) | (q > 1)):
+            raise ValueError("Quantiles must be in the range [0, 1]")
+
+        out = np.full(q.shape + self.curve.shape, np.nan)
+        rows = np.flatnonzero(self.count >= self.min_periods)
+        lo, hi, count = self.lo[rows], self.hi[rows], self.count[rows]
+        for i, value in np.ndenumerate(q):
+            position = value * (count - 1)
+            below = np.floor(position).astype(np.intp)
+            fraction = position - below
+            result = self.curve[self._kth(lo, hi, below)]
+            inner = np.flatnonzero(fraction > 0)
+            if inner.size:
+                above = self.curve[self._kth(lo[inner], hi[inner], below[inner] + 1)]
+                result[inner] += fraction[inner] * (above - result[inner])
+            out[i][rows] = result
+        return out
+
+    def median(self) -> np.array:
+        """Rolling median, see :meth:`quantile`."""
+        return self.quantile(0.5)
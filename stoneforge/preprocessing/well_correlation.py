@@ -0,0 +1,317 @@
+import numpy as np
+from typing import Annotated
+
+# Working memory (bytes) of the step codes of one group of aligned wells.
+DEFAULT_DTW_BYTES = 256 * 2**20
+
+# Step codes of the warping path.
+_DIAGONAL, _UP, _LEFT = 0, 1, 2
+
+_METRICS = ("absolute", "squared", "categorical")
+
+
+def _prepare(curve, metric, normalize):
+    """Float copy of a curve with the gaps interpolated (and z-scored)."""
+    curve = np.asarray(curve, dtype=float).ravel()
+    if metric == "categorical":
+        return curve
+    valid = ~np.isnan(curve)
+    if not valid.any():
+        raise ValueError("A curve without valid samples cannot be aligned")
+    if not valid.all():
+        index = np.arange(curve.size)
+        curve = np.interp(index, index[valid], curve[valid])
+    if normalize:
+        std = curve.std()
+        curve = (curve - curve.mean()) / (std if std > 0 else 1.0)
+    return curve
+
+
+def _downsample(curve, metric):
+    """Halve the sampling of a curve (pair means, or every other class)."""
+    if metric == "categorical":
+        return curve[::2]
+    even = curve[: curve.size - curve.size % 2].reshape(-1, 2).mean(axis=1)
+    return np.concatenate([even, curve[-1:]]) if curve.size % 2 else even
+
+
+def _cost(a, b, metric):
+    if metric == "absolute":
+        return np.abs(b - a)
+    if metric == "squared":
+        return (b - a)**2
+    return (b != a).astype(float)
+
+
+def _band_windows(n, lengths, band):
+    """Sakoe-Chiba windows: `band` columns on each side of the diagonal."""
+    lengths = np.asarray(lengths)
+    if band is None:
+        width = int(lengths.max())
+        return np.zeros((len(lengths), n), dtype=np.intp), width
+    width = 2 * int(band) + 1
+    centre = np.rint(np.arange(n)[None, :] * ((lengths[:, None] - 1) / max(n - 1, 1))).astype(np.intp)
+    lo = np.clip(centre - int(band), 0, np.maximum(lengths[:, None] - width, 0))
+    return lo, width
+
+
+def _path_windows(first, last, lengths, n, radius):
+    """Windows around a coarse path projected on a grid twice as fine."""
+    rows = np.minimum(np.arange(n) // 2, first.shape[1] - 1)
+    lo = np.maximum(2 * first[:, rows] - radius, 0)
+    hi = np.minimum(2 * last[:, rows] + 2 + radius, lengths[:, None])
+    lo = np.maximum.accumulate(lo, axis=1)
+    return lo, int((hi - lo).max())
+
+
+def _dtw_windows(reference, targets, lengths, lo, width, metric):
+    """Cumulative costs over per-row windows of all targets at once.
+
+    Row i of target w covers columns ``lo[w, i] : lo[w, i] + width``. The
+    vertical and diagonal predecessors come from the previous row, and the
+    horizontal recurrence ``D[j] = c[j] + min(U[j], D[j-1])`` within a row
+    is solved for all its cells at once as
+    ``D = C + minimum.accumulate(U - C + c)``, with ``C`` the running sum
+    of the row costs. Every row is one set of vectorised operations over
+    the ``(n_targets, width)`` windows.
+    """
+    n_wells = len(targets)
+    n = reference.size
+    padded = np.full((n_wells, int(lengths.max()) + width), np.nan)
+    for w, target in enumerate(targets):
+        padded[w, :target.size] = target
+    wells = np.arange(n_wells)[:, None]
+    offsets = np.arange(width)
+
+    steps = np.empty((n, n_wells, width), dtype=np.int8)
+    previous = np.full((n_wells, width), np.inf)
+    previous_lo = lo[:, 0]
+    for i in range(n):
+        cols = lo[:, i, None] + offsets
+        inside = cols < lengths[:, None]
+        cost = np.where(inside, _cost(reference[i], padded[wells, cols], metric), 0.0)
+
+        if i == 0:
+            up = np.full((n_wells, width), np.inf)
+            up[:, 0] = 0.0
+            diagonal = np.full((n_wells, width), np.inf)
+        else:
+            shift = (lo[:, i] - previous_lo)[:, None] + offsets
+            up = np.where(shift < width, np.take_along_axis(previous, np.minimum(shift, width - 1), axis=1), np.inf)
+            back = shift - 1
+            ok = (back >= 0) & (back < width)
+            diagonal = np.where(ok, np.take_along_axis(previous, np.clip(back, 0, width - 1), axis=1), np.inf)
+
+        direct = np.minimum(diagonal, up)
+        running = np.cumsum(cost, axis=1)
+        current = running + np.minimum.accumulate(direct - running + cost, axis=1)
+        current[~inside] = np.inf
+
+        left = np.full((n_wells, width), np.inf)
+        left[:, 1:] = current[:, :-1] + cost[:, 1:]
+        code = np.where(diagonal <= up, _DIAGONAL, _UP).astype(np.int8)
+        code[left < direct + cost] = _LEFT
+        steps[i] = code
+
+        previous, previous_lo = current, lo[:, i]
+
+    return previous, steps
+
+
+def _backtrack(steps, lo, lengths):
+    """First and last target sample matched with every reference sample."""
+    n, n_wells, _ = steps.shape
+    first = np.full((n_wells, n), np.iinfo(np.intp).max)
+    last = np.full((n_wells, n), -1)
+    i = np.full(n_wells, n - 1)
+    j = lengths - 1
+    wells = np.arange(n_wells)
+    active = np.ones(n_wells, dtype=bool)
+    while active.any():
+        w, r, c = wells[active], i[active], j[active]
+        first[w, r] = np.minimum(first[w, r], c)
+        last[w, r] = np.maximum(last[w, r], c)
+        code = steps[r, w, c - lo[w, r]]
+        done = (r == 0) & (c == 0)
+        i[w] = np.where(done | (code == _LEFT), r, r - 1)
+        j[w] = np.where(done | (code == _UP), c, c - 1)
+        active[w[done]] = False
+    return first, last
+
+
+def _pyramid_depth(n, lengths, levels):
+    """Number of coarser levels that keep every curve 4 samples or longer."""
+    depth = 0
+    shortest = min(lengths)
+    while depth < int(levels) and n >= 4 and shortest >= 4:
+        n, shortest = (n + 1) // 2, (shortest + 1) // 2
+        depth += 1
+    return depth
+
+
+def _row_width(n, length, band, depth, radius):
+    """Approximate number of columns per row at the finest level."""
+    if depth > 0:
+        # refinement window: the projected coarse run plus the radius
+        return min(length, 2 * radius + 2 * -(-length // n) + 4)
+    if band is None:
+        return length
+    return min(length, 2 * int(band) + 1)
+
+
+def _align_group(reference, curves, band, metric, depth, radius):
+    """First and last matched target sample of every reference sample."""
+    pyramid = [(reference, curves)]
+    for _ in range(depth):
+        ref, tgt = pyramid[-1]
+        pyramid.append((_downsample(ref, metric), [_downsample(c, metric) for c in tgt]))
+
+    first = last = None
+    for ref, tgt in reversed(pyramid):
+        lengths = np.array([c.size for c in tgt])
+        if first is None:
+            scale = 2**depth
+            lo, width = _band_windows(ref.size, lengths, None if band is None else max(int(band) // scale, radius))
+        else:
+            lo, width = _path_windows(first, last, lengths, ref.size, radius)
+        _, steps = _dtw_windows(ref, tgt, lengths, lo, width, metric)
+        first, last = _backtrack(steps, lo, lengths)
+    return first, last
+
+
+def dtw_batch(
+    reference: Annotated[np.array, "Curve of the type well"],
+    targets: Annotated[dict, "Curves of the wells to be aligned"],
+    band: Annotated[int, "Sakoe-Chiba band half width (samples)"] = None,
+    metric: Annotated[str, "Sample distance"] = "absolute",
+    normalize: Annotated[bool, "Z-score the curves before aligning"] = True,
+    levels: Annotated[int, "Number of coarser pyramid levels"] = 0,
+    radius: Annotated[int, "Refinement radius of the pyramid (samples)"] = 4,
+    max_bytes: Annotated[int, "Memory budget of the step codes"] = None) -> dict:
+    """Align a type well curve with many wells by dynamic time warping.
+
+    The cumulative cost matrix is only computed inside a window of columns
+    of each reference sample: the Sakoe-Chiba band around the diagonal or,
+    with a pyramid, a neighbourhood of the path found at the coarser level.
+    The targets are processed together, one reference sample (matrix row)
+    at a time, with vectorised operations over every cell of the row of
+    every target (see ``_dtw_windows``), so the Python loop runs once per
+    reference sample and group of wells.
+
+    With ``levels > 0`` the curves are halved `levels` times, aligned at the
+    coarsest sampling within the band (scaled to it), and the path is
+    refined at each finer level within `radius` samples of the projected
+    coarse path. The cost is then nearly linear in the number of samples.
+
+    The backtracking needs one byte per cell of the windows, i.e. about
+    ``n_reference x width`` bytes per well, where the width is the target
+    length without a band, ``2 * band + 1`` with one, and a few times
+    `radius` with a pyramid. The wells are aligned in groups whose step
+    codes fit in `max_bytes`. Without `band` and `levels` the whole matrix
+    is stored (e.g. 400 MB for 20000 x 20000 samples); a well that does not
+    fit in `max_bytes` raises an error, so batches of long wells need
+    `band` or `levels`.
+
+    Parameters
+    ----------
+    reference : array_like
+        Curve of the type well, e.g. GR or a facies code.
+    targets : dict or list
+        Curves of the wells to be aligned with the type well, keyed by well
+        name. Their lengths may differ.
+    band : int, optional
+        Half width of the Sakoe-Chiba band in target samples. Default is no
+        band (the full matrix).
+    metric : str, optional
+        Distance between samples. Should be one of
+            - 'absolute': ``|a - b|``.
+            - 'squared': ``(a - b)**2``.
+            - 'categorical': 0 for equal codes and 1 otherwise (facies).
+    normalize : bool, optional
+        Whether the curves are z-scored first, so wells with different tool
+        calibrations are comparable. Not used with 'categorical'.
+    levels : int, optional
+        Number of coarser levels of the downsampling pyramid.
+    radius : int, optional
+        Half width of the refinement window around the projected path.
+    max_bytes : int, optional
+        Memory budget of the step codes of a group of wells. Default is
+        `DEFAULT_DTW_BYTES`.
+
+    Returns
+    -------
+    alignments : dict
+        For each target, a dictionary containing the following keys:
+        - 'index': The target sample matched with each reference sample
+          (the centre of the matched run of samples).
+        - 'path': The ``(k, 2)`` array of matched (reference, target)
+          sample pairs of the warping path.
+        - 'distance': The cost of the path divided by its length.
+
+    Example
+    -------
+    >>> wells = {name: proj.well_data[name]['GR']['data'] for name in proj.well_data}
+    >>> result = dtw_batch(type_gr, wells, band=500, levels=3)
+    >>> depth_b = np.interp(result['well2']['index'], np.arange(len(depth2)), depth2)
+    """
+    if metric not in _METRICS:
+        raise ValueError(f"Unknown metric '{metric}'. Use one of {list(_METRICS)}")
+    if max_bytes is None:
+        max_bytes = DEFAULT_DTW_BYTES
+    names = list(targets) if isinstance(targets, dict) else list(range(len(targets)))
+    if not names:
+        return {}
+    curves = [_prepare(targets[name], metric, normalize) for name in names]
+    reference = _prepare(reference, metric, normalize)
+
+    # the same pyramid depth for every group keeps the result independent of the grouping
+    depth = _pyramid_depth(reference.size, [c.size for c in curves], levels)
+    cost = [reference.size * _row_width(reference.size, c.size, band, depth, radius) for c in curves]
+    if max(cost) > max_bytes:
+        raise ValueError(f"Aligning a well needs about {max(cost)} bytes, more than max_bytes={max_bytes}. "
+                         "Give a band or pyramid levels, or increase max_bytes")
+
+    groups, group = [], []
+    for w in range(len(curves)):
+        # the windows of a group are as wide as the widest of its wells
+        widest = max([cost[w]] + [cost[v] for v in group])
+        if group and widest * (len(group) + 1) > max_bytes:
+            groups.append(group)
+            group = []
+        group.append(w)
+    groups.append(group)
+
+    result = {}
+    for group in groups:
+        first, last = _align_group(reference, [curves[w] for w in group], band, metric, depth, radius)
+        for g, w in enumerate(group):
+            rows = np.repeat(np.arange(reference.size), last[g] - first[g] + 1)
+            cols = np.concatenate([np.arange(a, b + 1) for a, b in zip(first[g], last[g])])
+            path_cost = _cost(reference[rows], curves[w][cols], metric).sum()
+            result[names[w]] = {
+                "index": 0.5 * (first[g] + last[g]),
+                "path": np.column_stack([rows, cols]),
+                "distance": path_cost / rows.size,
+            }
+    return {name: result[name] for name in names}
+
+
+def dtw(
+    reference: Annotated[np.array, "Curve of the type well"],
+    target: Annotated[np.array, "Curve of the well to be aligned"],
+    band: Annotated[int, "Sakoe-Chiba band half width (samples)"] = None,
+    metric: Annotated[str, "Sample distance"] = "absolute",
+    normalize: Annotated[bool, "Z-score the curves before aligning"] = True,
+    levels: Annotated[int, "Number of coarser pyramid levels"] = 0,
+    radius: Annotated[int, "Refinement radius of the pyramid (samples)"] = 4,
+    max_bytes: Annotated[int, "Memory budget of the step codes"] = None) -> dict:
+    """Align two well curves by dynamic time warping.
+
+    See :func:`dtw_batch`, which this calls with a single target.
+
+    Returns
+    -------
+    alignment : dict
+        The 'index', 'path' and 'distance' of the alignment.
+    """
+    return dtw_batch(reference, [target], band, metric, normalize, levels, radius, max_bytes)[0]
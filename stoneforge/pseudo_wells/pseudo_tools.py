@@ -37,16 +37,20 @@ def synthetic_log(stats, lithology = False, seed=42):
 
 def moving_average(curve, step=100):
     """Note: only works in odd step values, but it's very fast
+
+    The window sums are differences of a cumulative sum of the edge padded
+    curve, so the cost does not depend on `step`. For NaN-aware and depth
+    based windows see :class:`stoneforge.preprocessing.rolling`.
     """
     # Convert input curve to numpy array
-    curve_array = np.array(curve)
+    curve_array = np.array(curve, dtype=float)
     step = step + step%2
 
     extended_curve = np.pad(curve_array, (step//2, step//2), mode='edge')
 
-    rolled = np.lib.stride_tricks.sliding_window_view(extended_curve, window_shape=(step+1,))
+    cumulative = np.concatenate([[0.0], np.cumsum(extended_curve - curve_array[0])])
     
-    smooth_curve = np.mean(rolled, axis=1)
+    smooth_curve = (cumulative[step+1:] - cumulative[:-step-1]) / (step+1) + curve_array[0]
 
     return smooth_curve
 
@@ -3,7 +3,9 @@
 import numpy as np
 from typing import Annotated
 import warnings
+from stoneforge.precision import precision_policy, float_array
 
+@precision_policy
 def net_pay_siliciclastic(
         vsh: Annotated[np.array, "shaliness log data"],
         phi: Annotated[np.array, "porosity log data"],
@@ -47,6 +49,7 @@ def net_pay_siliciclastic(
 
     return {'rock': rock, 'res': res, 'pay': pay}
 
+@precision_policy
 def cutoff(
         log: Annotated[np.array, "well log data"],
         t: Annotated[float, "threshold value"],
@@ -79,14 +82,253 @@ def cutoff(
     The function applies a cutoff to the input log data based on the specified threshold value `t`. The cutoff is applied either to values below or above the threshold, depending on the `lower` parameter. If `equal` is True, values equal to the threshold are included in the cutoff condition. If `fillzeros` is True, values that do not meet the cutoff condition are filled with zeros; otherwise, they are filled with NaN.
     """
 
-    log = np.asarray(log, dtype=float)
+    log = float_array(log)
 
     if lower:
         mask = log <= t if equal else log < t
     else:
         mask = log >= t if equal else log > t
 
-    if fillzeros:
-        return np.where(mask, 1.0, 0.0)
+    flags = np.full(log.shape, 0.0 if fillzeros else np.nan, dtype=log.dtype)
+    flags[mask] = 1.0
 
-    return np.where(mask, 1.0, np.nan)
\ No newline at end of file
+    return flags
+
+
+def _cell_edges(depth):
+    """Boundaries of the depth cells of each sample: midway between samples,
+    half a step beyond the first and last ones. Handles irregular sampling."""
+    if depth.size < 2:
+        return np.concatenate([depth, depth])
+    mid = 0.5 * (depth[1:] + depth[:-1])
+    return np.concatenate([[1.5*depth[0] - 0.5*depth[1]], mid, [1.5*depth[-1] - 0.5*depth[-2]]])
+
+
+def pay_prefix_sums(
+        depth: Annotated[np.array, "depth of the log samples"],
+        vsh: Annotated[np.array, "shaliness log data"],
+        phi: Annotated[np.array, "porosity log data"],
+        sw: Annotated[np.array, "water saturation log data"],
+        vsh_t: Annotated[float, "shaliness threshold"] = 0.3,
+        phi_t: Annotated[float, "porosity threshold"] = 0.20,
+        sw_t: Annotated[float, "water saturation threshold"] = 0.3) -> dict:
+
+    """Builds the depth-weighted cumulative sums used by :func:`interval_summary`.
+
+    Each sample stands for the depth cell between the midpoints to its
+    neighbours, so irregular sampling is weighted by the actual thickness.
+    The flags follow :func:`net_pay_siliciclastic`; samples with missing
+    logs do not count as reservoir or pay.
+
+    Parameters
+    ----------
+    depth : array_like
+        Depth of the log samples, increasing or decreasing.
+    vsh : array_like
+        Shaliness log data (dimensionless).
+    phi : array_like
+        Porosity log data (dimensionless).
+    sw : array_like
+        Water saturation log data (dimensionless).
+    vsh_t : float, optional
+        Shaliness threshold value. Default is 0.3.
+    phi_t : float, optional
+        Porosity threshold value. Default is 0.20.
+    sw_t : float, optional
+        Water saturation threshold value. Default is 0.3.
+
+    Returns
+    -------
+    dict
+        A dictionary containing the following keys:
+        - 'edges': The increasing depth boundaries of the sample cells.
+        - 'net_reservoir', 'net_pay': The cumulative reservoir and pay thickness at each edge.
+        - 'phih_reservoir', 'phih_pay': The cumulative porosity-thickness over reservoir and pay.
+        - 'hcpv': The cumulative hydrocarbon pore thickness, phi*(1 - sw)*h, over pay.
+    """
+
+    depth = np.asarray(depth, dtype=np.float64)
+    logs = [np.asarray(x, dtype=np.float64) for x in (vsh, phi, sw)]
+    if depth.size > 1 and depth[0] > depth[-1]:
+        depth = depth[::-1]
+        logs = [x[::-1] for x in logs]
+    vsh, phi, sw = logs
+
+    flags = net_pay_siliciclastic(vsh, phi, sw, vsh_t=vsh_t, phi_t=phi_t, sw_t=sw_t, fillzeros=True)
+    edges = _cell_edges(depth)
+    h = np.diff(edges)
+    phi = np.nan_to_num(phi)
+
+    res = flags['res'] * h
+    pay = flags['pay'] * h
+    terms = {
+        'net_reservoir': res,
+        'net_pay': pay,
+        'phih_reservoir': phi * res,
+        'phih_pay': phi * pay,
+        'hcpv': phi * np.nan_to_num(1 - sw) * pay,
+    }
+
+    prefix = {'edges': edges}
+    for name, values in terms.items():
+        cumulative = np.zeros(edges.size)
+        np.cumsum(values, out=cumulative[1:])
+        prefix[name] = cumulative
+    return prefix
+
+
+def interval_summary(
+        prefix: Annotated[dict, "cumulative sums from pay_prefix_sums"],
+        top: Annotated[np.array, "top depth of each interval"],
+        base: Annotated[np.array, "base depth of each interval"]) -> dict:
+
+    """Net pay and net-to-gross summaries of any number of depth intervals.
+
+    The cumulative sums are piecewise linear in depth, so the integral over
+    an interval is the difference of their values at its base and top. Each
+    interval thus costs two interpolations, whatever its length, and cells
+    cut by the interval boundaries count by their fraction inside.
+
+    Parameters
+    ----------
+    prefix : dict
+        Cumulative sums from :func:`pay_prefix_sums`.
+    top : array_like
+        Top depth of each interval (e.g. formation tops or sliding windows).
+    base : array_like
+        Base depth of each interval.
+
+    Returns
+    -------
+    dict
+        A dictionary of arrays with one value per interval:
+        - 'top', 'base': The interval limits.
+        - 'gross': The logged thickness of the interval.
+        - 'net_reservoir', 'net_pay': The reservoir and pay thickness.
+        - 'ntg', 'pay_ntg': The reservoir and pay net-to-gross ratios.
+        - 'phi_reservoir', 'phi_pay': The average porosity over reservoir and pay.
+        - 'sw_pay': The pore-volume weighted water saturation over pay.
+        - 'hcpv': The hydrocarbon pore thickness, sum of phi*(1 - sw)*h over pay.
+
+    Example
+    -------
+    >>> prefix = pay_prefix_sums(depth, vsh, phi, sw)
+    >>> zones = interval_summary(prefix, tops[:-1], tops[1:])
+    >>> windows = interval_summary(prefix, depth, depth + 10.0)
+    """
+
+    top = np.atleast_1d(np.asarray(top, dtype=np.float64))
+    base = np.atleast_1d(np.asarray(base, dtype=np.float64))
+    edges = prefix['edges']
+    lower = np.clip(np.minimum(top, base), edges[0], edges[-1])
+    upper = np.clip(np.maximum(top, base), edges[0], edges[-1])
+
+    def integral(name):
+        return np.interp(upper, edges, prefix[name]) - np.interp(lower, edges, prefix[name])
+
+    summary = {'top': top, 'base': base, 'gross': upper - lower}
+    for name in ('net_reservoir', 'net_pay', 'phih_reservoir', 'phih_pay', 'hcpv'):
+        summary[name] = integral(name)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        summary['ntg'] = summary['net_reservoir'] / summary['gross']
+        summary['pay_ntg'] = summary['net_pay'] / summary['gross']
+        summary['phi_reservoir'] = summary.pop('phih_reservoir') / summary['net_reservoir']
+        phih_pay = summary.pop('phih_pay')
+        summary['phi_pay'] = phih_pay / summary['net_pay']
+        summary['sw_pay'] = 1 - summary['hcpv'] / phih_pay
+
+    return summary
+
+
+def cutoff_sensitivity(
+        vsh: Annotated[np.array, "shaliness log data"],
+        phi: Annotated[np.array, "porosity log data"],
+        sw: Annotated[np.array, "water saturation log data"],
+        vsh_t: Annotated[np.array, "shaliness thresholds"],
+        phi_t: Annotated[np.array, "porosity thresholds"],
+        sw_t: Annotated[np.array, "water saturation thresholds"],
+        depth: Annotated[np.array, "depth of the log samples"] = None) -> dict:
+
+    """Net pay thickness for every combination of shaliness, porosity and water saturation cutoffs.
+
+    Instead of applying :func:`net_pay_siliciclastic` once per combination,
+    each sample is located once among the sorted thresholds of every log
+    (``np.searchsorted``) and its thickness is accumulated in a
+    3D histogram of these positions (``np.bincount``). Cumulative sums of
+    the histogram along its three axes then give the net pay of the whole
+    grid, so the cost is one pass over the logs plus one pass over the grid.
+    Samples with any missing log are ignored.
+
+    Parameters
+    ----------
+    vsh : array_like
+        Shaliness log data (dimensionless).
+    phi : array_like
+        Porosity log data (dimensionless).
+    sw : array_like
+        Water saturation log data (dimensionless).
+    vsh_t : array_like
+        Shaliness thresholds (rock if vsh < vsh_t).
+    phi_t : array_like
+        Porosity thresholds (reservoir if phi > phi_t).
+    sw_t : array_like
+        Water saturation thresholds (pay if sw < sw_t).
+    depth : array_like, optional
+        Depth of the log samples, used to weight each sample by the
+        thickness of its cell (see :func:`pay_prefix_sums`). If not given,
+        each sample counts as one.
+
+    Returns
+    -------
+    dict
+        A dictionary containing the following keys:
+        - 'net_pay': The net pay cube with shape (len(vsh_t), len(phi_t), len(sw_t)).
+        - 'net_reservoir': The net reservoir with shape (len(vsh_t), len(phi_t)).
+        - 'vsh_t', 'phi_t', 'sw_t': The thresholds of each axis, in the given order.
+
+    Example
+    -------
+    >>> result = cutoff_sensitivity(vsh, phi, sw, np.linspace(0.2, 0.5, 31),
+    ...                             np.linspace(0.05, 0.2, 16), np.linspace(0.3, 0.7, 41), depth=depth)
+    >>> result['net_pay'].shape
+    (31, 16, 41)
+    """
+
+    vsh, phi, sw = (np.ravel(np.asarray(x, dtype=np.float64)) for x in (vsh, phi, sw))
+    thresholds = [np.ravel(np.asarray(t, dtype=np.float64)) for t in (vsh_t, phi_t, sw_t)]
+    if depth is None:
+        h = np.ones(vsh.size)
+    else:
+        depth = np.asarray(depth, dtype=np.float64)
+        order = np.argsort(depth, kind='stable')
+        h = np.empty(depth.size)
+        h[order] = np.diff(_cell_edges(depth[order]))
+
+    valid = ~(np.isnan(vsh) | np.isnan(phi) | np.isnan(sw))
+    vsh, phi, sw, h = vsh[valid], phi[valid], sw[valid], h[valid]
+    sorted_t = [np.sort(t) for t in thresholds]
+    shape = tuple(t.size + 1 for t in sorted_t)
+
+    # a sample passes the a-th vsh and c-th sw threshold for a >= iv and
+    # c >= isw, and the b-th phi threshold for b < ip
+    iv = np.searchsorted(sorted_t[0], vsh, side='right')
+    ip = np.searchsorted(sorted_t[1], phi, side='left')
+    isw = np.searchsorted(sorted_t[2], sw, side='right')
+    hist = np.bincount(np.ravel_multi_index((iv, ip, isw), shape), weights=h,
+                       minlength=int(np.prod(shape))).reshape(shape)
+
+    np.cumsum(hist, axis=0, out=hist)
+    hist = np.flip(np.cumsum(np.flip(hist, axis=1), axis=1), axis=1)
+    np.cumsum(hist, axis=2, out=hist)
+    # index b of the phi axis holds the samples with ip > b
+    pay = hist[:-1, 1:, :-1]
+    res = hist[:-1, 1:, -1]
+
+    # back to the order of the given thresholds
+    ranks = [np.argsort(np.argsort(t, kind='stable'), kind='stable') for t in thresholds]
+    pay = pay[np.ix_(*ranks)]
+    res = res[np.ix_(ranks[0], ranks[1])]
+
+    return {'net_pay': pay, 'net_reservoir': res,
+            'vsh_t': thresholds[0], 'phi_t': thresholds[1], 'sw_t': thresholds[2]}
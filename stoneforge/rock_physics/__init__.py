@@ -1,4 +1,5 @@
 from . import rock_physics_bounds  # noqa: F401
 from . import elastic_constants  # noqa: F401
 from . import fluid_substitution  # noqa: F401
-from . import gem  # noqa: F401
\ No newline at end of file
+from . import gem  # noqa: F401
+from . import templates  # noqa: F401
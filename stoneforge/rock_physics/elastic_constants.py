@@ -2,7 +2,9 @@
 
 import numpy as np
 from typing import Annotated
+from ..precision import precision_policy
 
+@precision_policy
 def bulk_modulus(
     rho: Annotated[np.array, "Density data"],
     vp: Annotated[np.array, "Compressional velocity data"],
@@ -31,6 +33,7 @@ def bulk_modulus(
     return rho * (A - B)
 
 
+@precision_policy
 def compressional_modulus(
     rho: Annotated[np.array, "Density data"],
     vp: Annotated[np.array, "Compressional velocity data"])-> np.array:
@@ -53,6 +56,7 @@ def compressional_modulus(
     return rho * (vp)**2
 
 
+@precision_policy
 def shear_modulus(
     rho: Annotated[np.array, "Density data"],
     vs: Annotated[np.array, "Shear velocity data"]) -> np.array:
@@ -75,6 +79,7 @@ def shear_modulus(
     return rho * (vs**2)
 
 
+@precision_policy
 def shear_wave_velocity(
     rho: Annotated[np.array, "Density data"],
     u: Annotated[np.array, "Shear modulus data"]) -> np.array:
@@ -97,6 +102,7 @@ def shear_wave_velocity(
     return (u / rho)**0.5
 
 
+@precision_policy
 def compressional_wave_velocity(
     method: Annotated[str, "Chosen method to compute compressional wave velocity"] = "rhob_and_g_and_k", **kwargs) -> np.array:
     """
@@ -161,6 +167,7 @@ def compressional_wave_velocity(
     return func(**{key: kwargs[key] for key in required_args})
 
 
+@precision_policy
 def poisson(
     method: Annotated[str, "Chosen method to compute Poisson's ratio"] = "k_and_g", **kwargs) -> np.array:
     """
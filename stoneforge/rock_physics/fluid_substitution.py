@@ -2,8 +2,10 @@
 
 import numpy as np
 from typing import Annotated
+from ..precision import precision_policy
 
 
+@precision_policy
 def kdry(
     phi: Annotated[np.array, "Porosity"],
     ks: Annotated[np.array, "Bulk modulus of solid phase"],
@@ -37,6 +39,7 @@ def kdry(
     return ks * (kdry_num / kdry_den)
 
 
+@precision_policy
 def ksat(
     phi: Annotated[np.array, "Porosity"],
     ks: Annotated[np.array, "Bulk modulus of solid phase"],
@@ -70,6 +73,7 @@ def ksat(
     return ks * (ksat_num / ksat_den)
 
 
+@precision_policy
 def gassmann_subs(
     phi: Annotated[np.array, "Porosity"],
     ks: Annotated[np.array, "Bulk modulus of solid phase"],
@@ -192,6 +196,7 @@ def gassmann(
     return func(phi, ks, **method_args)
 
 
+@precision_policy
 def mdry(phi: Annotated[np.array, "Porosity"],
          ms: Annotated[np.array, "Compressional modulus of solid phase"],
          msatA: Annotated[np.array, "Compressional modulus of the rock saturated with fluid A"],
@@ -224,6 +229,7 @@ def mdry(phi: Annotated[np.array, "Porosity"],
     return ms * (mdry_num / mdry_den)
 
 
+@precision_policy
 def msat(phi: Annotated[np.array, "Porosity"],
          ms: Annotated[np.array, "Compressional modulus of solid phase"],
          mdry: Annotated[np.array, "Compressional modulus of the dry-rock"],
@@ -256,6 +262,7 @@ def msat(phi: Annotated[np.array, "Porosity"],
     return ms * (msat_num / msat_den)
 
 
+@precision_policy
 def mavko_subs(phi: Annotated[np.array, "Porosity"],
                ms: Annotated[np.array, "Compressional modulus of solid phase"],
                msatA: Annotated[np.array, "Compressional modulus of the rock saturated with fluid A"],
@@ -3,8 +3,10 @@
 import numpy as np
 from typing import Annotated
 from .elastic_constants import poisson
+from ..precision import precision_policy
 
 
+@precision_policy
 def hertz_mindlin(
     k: Annotated[float, "Bulk modulus of the mineral"],
     g: Annotated[float, "Shear modulus of the mineral"],
@@ -43,6 +45,7 @@ def hertz_mindlin(
     return khm, ghm
 
 
+@precision_policy
 def soft_sand(
     k: Annotated[float, "Bulk modulus of the mineral"],
     g: Annotated[float, "Shear modulus of the mineral"],
@@ -84,6 +87,7 @@ def soft_sand(
     return ksoft, gsoft
 
 
+@precision_policy
 def constant_cement(
     k: Annotated[float, "Bulk modulus of the mineral"],
     g: Annotated[float, "Shear modulus of the mineral"],
@@ -125,10 +129,12 @@ def constant_cement(
         Shear modulus using the constant cement model.
         
     """
-    if isinstance(phi, float):
+    scalar = np.ndim(phi) == 0
+    if scalar:
         kconst, gconst = np.zeros((1)), np.zeros((1))
     else:
-        kconst, gconst = np.zeros(phi.shape), np.zeros(phi.shape)
+        dtype = np.result_type(phi, 0.0)
+        kconst, gconst = np.zeros(phi.shape, dtype=dtype), np.zeros(phi.shape, dtype=dtype)
     
     soft_domain = phi < phib
     cement_domain = phi >= phib
@@ -136,7 +142,7 @@ def constant_cement(
     kcem, gcem = contact_cement(k, g, phi, phic, n, kc, gc, deposition_type)
     kend, gend = contact_cement(k, g, phib, phic, n, kc, gc, deposition_type)
     
-    if not isinstance(phi, float):
+    if not scalar:
         kconst[cement_domain], gconst[cement_domain] = kcem[cement_domain], gcem[cement_domain]
         
         kb, gb = kend, gend
@@ -157,6 +163,7 @@ def constant_cement(
     return kconst, gconst
 
 
+@precision_policy
 def stiff_sand(
     k: Annotated[float, "Bulk modulus of the mineral"],
     g: Annotated[float, "Shear modulus of the mineral"],
@@ -197,6 +204,7 @@ def stiff_sand(
     return kstiff, gstiff
 
 
+@precision_policy
 def contact_cement(
     k: Annotated[float, "Bulk modulus of the mineral"],
     g: Annotated[float, "Shear modulus of the mineral"],
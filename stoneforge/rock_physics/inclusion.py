@@ -1,6 +1,7 @@
 import numpy.typing as npt
 import numpy as np
 from .elastic_constants import poisson
+from ..precision import precision_policy
 
 def get_theta(alpha):
     return alpha*(np.arccos(alpha) - alpha*np.sqrt(1.0 - alpha*alpha))/(1.0 - alpha*alpha)**(3.0/2.0)
@@ -32,6 +33,7 @@ def ABR(k, g, ks, gs):
 
 
 
+@precision_policy
 def Kuster_Toksöz(phi: npt.ArrayLike, ks: npt.ArrayLike, gs: npt.ArrayLike, k: float, g: float, alpha: float):
     """Calculate bulk modulus and shear modulus using :footcite:t:`kuster-toksoz1974` equation (:footcite:t:`dvorkin2014`).
 
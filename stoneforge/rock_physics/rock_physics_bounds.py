@@ -1,6 +1,8 @@
 import numpy as np
 from typing import Annotated
+from ..precision import precision_policy
 
+@precision_policy
 def reuss(
     f: Annotated[np.array, "Fractions (proportions) of each mineral"],
     m: Annotated[np.array, "Elastic modulus of each mineral"])-> np.array:
@@ -22,6 +24,7 @@ def reuss(
     return 1 / np.sum(f/m, axis=0)
 
 
+@precision_policy
 def voigt(
     f: Annotated[np.array, "Fractions (proportions) of each mineral"],
     m: Annotated[np.array, "Elastic modulus of each mineral"])-> np.array:
@@ -43,6 +46,7 @@ def voigt(
     return np.sum(f*m, axis=0)
 
 
+@precision_policy
 def hill(
     f: Annotated[np.array, "Fractions (proportions) of each mineral"],
     m: Annotated[np.array, "Elastic modulus of each mineral"])-> np.array:
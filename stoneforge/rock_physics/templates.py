@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+from collections import OrderedDict
+import numpy as np
+from typing import Annotated
+from .gem import soft_sand, stiff_sand, contact_cement, constant_cement
+from .fluid_substitution import ksat
+from ..precision import precision_policy, get_precision
+
+# Most recently used templates, keyed by the hash of their parameters.
+_TEMPLATE_CACHE = OrderedDict()
+_CACHE_SIZE = 32
+
+_template_methods = {
+    "soft_sand": (soft_sand, ["p"]),
+    "stiff_sand": (stiff_sand, ["p"]),
+    "contact_cement": (contact_cement, ["kc", "gc"]),
+    "constant_cement": (constant_cement, ["kc", "gc", "phib"])
+}
+
+
+def _parameter_hash(*values):
+    """Hash of the parameters of a template (arrays by dtype, shape and bytes)."""
+    digest = hashlib.sha1()
+    for value in values:
+        if isinstance(value, np.ndarray):
+            digest.update(f"{value.dtype.str}{value.shape}".encode())
+            digest.update(np.ascontiguousarray(value).tobytes())
+        else:
+            digest.update(repr(value).encode())
+        digest.update(b"|")
+    return digest.hexdigest()
+
+
+def _dry_moduli(k, g, phi, phic, n, p, method, method_args):
+    """Dry-rock moduli on the (pressure, porosity) grid in one evaluation."""
+    func = _template_methods[method][0]
+    if method in ("soft_sand", "stiff_sand"):
+        # the pressure axis broadcasts through the Hertz-Mindlin moduli
+        kdry, gdry = func(k, g, phi, phic, n, p[:, None])
+    else:
+        # cemented frames do not depend on the confining pressure
+        kdry, gdry = func(k, g, phi, phic, n, **method_args)
+    shape = (p.size, phi.size)
+    return np.broadcast_to(kdry, shape).copy(), np.broadcast_to(gdry, shape).copy()
+
+
+@precision_policy
+def _evaluate(k, g, rhos, phic, n, kw, rhow, khc, rhohc, phi, sw, p, method, method_args):
+    kdry, gdry = _dry_moduli(k, g, phi, phic, n, p, method, method_args)
+
+    # (pressure, saturation, porosity) axes
+    phi3 = phi[None, None, :]
+    sw3 = sw[None, :, None]
+    kfluid = 1.0 / (sw3 / kw + (1.0 - sw3) / khc)
+    rhofluid = sw3 * rhow + (1.0 - sw3) * rhohc
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ksaturated = ksat(phi3, k, kdry[:, None, :], kfluid)
+    # without pores there is nothing to substitute
+    ksaturated = np.where(phi3 > 0, ksaturated, kdry[:, None, :])
+    gsaturated = np.broadcast_to(gdry[:, None, :], ksaturated.shape).copy()
+    rho = np.broadcast_to((1.0 - phi3) * rhos + phi3 * rhofluid, ksaturated.shape).copy()
+
+    vp = ((ksaturated + 4 / 3 * gsaturated) / rho)**0.5
+    vs = (gsaturated / rho)**0.5
+    return {
+        "kdry": kdry,
+        "gdry": gdry,
+        "k": ksaturated,
+        "g": gsaturated,
+        "rho": rho,
+        "vp": vp,
+        "vs": vs,
+        "ip": vp * rho,
+        "vpvs": vp / vs,
+    }
+
+
+def rock_physics_template(
+    k: Annotated[float, "Bulk modulus of the mineral phase"],
+    g: Annotated[float, "Shear modulus of the mineral phase"],
+    rhos: Annotated[float, "Density of the mineral phase"],
+    phic: Annotated[float, "Critical porosity [fractional]"],
+    n: Annotated[float, "Coordination number (typically 6–10)"],
+    kw: Annotated[float, "Bulk modulus of the brine"],
+    rhow: Annotated[float, "Density of the brine"],
+    khc: Annotated[float, "Bulk modulus of the hydrocarbon"],
+    rhohc: Annotated[float, "Density of the hydrocarbon"],
+    method: Annotated[str, "Granular effective medium model"] = "soft_sand",
+    phi: Annotated[np.array, "Porosity axis [fractional]"] = None,
+    sw: Annotated[np.array, "Water saturation axis [fractional]"] = None,
+    p: Annotated[np.array, "Confining pressure axis"] = None,
+    cache: Annotated[bool, "Reuse previously computed templates"] = True,
+    **kwargs) -> dict:
+    """Rock physics template over porosity, water saturation and pressure (:footcite:t:`avseth2005`).
+
+    The dry-rock moduli of the chosen granular effective medium model (see
+    :func:`stoneforge.rock_physics.gem.gem`) are computed for every pressure
+    and porosity in one broadcast evaluation, and the brine-hydrocarbon
+    mixture of every saturation (Reuss average) is substituted into the dry
+    rock with the :footcite:t:`gassmann1951` equation at once, giving
+    ``(n_pressures, n_saturations, n_porosities)`` grids.
+
+    Templates are memoised by a hash of all the parameters and of the
+    precision policy, so redrawing a template with the same inputs (e.g.
+    after changing only the plot styling) does not evaluate the models
+    again. The cached arrays are read-only; copy them before editing.
+
+    Parameters
+    ----------
+    k : float
+        Bulk modulus of the mineral phase.
+    g : float
+        Shear modulus of the mineral phase.
+    rhos : float
+        Density of the mineral phase.
+    phic : float
+        Critical porosity [fractional].
+    n : float
+        Coordination number.
+    kw : float
+        Bulk modulus of the brine.
+    rhow : float
+        Density of the brine.
+    khc : float
+        Bulk modulus of the hydrocarbon (oil or gas).
+    rhohc : float
+        Density of the hydrocarbon.
+    method : {'soft_sand', 'stiff_sand', 'contact_cement', 'constant_cement'}, default='soft_sand'
+        The granular effective medium model of the dry rock.
+    phi : array_like, optional
+        Porosity axis. Default is 100 values from 0 to `phic`.
+    sw : array_like, optional
+        Water saturation axis. Default is 0 to 1 every 0.1.
+    p : float or array_like, optional
+        Confining pressure axis. Required for 'soft_sand' and 'stiff_sand';
+        the cemented models do not depend on it and give the same values
+        at every pressure.
+    cache : bool, optional
+        Whether to return a memoised template with the same parameters.
+    kc : float, optional
+        Bulk modulus of the cement. Required for 'contact_cement' and
+        'constant_cement'.
+    gc : float, optional
+        Shear modulus of the cement. Required for 'contact_cement' and
+        'constant_cement'.
+    phib : float, optional
+        Porosity where cementation begins [fractional]. Required for
+        'constant_cement'.
+
+    Returns
+    -------
+    template : dict
+        A dictionary containing the following keys:
+        - 'phi', 'sw', 'p': The axes of the template.
+        - 'kdry', 'gdry': The dry-rock moduli, ``(n_pressures, n_porosities)``.
+        - 'k', 'g': The saturated-rock moduli.
+        - 'rho': The bulk density.
+        - 'vp', 'vs': The velocities (km/s with moduli in GPa and densities
+          in g/cm³).
+        - 'ip', 'vpvs': The P-impedance and the Vp/Vs ratio.
+
+    Raises
+    ------
+    TypeError
+        If required parameters for the selected model are missing.
+
+    ValueError
+        If an unsupported method is specified.
+
+    Examples
+    --------
+    >>> rpt = rock_physics_template(k=36.6, g=45, rhos=2.65, phic=0.4, n=8, kw=2.8, rhow=1.09,
+    ...                             khc=0.1, rhohc=0.25, p=[10, 20, 30], sw=np.linspace(0, 1, 5))
+    >>> plt.plot(rpt['ip'][1].T, rpt['vpvs'][1].T)  # 20 MPa, one line per saturation
+    """
+    if method not in _template_methods:
+        raise ValueError(f"Unsupported method '{method}'. Choose from: {list(_template_methods)}")
+
+    required_args = [arg for arg in _template_methods[method][1] if arg != "p"]
+    if method in ("soft_sand", "stiff_sand") and p is None:
+        raise TypeError(f"Missing required arguments for method '{method}': p")
+    if missing := [arg for arg in required_args if arg not in kwargs]:
+        raise TypeError(f"Missing required arguments for method '{method}': {', '.join(missing)}")
+    method_args = {arg: kwargs[arg] for arg in required_args}
+
+    phi = np.linspace(0, phic, 100) if phi is None else np.atleast_1d(np.asarray(phi, dtype=float))
+    sw = np.linspace(0, 1, 11) if sw is None else np.atleast_1d(np.asarray(sw, dtype=float))
+    p = np.array([np.nan]) if p is None else np.atleast_1d(np.asarray(p, dtype=float))
+
+    key = _parameter_hash(k, g, rhos, phic, n, kw, rhow, khc, rhohc, method, phi, sw, p,
+                          sorted(method_args.items()), get_precision())
+    if cache and key in _TEMPLATE_CACHE:
+        _TEMPLATE_CACHE.move_to_end(key)
+        return dict(_TEMPLATE_CACHE[key])
+
+    template = _evaluate(k, g, rhos, phic, n, kw, rhow, khc, rhohc, phi, sw, p, method, method_args)
+    template.update({"phi": phi.copy(), "sw": sw.copy(), "p": p.copy()})
+    for value in template.values():
+        value.setflags(write=False)
+
+    if cache:
+        _TEMPLATE_CACHE[key] = template
+        while len(_TEMPLATE_CACHE) > _CACHE_SIZE:
+            _TEMPLATE_CACHE.popitem(last=False)
+    return dict(template)
+
+
+def clear_template_cache() -> None:
+    """Remove every memoised template of :func:`rock_physics_template`."""
+    _TEMPLATE_CACHE.clear()
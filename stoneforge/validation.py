@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""Validation policy for the petrophysics functions.
+
+The petrophysics functions check their inputs and results for physically
+meaningless values (e.g. a bulk density lower than the fluid density, or a
+water saturation above 1 before clipping). The diagnostics are derived from
+the evaluated result, so each formula is computed only once, and are
+collected into a :class:`ValidationReport` instead of being emitted on every
+call.
+
+Modes
+-----
+    - 'warn-once' (default): diagnostics are recorded in the report and a
+      ``UserWarning`` is issued the first time each one is recorded;
+    - 'strict': a :class:`ValidationError` is raised on the first diagnostic;
+    - 'off': no checks are made at all (no extra passes over the data).
+
+Example
+-------
+>>> from stoneforge import validation
+>>> validation.set_validation("off")                # global mode
+>>> with validation.validation("warn-once") as report:
+...     sw = archie(rt, phi)
+>>> report.summary()
+[{'function': 'archie', 'message': '...', 'samples': 12, 'calls': 1}]
+"""
+
+import os
+import sys
+import warnings
+from contextlib import contextmanager
+import numpy as np
+from typing import Annotated
+
+MODES = ("strict", "warn-once", "off")
+
+# Frames from files in this directory are skipped when warnings are issued.
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__)) + os.sep
+
+
+class ValidationError(ValueError):
+    """Raised by the 'strict' validation mode."""
+
+
+class ValidationReport:
+    """Diagnostics collected by the petrophysics functions.
+
+    Each diagnostic is identified by the function name and its message and
+    keeps the number of offending samples and the number of calls that
+    raised it.
+    """
+
+    def __init__(self):
+        self.records = {}
+
+    def add(self, function, message, samples=1):
+        """Record a diagnostic. Returns True if it is new in this report."""
+        key = (function, message)
+        new = key not in self.records
+        record = self.records.setdefault(key, {"samples": 0, "calls": 0})
+        record["samples"] += int(samples)
+        record["calls"] += 1
+        return new
+
+    def clear(self):
+        self.records.clear()
+
+    def summary(self) -> list:
+        """Diagnostics as a list of dictionaries."""
+        return [{"function": f, "message": m, **r} for (f, m), r in self.records.items()]
+
+    def __len__(self):
+        return len(self.records)
+
+    def __bool__(self):
+        return bool(self.records)
+
+    def __repr__(self):
+        lines = [f"{f}: {m} ({r['samples']} samples in {r['calls']} calls)"
+                 for (f, m), r in self.records.items()]
+        return "ValidationReport(" + ("\n    " + "\n    ".join(lines) if lines else "") + ")"
+
+
+_policy = {"mode": "warn-once", "report": ValidationReport()}
+
+
+def set_validation(
+    mode: Annotated[str, "Validation mode: 'strict', 'warn-once' or 'off'"] = "warn-once") -> None:
+    """Set the global validation mode.
+
+    Parameters
+    ----------
+    mode : str
+        One of 'strict', 'warn-once' (default) and 'off'.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unsupported validation mode '{mode}'. Choose from: {list(MODES)}")
+    _policy["mode"] = mode
+
+
+def get_validation() -> str:
+    """Return the current validation mode."""
+    return _policy["mode"]
+
+
+def get_report() -> ValidationReport:
+    """Return the report where the diagnostics are currently collected."""
+    return _policy["report"]
+
+
+@contextmanager
+def validation(
+    mode: Annotated[str, "Validation mode: 'strict', 'warn-once' or 'off'"] = "warn-once",
+    report: Annotated[ValidationReport, "Report receiving the diagnostics"] = None):
+    """Context manager that applies a validation mode to a block of code.
+
+    Parameters
+    ----------
+    mode : str
+        Mode used inside the block (see :func:`set_validation`).
+    report : ValidationReport, optional
+        Report receiving the diagnostics of the block. A new report is
+        created if not given.
+
+    Yields
+    ------
+    report : ValidationReport
+        The report of the block.
+    """
+    previous = dict(_policy)
+    set_validation(mode)
+    _policy["report"] = report if report is not None else ValidationReport()
+    try:
+        yield _policy["report"]
+    finally:
+        _policy.update(previous)
+
+
+def enabled() -> bool:
+    """Whether checks must be made (the mode is not 'off')."""
+    return _policy["mode"] != "off"
+
+
+def check(
+    function: Annotated[str, "Name of the function being checked"],
+    message: Annotated[str, "Diagnostic message"],
+    invalid: Annotated[np.array, "Condition (or mask) flagging invalid values"]) -> None:
+    """Record a diagnostic if any value of `invalid` is True.
+
+    Meant for conditions on parameters, which are cheap to evaluate; use
+    :func:`check_range` for logs.
+    """
+    if _policy["mode"] == "off":
+        return
+    samples = np.count_nonzero(invalid)
+    if samples:
+        _record(function, message, samples)
+
+
+def check_range(
+    function: Annotated[str, "Name of the function being checked"],
+    message: Annotated[str, "Diagnostic message"],
+    values: Annotated[np.array, "Values to be checked"],
+    lower: Annotated[float, "Lower bound"] = None,
+    upper: Annotated[float, "Upper bound"] = None,
+    closed: Annotated[bool, "Whether the bounds are valid values"] = True) -> None:
+    """Record a diagnostic if any of `values` falls outside [lower, upper].
+
+    Nothing is computed when the mode is 'off'. NaN values are not counted.
+    If `closed` is False the bounds themselves are invalid.
+    """
+    if _policy["mode"] == "off":
+        return
+    samples = 0
+    if lower is not None:
+        samples += np.count_nonzero(values < lower if closed else values <= lower)
+    if upper is not None:
+        samples += np.count_nonzero(values > upper if closed else values >= upper)
+    if samples:
+        _record(function, message, samples)
+
+
+def _stacklevel():
+    """Warning stack level of the first caller of `_record` outside stoneforge.
+
+    The depth varies with the façades, chunking and precision wrappers
+    between the user's call and the check, so it is found by walking the
+    stack.
+    """
+    frame = sys._getframe(2)
+    level = 2
+    while frame is not None and os.path.abspath(frame.f_code.co_filename).startswith(_PACKAGE_DIR):
+        frame = frame.f_back
+        level += 1
+    return level
+
+
+def _record(function, message, samples):
+    if _policy["mode"] == "strict":
+        raise ValidationError(f"{function}: {message} ({samples} samples)")
+    if _policy["report"].add(function, message, samples):
+        warnings.warn(UserWarning(f"{function}: {message}"), stacklevel=_stacklevel())
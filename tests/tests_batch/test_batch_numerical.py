@@ -0,0 +1,61 @@
+# %%
+import pytest
+import numpy as np
+
+if __package__:
+    from ..petrophysics import batch, water_saturation, porosity
+else:
+    from stoneforge.petrophysics import batch, water_saturation, porosity
+
+# -------------------------------------------------------------------------------------------------------------- #
+# test functions
+
+def _wells(n_wells=5, size=200):
+    rng = np.random.default_rng(0)
+    wells = {}
+    for i in range(n_wells):
+        wells[f"W{i}"] = {
+            "DEPT": {"data": np.linspace(1000.0, 1100.0, size), "unit": "m"},
+            "ILD": {"data": rng.uniform(1.0, 100.0, size), "unit": "ohm.m"},
+            "PHIE": {"data": rng.uniform(0.05, 0.3, size), "unit": "v/v"},
+        }
+    return wells
+
+
+def test_batch_process_pool_matches_serial():
+    wells = _wells(n_wells=2)
+    curves = {"rt": "ILD", "phi": "PHIE"}
+    params = {"W0": {"rw": 0.05}, "W1": {"rw": 0.08}}
+    common = dict(a=1.0, m=2.0, n=2.0, method="archie")
+
+    serial = batch.batch(wells, "water_saturation", curves, parameters=params, n_jobs=1, **common)
+    pooled = batch.batch(wells, "water_saturation", curves, parameters=params, n_jobs=2, **common)
+
+    assert list(pooled) == list(wells)
+    for name, well in wells.items():
+        rw = params[name]["rw"]
+        expected = water_saturation.archie(well["ILD"]["data"], well["PHIE"]["data"], rw=rw)
+        assert np.allclose(serial[name], expected)
+        assert np.allclose(pooled[name], expected)
+
+
+def test_batch_zoned_parameters():
+    wells = _wells(n_wells=1, size=101)
+    rhob = np.linspace(2.0, 2.6, 101)
+    wells["W0"]["RHOB"] = rhob
+    params = {"W0": [(1050.0, {"rhom": 2.71, "rhof": 1.0}), (1000.0, {"rhom": 2.65, "rhof": 1.1})]}
+
+    result = batch.batch(wells, "porosity", {"rhob": "RHOB"}, parameters=params,
+                         depth="DEPT", n_jobs=1, method="density")["W0"]
+
+    depth = wells["W0"]["DEPT"]["data"]
+    upper = depth < 1050.0
+    assert np.allclose(result[upper], porosity.density_porosity(rhob[upper], 2.65, 1.1))
+    assert np.allclose(result[~upper], porosity.density_porosity(rhob[~upper], 2.71, 1.0))
+
+
+def test_batch_zoned_parameters_require_depth():
+    wells = _wells(n_wells=1)
+    with pytest.raises(ValueError):
+        batch.batch(wells, "porosity", {"rhob": "PHIE"}, parameters={"W0": [(0.0, {})]},
+                    n_jobs=1, method="density")
@@ -0,0 +1,61 @@
+# %%
+import pytest
+import numpy as np
+
+if __package__:
+    from ..petrophysics import porosity, water_saturation, helpers
+    from ..petrophysics.total_organic_carbon_content import calculate_toc
+else:
+    from stoneforge.petrophysics import porosity, water_saturation, helpers
+    from stoneforge.petrophysics.total_organic_carbon_content import calculate_toc
+
+# -------------------------------------------------------------------------------------------------------------- #
+# test functions
+
+def test_chunked_porosity_matches_direct():
+    rhob = np.linspace(1.9, 2.8, 1001)
+
+    expected = porosity.porosity(method="density", rhob=rhob, rhom=2.65, rhof=1.1)
+    result = porosity.porosity(method="density", rhob=rhob, rhom=2.65, rhof=1.1, chunksize=97)
+
+    assert np.allclose(result, expected)
+
+
+def test_chunked_water_saturation_memmap(tmp_path):
+    n = 5000
+    rt = np.lib.format.open_memmap(tmp_path / "rt.npy", mode="w+", dtype=float, shape=(n,))
+    rt[:] = np.linspace(1.0, 200.0, n)
+    phi = np.full(n, 0.2)
+    out = np.lib.format.open_memmap(tmp_path / "sw.npy", mode="w+", dtype=float, shape=(n,))
+
+    result = water_saturation.water_saturation(rw=0.05, rt=rt, phi=phi, a=1.0, m=2.0,
+                                               n=2.0, method="archie", out=out, chunksize=512)
+    expected = water_saturation.archie(rt=np.asarray(rt), phi=phi, rw=0.05, a=1.0, m=2.0, n=2.0)
+
+    assert result is out
+    assert np.allclose(np.load(tmp_path / "sw.npy"), expected)
+
+
+def test_chunked_apply_short_array_first():
+    rt = np.linspace(1.0, 200.0, 1000)
+    phi = np.full(1000, 0.2)
+
+    result = helpers.chunked_apply(water_saturation.archie, chunksize=128, rw=np.array([0.05]), rt=rt, phi=phi)
+
+    assert np.allclose(result, water_saturation.archie(rt=rt, phi=phi, rw=0.05))
+
+
+def test_chunked_toc_matches_direct():
+    dt = np.linspace(60.0, 120.0, 300)
+    rt = np.linspace(0.5, 2.0, 300)
+
+    expected = calculate_toc(dt, rt, 70.0, 1.0, 10.0)
+    result = calculate_toc(dt, rt, 70.0, 1.0, 10.0, chunksize=7)
+
+    assert np.allclose(result, expected)
+
+
+def test_chunked_apply_invalid_chunksize():
+    with pytest.raises(ValueError):
+        helpers.chunked_apply(porosity.gaymard_porosity, chunksize=0,
+                              phid=np.ones(3), phin=np.ones(3))
@@ -0,0 +1,45 @@
+# %%
+import pytest
+import numpy as np
+
+if __package__:
+    from ..preprocessing import estimate_depth_shift, apply_depth_shift
+else:
+    from stoneforge.preprocessing import estimate_depth_shift, apply_depth_shift
+
+# -------------------------------------------------------------------------------------------------------------- #
+# test functions
+
+rng = np.random.default_rng(29)
+depth = 1500.0 + 0.1524 * np.arange(40000)
+gr = 80.0 + 30.0 * np.convolve(rng.normal(size=depth.size), np.ones(15) / 15, mode="same")
+# the repeat run reads every feature deeper by 1 to 3 m
+lag = 1.0 + 2.0 * (depth - depth[0]) / (depth[-1] - depth[0])
+repeat = np.interp(depth - lag, depth, gr) + rng.normal(0.0, 0.5, depth.size)
+repeat[5000:5200] = np.nan
+
+
+def test_estimate_depth_shift_recovers_piecewise_shift():
+    match = estimate_depth_shift(gr, repeat, depth, window=30.0, max_shift=4.0)
+
+    inner = slice(500, -500)
+    np.testing.assert_allclose(match["shift"][inner], -lag[inner], atol=0.05)
+    assert np.nanmedian(match["correlation"]) > 0.9
+
+
+def test_apply_depth_shift_aligns_all_curves():
+    curves = np.stack([repeat, 2.0 * repeat])
+
+    shifted = apply_depth_shift(curves, depth, -lag)
+
+    good = ~np.isnan(shifted[0])
+    assert np.isnan(shifted[0, -5:]).all() and good[:4900].all()
+    np.testing.assert_allclose(shifted[1], 2.0 * shifted[0], equal_nan=True)
+    residual = shifted[0, good] - gr[good]
+    assert np.sqrt(np.mean(residual**2)) < 1.0
+
+
+def test_irregular_depth_is_rejected():
+    irregular = depth + rng.uniform(0.0, 0.05, depth.size)
+    with pytest.raises(ValueError):
+        estimate_depth_shift(gr, repeat, irregular)
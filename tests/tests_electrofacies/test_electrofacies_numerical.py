@@ -0,0 +1,89 @@
+# %%
+import pytest
+import numpy as np
+
+if __package__:
+    from ..machine_learning.clustering import electrofacies
+else:
+    from stoneforge.machine_learning.clustering import electrofacies
+
+# -------------------------------------------------------------------------------------------------------------- #
+# test functions
+
+rng = np.random.default_rng(37)
+centres = np.array([[20.0, 2.85, 0.02], [40.0, 2.65, 0.05], [70.0, 2.20, 0.25], [120.0, 2.45, 0.30]])
+noise = np.array([5.0, 0.03, 0.02])
+
+
+def _well(size):
+    labels = np.repeat(rng.integers(0, 4, size // 50), 50)
+    logs = centres[labels] + rng.normal(size=(labels.size, 3)) * noise
+    logs[rng.random(labels.size) < 0.02, 1] = np.nan
+    return labels, logs
+
+
+def test_kmeans_recovers_facies_and_writes_back():
+    truth, wells = {}, {}
+    for name in ("W1", "W2", "W3"):
+        labels, logs = _well(20000)
+        truth[name] = labels
+        wells[name] = {"GR": {"data": logs[:, 0], "unit": "GAPI"},
+                       "RHOB": {"data": logs[:, 1], "unit": "G/C3"},
+                       "NPHI": {"data": logs[:, 2], "unit": "V/V"}}
+
+    model = electrofacies(n_facies=4, curves=["GR", "RHOB", "NPHI"], batch_size=4096).fit(wells)
+    facies = model.write(wells)
+
+    np.testing.assert_allclose(model.centres * model.scale + model.mean, centres, rtol=0.02)
+    for name in wells:
+        valid = ~np.isnan(wells[name]["RHOB"]["data"])
+        assert np.isnan(facies[name][~valid]).all()
+        # facies are numbered by increasing GR, as the true centres
+        assert np.mean(facies[name][valid] == truth[name][valid]) > 0.99
+        np.testing.assert_array_equal(wells[name]["FACIES"]["data"], facies[name])
+
+
+def test_gmm_streams_memory_mapped_wells(tmp_path):
+    wells, truth = {}, {}
+    for name in ("A", "B"):
+        labels, logs = _well(30000)
+        np.save(tmp_path / f"{name}.npy", logs)
+        wells[name] = np.load(tmp_path / f"{name}.npy", mmap_mode="r")
+        truth[name] = labels
+
+    model = electrofacies(n_facies=4, method="gmm", batch_size=5000).fit(wells)
+
+    probability = model.predict_proba(wells["A"])
+    valid = ~np.isnan(probability[:, 0])
+    np.testing.assert_allclose(probability[valid].sum(axis=1), 1.0)
+    assert np.mean(np.argmax(probability[valid], axis=1) == truth["A"][valid]) > 0.99
+    assert np.all(np.diff(model.centres[:, 0]) > 0)
+
+
+def test_gmm_reseeds_collapsed_components():
+    _, logs = _well(20000)
+    logs = logs[~np.isnan(logs).any(axis=1)]
+    model = electrofacies(n_facies=4, batch_size=1000).fit({"W": logs})
+    # a component far from every sample loses all its responsibility
+    model.method = "gmm"
+    model.centres[0] = 50.0
+    rows = (logs[:5000] - model.mean) / model.scale
+
+    model._fit_gmm(model._wells({"W": logs}), np.random.default_rng(0), rows)
+
+    assert np.all(np.isfinite(model.centres)) and np.all(model.weights > 0)
+    assert np.all(np.abs(model.centres) < 10.0)
+    assert np.all(np.diff(model.centres[:, 0]) >= 0)
+    assert np.isfinite(model.predict_proba(logs)).all()
+
+
+def test_matrix_layout_and_unknown_method():
+    labels, logs = _well(5000)
+    wells = {"W": {"mnemonics": ["GR", "RHOB", "NPHI"], "units": ["", "", ""], "data": logs.T.copy()}}
+
+    model = electrofacies(n_facies=4, curves=["GR", "RHOB", "NPHI"]).fit(wells)
+    model.write(wells, name="EF")
+
+    assert wells["W"]["mnemonics"][-1] == "EF" and wells["W"]["data"].shape == (4, labels.size)
+    with pytest.raises(ValueError):
+        electrofacies(method="dbscan")
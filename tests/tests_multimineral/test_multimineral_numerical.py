@@ -0,0 +1,74 @@
+# %%
+import pytest
+import numpy as np
+from scipy.optimize import minimize
+
+if __package__:
+    from ..petrophysics import multimineral
+else:
+    from stoneforge.petrophysics import multimineral
+
+# -------------------------------------------------------------------------------------------------------------- #
+# test functions
+
+endpoints = {
+    "quartz": {**multimineral.MINERALS["quartz"], "gr": 20.0},
+    "calcite": {**multimineral.MINERALS["calcite"], "gr": 10.0},
+    "illite": {"rhob": 2.52, "nphi": 0.30, "dt": 87.0, "pef": 3.45, "gr": 150.0},
+    "water": {**multimineral.MINERALS["water"], "gr": 0.0},
+}
+names = ["rhob", "nphi", "dt", "gr", "pef"]
+A = np.array([[endpoints[c][name] for c in endpoints] for name in names])
+sigma = np.array([multimineral.DEFAULT_UNCERTAINTY[name] for name in names])
+
+rng = np.random.default_rng(5)
+volumes = rng.dirichlet([2.0, 2.0, 1.0, 1.0], 2000)
+noise = rng.normal(0.0, 1.0, (2000, len(names))) * sigma
+logs = {name: volumes @ A[i] + noise[:, i] for i, name in enumerate(names)}
+
+
+def test_multimineral_recovers_exact_volumes():
+    exact = {name: volumes @ A[i] for i, name in enumerate(names)}
+
+    result = multimineral.multimineral(exact, endpoints, chunksize=700)
+
+    estimate = np.column_stack([result[c] for c in endpoints])
+    np.testing.assert_allclose(estimate, volumes, atol=1e-8)
+    np.testing.assert_allclose(result["phi"], volumes[:, 3], atol=1e-8)
+    np.testing.assert_allclose(result["residual"], 0.0, atol=1e-6)
+
+
+def test_multimineral_matches_slsqp():
+    result = multimineral.multimineral(logs, endpoints)
+    estimate = np.column_stack([result[c] for c in endpoints])
+
+    assert np.all(estimate >= 0.0)
+    np.testing.assert_allclose(estimate.sum(axis=1), 1.0)
+
+    w = 1.0 / sigma**2
+    for i in range(10):
+        b = np.array([logs[name][i] for name in names])
+        misfit = lambda v: np.sum(w * (A @ v - b)**2)
+        solution = minimize(misfit, np.full(4, 0.25), method="SLSQP", bounds=[(0, 1)] * 4,
+                            constraints={"type": "eq", "fun": lambda v: v.sum() - 1}, options={"ftol": 1e-14})
+        assert misfit(estimate[i]) <= solution.fun + 1e-8
+
+
+def test_multimineral_missing_logs():
+    partial = {name: value.copy() for name, value in logs.items()}
+    partial["dt"][:10] = np.nan
+    partial["pef"][5:15] = np.nan
+    for name in names:
+        partial[name][20] = np.nan
+
+    result = multimineral.multimineral(partial, endpoints)
+    reduced = multimineral.multimineral({name: logs[name][:5] for name in names if name != "dt"}, endpoints)
+
+    np.testing.assert_allclose(result["quartz"][:5], reduced["quartz"])
+    assert np.isnan(result["quartz"][20]) and np.isnan(result["phi"][20])
+    assert np.all(np.isfinite(result["quartz"][:20]))
+
+
+def test_multimineral_missing_endpoint():
+    with pytest.raises(ValueError):
+        multimineral.multimineral(logs, {"quartz": multimineral.MINERALS["quartz"]})
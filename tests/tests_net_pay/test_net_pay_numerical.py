@@ -3,9 +3,9 @@ import pytest
 import numpy as np
 
 if __package__:
-    from ..reservoir.net_pay import net_pay_siliciclastic, cutoff
+    from ..reservoir.net_pay import net_pay_siliciclastic, cutoff, pay_prefix_sums, interval_summary, cutoff_sensitivity
 else:
-    from reservoir.net_pay import net_pay_siliciclastic, cutoff
+    from reservoir.net_pay import net_pay_siliciclastic, cutoff, pay_prefix_sums, interval_summary, cutoff_sensitivity
 
 # -------------------------------------------------------------------------------------------------------------- #
 # test functions
@@ -31,4 +31,62 @@ def test_net_pay_output_domain():
 
     for key in ['rock', 'res', 'pay']:
         valid = np.isnan(result[key]) | (result[key] == 1.0)
-        assert np.all(valid)
\ No newline at end of file
+        assert np.all(valid)
+
+
+# 3. Interval summaries from prefix sums
+def test_interval_summary_matches_loop():
+    rng = np.random.default_rng(2)
+    depth = np.cumsum(rng.uniform(0.1, 0.3, 2000)) + 1000.0
+    vsh, phi, sw = rng.uniform(0, 0.6, 2000), rng.uniform(0, 0.35, 2000), rng.uniform(0, 1, 2000)
+    prefix = pay_prefix_sums(depth, vsh, phi, sw)
+
+    edges = np.concatenate([[1.5*depth[0] - 0.5*depth[1]], 0.5*(depth[1:] + depth[:-1]),
+                            [1.5*depth[-1] - 0.5*depth[-2]]])
+    top, base = edges[[10, 300, 0]], edges[[250, 1999, 2000]]
+    summary = interval_summary(prefix, top, base)
+
+    flags = net_pay_siliciclastic(vsh, phi, sw, fillzeros=True)
+    h = np.diff(edges)
+    for i, (j, k) in enumerate([(10, 250), (300, 1999), (0, 2000)]):
+        res, pay = flags['res'][j:k] * h[j:k], flags['pay'][j:k] * h[j:k]
+        assert summary['gross'][i] == pytest.approx(h[j:k].sum())
+        assert summary['net_reservoir'][i] == pytest.approx(res.sum())
+        assert summary['net_pay'][i] == pytest.approx(pay.sum())
+        assert summary['phi_pay'][i] == pytest.approx((phi[j:k] * pay).sum() / pay.sum())
+        assert summary['hcpv'][i] == pytest.approx((phi[j:k] * (1 - sw[j:k]) * pay).sum())
+
+
+# 4. Partial cells and unordered depths
+def test_interval_summary_partial_cells_and_order():
+    depth = np.array([100.0, 101.0, 102.0, 103.0])
+    vsh, phi, sw = np.full(4, 0.1), np.full(4, 0.25), np.array([0.1, 0.1, 0.9, np.nan])
+
+    prefix = pay_prefix_sums(depth[::-1], vsh, phi, sw[::-1])
+    summary = interval_summary(prefix, [100.0, 90.0], [101.25, 101.25])
+
+    np.testing.assert_allclose(summary['gross'], [1.25, 1.75])
+    np.testing.assert_allclose(summary['net_reservoir'], [1.25, 1.75])
+    np.testing.assert_allclose(summary['net_pay'], [1.25, 1.75])
+    np.testing.assert_allclose(summary['sw_pay'], [0.1, 0.1])
+
+
+# 5. Cutoff sensitivity grid
+def test_cutoff_sensitivity_matches_net_pay():
+    rng = np.random.default_rng(6)
+    depth = np.cumsum(rng.uniform(0.1, 0.3, 1500))
+    vsh, phi, sw = rng.uniform(0, 0.6, 1500), rng.uniform(0, 0.35, 1500), rng.uniform(0, 1, 1500)
+    vsh[::50] = np.nan
+    vsh_t, phi_t, sw_t = [0.4, 0.2, 0.3], [0.1, 0.05, 0.2, phi[7]], [0.5, 0.3]
+
+    result = cutoff_sensitivity(vsh, phi, sw, vsh_t, phi_t, sw_t, depth=depth)
+
+    h = np.diff(np.concatenate([[1.5*depth[0] - 0.5*depth[1]], 0.5*(depth[1:] + depth[:-1]),
+                                [1.5*depth[-1] - 0.5*depth[-2]]]))
+    assert result['net_pay'].shape == (3, 4, 2)
+    for a, vt in enumerate(vsh_t):
+        for b, pt in enumerate(phi_t):
+            for c, st in enumerate(sw_t):
+                flags = net_pay_siliciclastic(vsh, phi, sw, vsh_t=vt, phi_t=pt, sw_t=st, fillzeros=True)
+                assert result['net_pay'][a, b, c] == pytest.approx(np.sum(flags['pay'] * h))
+            assert result['net_reservoir'][a, b] == pytest.approx(np.sum(flags['res'] * h))
@@ -0,0 +1,54 @@
+# %%
+import pytest
+import numpy as np
+
+if __package__:
+    from ..petrophysics import nmr
+else:
+    from stoneforge.petrophysics import nmr
+
+# -------------------------------------------------------------------------------------------------------------- #
+# test functions
+
+t2 = np.logspace(-1, 4, 64)
+rng = np.random.default_rng(21)
+spectra = rng.uniform(0.0, 0.005, (3000, 64))
+
+
+def test_nmr_properties_matches_bin_sums():
+    edges = nmr.t2_bin_edges(t2)
+    # cutoffs on bin edges, so that no bin is split
+    result = nmr.nmr_properties(spectra, t2, t2_cutoff=edges[40], cbw_cutoff=edges[15])
+
+    np.testing.assert_allclose(result["phit"], spectra.sum(axis=1))
+    np.testing.assert_allclose(result["cbw"], spectra[:, :15].sum(axis=1), atol=1e-15)
+    np.testing.assert_allclose(result["bvi"], spectra[:, 15:40].sum(axis=1), atol=1e-15)
+    np.testing.assert_allclose(result["ffi"], spectra[:, 40:].sum(axis=1))
+    t2lm = np.exp((spectra * np.log(t2)).sum(axis=1) / spectra.sum(axis=1))
+    np.testing.assert_allclose(result["t2lm"], t2lm)
+    np.testing.assert_allclose(result["k_sdr"], 4.0 * result["phit"]**4 * t2lm**2)
+    np.testing.assert_allclose(result["k_timur_coates"],
+                               (10 * result["phie"])**4 * (result["ffi"] / result["bvi"])**2)
+
+
+def test_nmr_properties_split_bin():
+    edges = nmr.t2_bin_edges(t2)
+    cutoff = np.sqrt(edges[40] * edges[41])   # middle of bin 40 in log(T2)
+
+    result = nmr.nmr_properties(spectra, t2, t2_cutoff=cutoff)
+
+    np.testing.assert_allclose(result["ffi"], spectra[:, 41:].sum(axis=1) + 0.5 * spectra[:, 40])
+
+
+def test_nmr_properties_memmap_chunks(tmp_path):
+    mapped = np.lib.format.open_memmap(tmp_path / "t2.npy", mode="w+", dtype=np.float32, shape=spectra.shape)
+    mapped[:] = spectra
+
+    chunked = nmr.nmr_properties(mapped, t2, chunksize=700)
+    expected = nmr.nmr_properties(spectra.astype(np.float32), t2)
+
+    assert chunked["phie"].dtype == np.float32
+    for name in ("phit", "phie", "ffi", "t2lm", "k_sdr"):
+        np.testing.assert_allclose(chunked[name], expected[name], rtol=1e-5)
+    with pytest.raises(ValueError):
+        nmr.nmr_properties(spectra[:, :10], t2)
@@ -0,0 +1,96 @@
+# %%
+import pytest
+import numpy as np
+
+if __package__:
+    from ..petrophysics import porosity, shale_volume, water_saturation, permeability, helpers
+    from ..petrophysics.total_organic_carbon_content import passey
+else:
+    from stoneforge.petrophysics import porosity, shale_volume, water_saturation, permeability, helpers
+    from stoneforge.petrophysics.total_organic_carbon_content import passey
+
+# -------------------------------------------------------------------------------------------------------------- #
+# test functions
+
+n = 257
+rng = np.random.default_rng(7)
+logs = {
+    "rhob": rng.uniform(1.9, 2.7, n),
+    "nphi": rng.uniform(0.05, 0.4, n),
+    "gr": rng.uniform(20.0, 150.0, n),
+    "rt": rng.uniform(1.0, 100.0, n),
+    "phi": rng.uniform(0.05, 0.3, n),
+    "vsh": rng.uniform(0.0, 0.5, n),
+    "sw": rng.uniform(0.1, 0.9, n),
+}
+
+cases = [
+    (porosity.density_porosity, {"rhob": logs["rhob"], "rhom": 2.65, "rhof": 1.1}),
+    (porosity.neutron_density_porosity, {"phid": logs["phi"], "phin": logs["nphi"]}),
+    (shale_volume.vshale_larionov, {"gr": logs["gr"], "grmin": 20.0, "grmax": 150.0}),
+    (shale_volume.vshale_stieber, {"gr": logs["gr"], "grmin": 20.0, "grmax": 150.0}),
+    (water_saturation.simandoux, {"rt": logs["rt"], "phi": logs["phi"], "vsh": logs["vsh"]}),
+    (water_saturation.fertl, {"rt": logs["rt"], "phi": logs["phi"], "vsh": logs["vsh"]}),
+    (permeability.coates_dumanoir, {"resd": logs["rt"], "phi": logs["phi"]}),
+    (passey, {"dt": logs["rhob"] * 40, "rt": np.log10(logs["rt"]), "dtbaseline": 80.0, "rtbaseline": 1.0}),
+]
+
+
+@pytest.mark.parametrize("fun, kwargs", cases)
+def test_out_matches_allocating_call(fun, kwargs):
+    expected = fun(**kwargs)
+    out = np.empty(n)
+
+    result = fun(**kwargs, out=out)
+
+    assert result is out
+    assert np.allclose(out, expected, equal_nan=True)
+
+
+def test_out_reused_between_calls():
+    out = np.empty(n, dtype=np.float32)
+    gr = logs["gr"].astype(np.float32)
+
+    first = shale_volume.vshale_clavier(gr, 20.0, 150.0, out=out)
+    second = shale_volume.vshale_clavier(gr[::-1].copy(), 20.0, 150.0, out=out)
+
+    assert first is second is out
+    assert out.dtype == np.float32
+    assert np.allclose(out[::-1], shale_volume.vshale_clavier(gr, 20.0, 150.0), atol=1e-6)
+
+
+def test_out_scalar_inputs_return_scalar():
+    sw = water_saturation.archie(rt=20.0, phi=0.2, rw=0.05)
+
+    assert np.ndim(sw) == 0
+    assert np.isclose(sw, np.sqrt(0.05 / (0.2**2 * 20.0)))
+
+
+def test_out_matches_closed_form():
+    rt, phi, vsh = logs["rt"], logs["phi"], logs["vsh"]
+    out = np.empty(n)
+
+    water_saturation.simandoux(rt, phi, vsh, rw=0.05, rsh=4.0, out=out)
+
+    # Simandoux with a = 1 and m = n = 2
+    c = (1 - vsh) * 0.05 / phi**2
+    d = c * vsh / (2 * 4.0)
+    expected = np.sqrt(d**2 + c / rt) - d
+    assert np.allclose(out, np.clip(expected, 0.0, 1.0))
+
+    porosity.density_porosity(logs["rhob"], 2.65, 1.1, out=out)
+    assert np.allclose(out, np.clip((2.65 - logs["rhob"]) / (2.65 - 1.1), 0.0, 1.0))
+
+
+def test_scratch_buffers_are_bounded(monkeypatch):
+    helpers.release_scratch()
+    small = np.empty(16)
+    assert helpers._scratch(small) is helpers._scratch(small)
+
+    monkeypatch.setattr(helpers, "SCRATCH_MAX_BYTES", 64)
+    large = np.empty(1000)
+    assert helpers._scratch(large) is not helpers._scratch(large)
+    assert all(b.nbytes <= 16 * 8 for b in helpers._workspace.buffers.values())
+
+    helpers.release_scratch()
+    assert helpers._workspace.buffers == {}
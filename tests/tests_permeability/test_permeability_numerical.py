@@ -118,3 +118,38 @@ def test_permeability_models_porosity_effect():
 
     assert np.all(np.diff(k_timur) >= 0.0)
     assert np.all(np.diff(k_coates) >= 0.0)
+
+
+def test_permeability_facade_matches_kernels():
+    rng = np.random.default_rng(12)
+    phi, sw = rng.uniform(0.05, 0.3, 300), rng.uniform(0.1, 0.9, 300)
+    resd = rng.uniform(1.0, 100.0, 300)
+
+    np.testing.assert_allclose(permeability.permeability("timur", phi=phi, sw=sw), permeability.timur(phi, sw))
+    np.testing.assert_allclose(permeability.permeability("coates_dumanoir", resd=resd, phi=phi, hd=0.7, chunksize=64),
+                               permeability.coates_dumanoir(resd, phi, hd=0.7))
+    with pytest.raises(TypeError):
+        permeability.permeability("tixier", resd=resd)
+    with pytest.raises(ValueError):
+        permeability.permeability("kozeny", phi=phi)
+
+
+def test_permeability_stack_realizations():
+    rng = np.random.default_rng(13)
+    phi = rng.uniform(0.05, 0.3, (20, 3000))
+    sw = rng.uniform(0.1, 0.9, (20, 3000))
+    resd = rng.uniform(1.0, 100.0, 3000)
+    ress = resd * 0.5
+    rw = rng.uniform(0.02, 0.05, (20, 1))
+    methods = ("coates", "tixier", "coates_dumanoir", "timur")
+
+    result = permeability.permeability_stack(phi, sw, resd, ress, rw=rw, methods=methods)
+
+    expected = [
+        permeability.coates(phi, sw),
+        permeability.tixier(resd, ress, rw=rw) * np.ones((20, 1)),
+        permeability.coates_dumanoir(resd, phi, rw=rw),
+        permeability.timur(phi, sw),
+    ]
+    assert result.shape == (4, 20, 3000)
+    np.testing.assert_allclose(result, expected, rtol=1e-12)
@@ -0,0 +1,88 @@
+# %%
+import pytest
+import numpy as np
+
+if __package__:
+    from .. import precision
+    from ..petrophysics import porosity, shale_volume, water_saturation, permeability
+    from ..reservoir import net_pay
+    from ..rock_physics import gem, fluid_substitution
+else:
+    from stoneforge import precision
+    from stoneforge.petrophysics import porosity, shale_volume, water_saturation, permeability
+    from stoneforge.reservoir import net_pay
+    from stoneforge.rock_physics import gem, fluid_substitution
+
+# -------------------------------------------------------------------------------------------------------------- #
+# test functions
+
+rng = np.random.default_rng(42)
+N = 10_000
+RHOB = rng.uniform(2.0, 2.6, N)
+GR = rng.uniform(20.0, 150.0, N)
+RT = rng.uniform(1.0, 500.0, N)
+PHI = rng.uniform(0.05, 0.35, N)
+VSH = rng.uniform(0.0, 0.5, N)
+SW = rng.uniform(0.1, 0.9, N)
+
+FRACTIONS = [
+    lambda x: porosity.density_porosity(x["rhob"], 2.65, 1.1),
+    lambda x: porosity.gaymard_porosity(x["phi"], x["phi"] * 0.9),
+    lambda x: shale_volume.vshale_larionov(x["gr"], 20.0, 150.0),
+    lambda x: shale_volume.vshale_clavier(x["gr"], 20.0, 150.0),
+    lambda x: water_saturation.archie(x["rt"], x["phi"], rw=0.03),
+    lambda x: water_saturation.simandoux(x["rt"], x["phi"], x["vsh"]),
+    lambda x: water_saturation.indonesia(x["rt"], x["phi"], x["vsh"]),
+    lambda x: water_saturation.fertl(x["rt"], x["phi"], x["vsh"]),
+    lambda x: net_pay.cutoff(x["vsh"], 0.3),
+]
+
+UNBOUNDED = [
+    lambda x: permeability.timur(x["phi"], x["sw"]),
+    lambda x: permeability.coates(x["phi"], x["sw"]),
+    lambda x: gem.soft_sand(36.0, 45.0, x["phi"], 0.4, 8, 20e-3)[0],
+    lambda x: fluid_substitution.gassmann_subs(x["phi"], 36.0, 20.0, 2.2, 0.5),
+]
+
+
+def _logs(dtype):
+    return {"rhob": RHOB.astype(dtype), "gr": GR.astype(dtype), "rt": RT.astype(dtype),
+            "phi": PHI.astype(dtype), "vsh": VSH.astype(dtype), "sw": SW.astype(dtype)}
+
+
+@pytest.mark.parametrize("model", FRACTIONS + UNBOUNDED)
+def test_float32_inputs_are_preserved(model):
+    assert model(_logs(np.float32)).dtype == np.float32
+
+
+@pytest.mark.parametrize("model", FRACTIONS)
+def test_float32_policy_envelope_fractions(model):
+    reference = model(_logs(np.float64))
+    with precision.precision("float32"):
+        result = model(_logs(np.float64))
+
+    assert result.dtype == np.float32
+    assert np.allclose(result, reference, rtol=0.0, atol=1e-5, equal_nan=True)
+
+
+@pytest.mark.parametrize("model", UNBOUNDED)
+def test_float32_policy_envelope_unbounded(model):
+    reference = model(_logs(np.float64))
+    with precision.precision("float32"):
+        result = model(_logs(np.float64))
+
+    assert result.dtype == np.float32
+    assert np.allclose(result, reference, rtol=1e-4, atol=0.0)
+
+
+def test_precision_policy_is_restored():
+    precision.set_precision("float32")
+    try:
+        with precision.precision(None):
+            assert precision.get_precision() is None
+        assert precision.get_precision() == np.float32
+    finally:
+        precision.set_precision(None)
+
+    with pytest.raises(ValueError):
+        precision.set_precision("int32")
@@ -0,0 +1,106 @@
+# %%
+import inspect
+import pytest
+import numpy as np
+
+if __package__:
+    from ..petrophysics import propagation
+else:
+    from stoneforge.petrophysics import propagation
+
+# -------------------------------------------------------------------------------------------------------------- #
+# test functions
+
+rng = np.random.default_rng(11)
+n = 50
+logs = {
+    "rhob": rng.uniform(2.1, 2.5, n), "nphi": rng.uniform(0.15, 0.3, n), "vsh": rng.uniform(0.05, 0.3, n),
+    "phid": rng.uniform(0.05, 0.3, n), "phin": rng.uniform(0.05, 0.3, n), "dt": rng.uniform(70.0, 110.0, n),
+    "gr": rng.uniform(40.0, 110.0, n), "rt": rng.uniform(5.0, 50.0, n), "phi": rng.uniform(0.15, 0.3, n),
+    "resd": rng.uniform(20.0, 50.0, n), "ress": rng.uniform(1.0, 10.0, n), "sw": rng.uniform(0.2, 0.6, n),
+    "phie": rng.uniform(0.05, 0.12, n),
+}
+cases = [
+    ("effective_porosity", {"phi": logs["phi"], "vsh": logs["vsh"]}),
+    ("neutron_density_porosity", {"phid": logs["phid"], "phin": logs["phin"]}),
+    ("neutron_density_porosity", {"phid": logs["phid"], "phin": logs["phin"], "squared": True}),
+    ("density_porosity", {"rhob": logs["rhob"], "rhom": 2.65, "rhof": 1.1}),
+    ("neutron_porosity", {"nphi": logs["nphi"], "vsh": logs["vsh"]}),
+    ("sonic_porosity", {"dt": logs["dt"], "dtma": 55.5, "dtf": 189.0}),
+    ("gaymard_porosity", {"phid": logs["phid"], "phin": logs["phin"]}),
+    ("gammarayindex", {"gr": logs["gr"], "grmin": 20.0, "grmax": 130.0}),
+    ("vshale_linear", {"gr": logs["gr"], "grmin": 20.0, "grmax": 130.0}),
+    ("vshale_larionov_old", {"gr": logs["gr"], "grmin": 20.0, "grmax": 130.0}),
+    ("vshale_larionov", {"gr": logs["gr"], "grmin": 20.0, "grmax": 130.0}),
+    ("vshale_clavier", {"gr": logs["gr"], "grmin": 20.0, "grmax": 130.0}),
+    ("vshale_stieber", {"gr": logs["gr"], "grmin": 20.0, "grmax": 130.0}),
+    ("vshale_neu_den", {"nphi": logs["nphi"], "rhob": logs["rhob"]}),
+    ("vshale_nrm", {"phit": logs["phi"], "phie": logs["phie"]}),
+    ("archie", {"rt": logs["rt"], "phi": logs["phi"], "rw": 0.05}),
+    ("simandoux", {"rt": logs["rt"], "phi": logs["phi"], "vsh": logs["vsh"], "rw": 0.05}),
+    ("indonesia", {"rt": logs["rt"], "phi": logs["phi"], "vsh": logs["vsh"], "rw": 0.05}),
+    ("fertl", {"rt": logs["rt"], "phi": logs["phi"], "vsh": logs["vsh"], "rw": 0.05}),
+    ("tixier", {"resd": logs["resd"], "ress": logs["ress"]}),
+    ("timur", {"phi": logs["phi"], "sw": logs["sw"]}),
+    ("coates_dumanoir", {"resd": logs["resd"], "phi": logs["phi"]}),
+    ("coates", {"phi": logs["phi"], "sw": logs["sw"]}),
+]
+
+
+@pytest.mark.parametrize("name, kwargs", cases)
+def test_derivatives_match_finite_differences(name, kwargs):
+    kernel, derivatives = propagation._derivative_methods[name]
+    partials = derivatives(**kwargs)
+    # parameters left to their defaults are checked at the default value
+    defaults = {arg: p.default for arg, p in inspect.signature(kernel).parameters.items()
+                if isinstance(p.default, float)}
+    assert set(partials) == {arg for arg in kwargs if not isinstance(kwargs[arg], bool)} | set(defaults)
+    kwargs = {**defaults, **kwargs}
+
+    for arg, d in partials.items():
+        x = np.asarray(kwargs[arg], dtype=float)
+        h = 1e-6 * np.maximum(np.abs(x), 1e-3)
+        up = kernel(**{**kwargs, arg: x + h})
+        down = kernel(**{**kwargs, arg: x - h})
+        numerical = (up - down) / (2 * h)
+        assert np.allclose(d, numerical, rtol=1e-4, atol=1e-8), arg
+
+
+def test_propagate_matches_monte_carlo():
+    kwargs = {"rt": logs["rt"], "phi": logs["phi"], "rw": 0.05, "m": 2.0}
+    std = {"rw": 0.002, "m": 0.02, "phi": 0.005}
+    result = propagation.propagate("archie", std, **kwargs)
+
+    r = np.random.default_rng(0)
+    draws = 20000
+    sw = propagation._derivative_methods["archie"][0](
+        rt=kwargs["rt"], phi=kwargs["phi"] + r.normal(0, std["phi"], (draws, 1)),
+        rw=0.05 + r.normal(0, std["rw"], (draws, 1)), m=2.0 + r.normal(0, std["m"], (draws, 1)))
+
+    assert np.allclose(result["std"], sw.std(axis=0), rtol=0.05)
+
+
+def test_propagate_clipped_output_has_zero_std():
+    result = propagation.propagate("density_porosity", {"rhob": 0.02}, rhob=np.array([2.7, 2.3, 0.9]), rhom=2.65, rhof=1.0)
+
+    assert result["std"][0] == 0.0 and result["std"][2] == 0.0
+    assert np.isclose(result["std"][1], 0.02 / 1.65)
+
+
+def test_propagate_correlation():
+    kwargs = {"rhob": logs["rhob"], "rhom": 2.65, "rhof": 1.1}
+    independent = propagation.propagate("density_porosity", {"rhom": 0.02, "rhof": 0.05}, **kwargs)
+    correlated = propagation.propagate("density_porosity", {"rhom": 0.02, "rhof": 0.05},
+                                       correlation={("rhom", "rhof"): 0.8}, **kwargs)
+
+    assert np.all(correlated["std"] > independent["std"])
+
+
+def test_propagate_facade_method_names():
+    kwargs = {"gr": logs["gr"], "grmin": 20.0, "grmax": 130.0}
+    by_method = propagation.propagate("larionov", {"grmax": 5.0}, **kwargs)
+    by_kernel = propagation.propagate("vshale_larionov", {"grmax": 5.0}, **kwargs)
+
+    np.testing.assert_array_equal(by_method["std"], by_kernel["std"])
+    with pytest.raises(ValueError):
+        propagation.propagate("waxman_smits", {"rw": 0.01}, rt=logs["rt"], phi=logs["phi"], qv=0.5)
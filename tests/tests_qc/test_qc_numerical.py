@@ -0,0 +1,65 @@
+# %%
+import numpy as np
+import pandas as pd
+
+if __package__:
+    from ..preprocessing import rolling_median, hampel, bad_hole_flags, despike, log_qc
+else:
+    from stoneforge.preprocessing import rolling_median, hampel, bad_hole_flags, despike, log_qc
+
+# -------------------------------------------------------------------------------------------------------------- #
+# test functions
+
+rng = np.random.default_rng(5)
+gr = 60.0 + rng.normal(0.0, 2.0, 2000)
+gr[[100, 700, 1500]] += [80.0, -50.0, 120.0]
+gr[300:320] = np.nan
+
+
+def test_rolling_median_ignores_nan():
+    expected = pd.Series(gr).rolling(9, center=True, min_periods=1).median().to_numpy()
+
+    np.testing.assert_allclose(rolling_median(gr, 9), expected, equal_nan=True)
+    np.testing.assert_allclose(rolling_median(np.stack([gr, -gr]), 9, chunksize=500)[1], -expected, equal_nan=True)
+
+
+def test_hampel_matches_windowed_definition():
+    flags, median = hampel(gr, window=7, threshold=3.0)
+
+    expected = np.zeros(gr.size, dtype=bool)
+    for i in np.flatnonzero(~np.isnan(gr)):
+        window = gr[max(0, i - 3):i + 4]
+        m = np.nanmedian(window)
+        expected[i] = abs(gr[i] - m) > 3.0 * 1.4826 * np.nanmedian(np.abs(window - m))
+
+    np.testing.assert_array_equal(flags, expected)
+    assert flags[[100, 700, 1500]].all()
+    assert not flags[300:320].any()
+
+
+def test_despike_and_bad_hole():
+    caliper = np.full(gr.size, 8.6)
+    caliper[1000:1010] = 11.0
+    bad = bad_hole_flags(caliper, 8.5, tolerance=1.0)
+    assert np.array_equal(np.flatnonzero(bad), np.arange(1000, 1010))
+
+    flags = np.zeros(gr.size, dtype=bool)
+    flags[[100, 1500]] = True
+    depth = np.linspace(1000.0, 1999.5, gr.size)
+    repaired = despike(gr, flags, depth=depth)
+    np.testing.assert_allclose(repaired[100], 0.5 * (gr[99] + gr[101]))
+    assert np.isnan(repaired[310]) and np.array_equal(repaired[~flags], gr[~flags], equal_nan=True)
+
+
+def test_log_qc_well():
+    well = {"DEPT": {"data": np.arange(gr.size) * 0.5, "unit": "M"},
+            "GR": {"data": gr, "unit": "GAPI"},
+            "RHOB": {"data": np.full(gr.size, 2.4), "unit": "G/C3"},
+            "CALI": {"data": np.where(np.arange(gr.size) < 50, 12.0, 8.5), "unit": "IN"}}
+
+    curves, flags = log_qc(well, caliper="CALI", bit_size=8.5, depth="DEPT", bad_hole_curves=["RHOB"], method="nan")
+
+    assert set(flags) == {"GR", "RHOB", "BAD_HOLE"}
+    assert np.isnan(curves["GR"][[100, 700, 1500]]).all()
+    assert np.isnan(curves["RHOB"][:50]).all() and not np.isnan(curves["RHOB"][50:]).any()
+    np.testing.assert_array_equal(curves["CALI"], well["CALI"]["data"])
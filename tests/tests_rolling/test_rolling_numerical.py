@@ -0,0 +1,65 @@
+# %%
+import numpy as np
+import pandas as pd
+
+if __package__:
+    from ..preprocessing import rolling, window_bounds
+else:
+    from stoneforge.preprocessing import rolling, window_bounds
+
+# -------------------------------------------------------------------------------------------------------------- #
+# test functions
+
+rng = np.random.default_rng(17)
+size = 3000
+curve = 2.4 + 0.1 * rng.normal(size=size)
+curve[rng.random(size) < 0.1] = np.nan
+curve[1000:1040] = np.nan
+depth = 1500.0 + np.cumsum(rng.uniform(0.05, 0.3, size))
+
+
+def test_sample_windows_match_pandas():
+    roll = rolling(curve, 15, min_periods=3)
+    expected = pd.Series(curve).rolling(15, center=True, min_periods=3)
+
+    np.testing.assert_allclose(roll.mean(), expected.mean(), equal_nan=True)
+    np.testing.assert_allclose(roll.std(), expected.std(), equal_nan=True)
+    np.testing.assert_allclose(roll.min(), expected.min(), equal_nan=True)
+    np.testing.assert_allclose(roll.max(), expected.max(), equal_nan=True)
+    np.testing.assert_allclose(roll.quantile([0.1, 0.5])[1], expected.median(), equal_nan=True)
+
+
+def test_depth_windows_on_irregular_sampling():
+    roll = rolling(curve, 4.0, depth=depth)
+    lo, hi = window_bounds(size, 4.0, depth)
+
+    for i in (0, 400, 1020, 2999):
+        window = curve[lo[i]:hi[i]]
+        assert np.all(np.abs(depth[lo[i]:hi[i]] - depth[i]) <= 2.0)
+        if np.isnan(window).all():
+            assert np.isnan(roll.mean()[i]) and np.isnan(roll.median()[i])
+            continue
+        np.testing.assert_allclose(roll.mean()[i], np.nanmean(window))
+        np.testing.assert_allclose(roll.var(ddof=0)[i], np.nanvar(window), atol=1e-12)
+        np.testing.assert_allclose(roll.quantile(0.9)[i], np.nanquantile(window, 0.9))
+        assert roll.max()[i] == np.nanmax(window)
+
+
+def test_variance_of_offset_curve_is_stable():
+    offset = curve + 1e6
+    roll = rolling(offset, 31)
+
+    np.testing.assert_allclose(roll.var(), rolling(curve, 31).var(), rtol=1e-5, equal_nan=True)
+
+
+def test_std_of_long_drifting_curve():
+    n = 1_000_000
+    r = np.random.default_rng(3)
+    drifting = 10.0 * np.cumsum(r.normal(size=n)) + np.linspace(0.0, 1e5, n)
+    drifting[r.random(n) < 0.01] = np.nan
+    roll = rolling(drifting, 11, min_periods=2)
+
+    # two-pass reference over every full window
+    windows = np.lib.stride_tricks.sliding_window_view(drifting, 11)
+    np.testing.assert_allclose(roll.std()[5:-5], np.nanstd(windows, axis=1, ddof=1), rtol=1e-9)
+    np.testing.assert_allclose(roll.mean()[5:-5], np.nanmean(windows, axis=1), rtol=1e-12)
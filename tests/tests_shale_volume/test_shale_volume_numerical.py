@@ -101,4 +101,25 @@ def test_vshale_nrm_vectorized_behavior():
 
     assert isinstance(result, np.ndarray)
     assert np.all(result >= 0.0)
-    assert np.all(result <= 1.0)
\ No newline at end of file
+    assert np.all(result <= 1.0)
+
+def test_vshale_stack_matches_single_methods():
+    gr = np.array([10.0, 35.0, 80.0, 140.0, np.nan, 200.0])
+    methods = ("stieber", "linear", "larionov_old", "clavier", "larionov")
+
+    result = shale_volume.vshale_stack(gr, 20.0, 150.0, methods=methods)
+
+    assert result.shape == (5, 6)
+    for row, method in zip(result, methods):
+        expected = shale_volume.vshale(method=method, gr=gr, grmin=20.0, grmax=150.0)
+        np.testing.assert_allclose(row, expected, equal_nan=True)
+
+
+def test_vshale_stack_out_and_invalid_method():
+    gr = np.linspace(20.0, 150.0, 11, dtype=np.float32)
+    out = np.empty((2, 11), dtype=np.float32)
+
+    assert shale_volume.vshale_stack(gr, 20.0, 150.0, methods=["linear", "stieber"], out=out) is out
+    np.testing.assert_allclose(out[0], np.linspace(0.0, 1.0, 11), atol=1e-6)
+    with pytest.raises(ValueError):
+        shale_volume.vshale_stack(gr, 20.0, 150.0, methods=("neu_den",))
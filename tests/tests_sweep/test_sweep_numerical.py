@@ -0,0 +1,64 @@
+# %%
+import pytest
+import numpy as np
+
+if __package__:
+    from ..petrophysics import porosity, water_saturation, sweep
+else:
+    from stoneforge.petrophysics import porosity, water_saturation, sweep
+
+# -------------------------------------------------------------------------------------------------------------- #
+# test functions
+
+rng = np.random.default_rng(3)
+rt = rng.uniform(0.5, 200.0, 400)
+phi = rng.uniform(0.02, 0.35, 400)
+vsh = rng.uniform(0.0, 0.6, 400)
+grid = {"rw": [0.02, 0.05, 0.1], "m": [1.8, 2.0, 2.3], "n": [1.9, 2.2]}
+
+
+@pytest.mark.parametrize("method, logs", [
+    ("archie", {"rt": rt, "phi": phi}),
+    ("simandoux", {"rt": rt, "phi": phi, "vsh": vsh, "rsh": 3.0}),
+    ("indonesia", {"rt": rt, "phi": phi, "vsh": vsh, "rsh": 3.0}),
+])
+def test_sweep_matches_loop(method, logs):
+    fun = water_saturation._sw_methods[method]
+
+    result = sweep.sweep(method, grid, max_bytes=20_000, **logs)
+
+    assert result["values"].shape == (3, 3, 2, 400)
+    assert result["dims"] == ("rw", "m", "n", "depth")
+    for i, rw in enumerate(grid["rw"]):
+        for j, m in enumerate(grid["m"]):
+            for k, n in enumerate(grid["n"]):
+                expected = fun(**logs, rw=rw, m=m, n=n)
+                assert np.allclose(result["values"][i, j, k], expected, atol=1e-12)
+
+
+def test_sweep_fertl_and_porosity():
+    fertl = sweep.sweep("fertl", {"alpha": [0.2, 0.4], "a": [0.8, 1.0]}, rt=rt, phi=phi, vsh=vsh)
+    density = sweep.sweep("density", {"rhom": [2.65, 2.71]}, rhob=rng.uniform(2.0, 2.6, 400), rhof=1.0)
+
+    expected = water_saturation.fertl(rt, phi, vsh, a=1.0, alpha=0.4)
+    assert np.allclose(fertl["values"][1, 1], expected)
+    assert density["values"].shape == (2, 400)
+    assert np.all((density["values"] >= 0) & (density["values"] <= 1))
+
+
+def test_sweep_memmap_output(tmp_path):
+    depth = np.arange(400) * 0.1524
+    out = np.lib.format.open_memmap(tmp_path / "sw.npy", mode="w+", dtype=float, shape=(3, 400))
+
+    result = sweep.sweep("archie", {"rw": grid["rw"]}, depth=depth, out=out, max_bytes=1000, rt=rt, phi=phi)
+
+    assert result["values"] is out
+    assert np.array_equal(result["coords"]["depth"], depth)
+    assert np.allclose(np.load(tmp_path / "sw.npy")[2], water_saturation.archie(rt, phi, rw=0.1))
+
+
+def test_sweep_unknown_argument():
+    with pytest.raises(TypeError):
+        sweep.sweep("archie", {"rsh": [1.0, 2.0]}, rt=rt, phi=phi)
+    with pytest.raises(ValueError):
+        sweep.sweep("archie", {"rw": [0.02, 0.05]}, rt=rt, phi=phi, rw=0.03)
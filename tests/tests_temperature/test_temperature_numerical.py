@@ -0,0 +1,56 @@
+# %%
+import pytest
+import numpy as np
+
+if __package__:
+    from ..petrophysics.temperature import temperature_profile, arps_rw
+    from ..petrophysics.water_saturation import water_saturation
+else:
+    from stoneforge.petrophysics.temperature import temperature_profile, arps_rw
+    from stoneforge.petrophysics.water_saturation import water_saturation
+
+# -------------------------------------------------------------------------------------------------------------- #
+# test functions
+
+depth = np.linspace(500.0, 3500.0, 3001)
+
+
+def test_temperature_profile_sources():
+    gradient = temperature_profile(depth, surface_temperature=25.0, gradient=0.03)
+    np.testing.assert_allclose(gradient, 25.0 + 0.03 * depth)
+
+    bht = temperature_profile(depth, surface_temperature=25.0, bht=[115.0, 85.0], bht_depth=[3000.0, 2000.0])
+    np.testing.assert_allclose(bht[depth == 2000.0], 85.0)
+    np.testing.assert_allclose(bht[depth == 1000.0], 55.0)
+    # below the deepest reading the last segment gradient (0.03) continues
+    np.testing.assert_allclose(bht[-1], 130.0)
+
+    single = temperature_profile(depth, bht=100.0, bht_depth=3000.0, gradient=0.025)
+    np.testing.assert_allclose(single, 100.0 + 0.025 * (depth - 3000.0))
+
+    scalar = temperature_profile(3500.0, bht=100.0, bht_depth=3000.0, gradient=0.025)
+    assert np.ndim(scalar) == 0 and np.isclose(scalar, 112.5)
+
+    with pytest.raises(ValueError):
+        temperature_profile(depth, bht=100.0, bht_depth=3000.0)
+
+
+def test_arps_rw():
+    np.testing.assert_allclose(arps_rw(0.1, 100.0, 25.0), 0.1 * 46.5 / 121.5)
+    np.testing.assert_allclose(arps_rw(0.1, 212.0, 77.0, unit="F"), 0.1 * 83.77 / 218.77)
+    np.testing.assert_allclose(arps_rw(0.05, 25.0, 25.0), 0.05)
+
+
+def test_water_saturation_with_rw_curve():
+    rng = np.random.default_rng(41)
+    rt = rng.uniform(2.0, 100.0, depth.size)
+    phi = rng.uniform(0.1, 0.3, depth.size)
+    vsh = rng.uniform(0.0, 0.3, depth.size)
+    rw = arps_rw(0.08, temperature_profile(depth, surface_temperature=20.0, gradient=0.03), 20.0)
+
+    for method in ("archie", "simandoux", "indonesia"):
+        sw = water_saturation(rw=rw, rt=rt, phi=phi, a=1.0, m=2.0, n=2.0, vsh=vsh, rsh=4.0, method=method)
+        for i in (0, 1500, 3000):
+            expected = water_saturation(rw=rw[i], rt=rt[i], phi=phi[i], a=1.0, m=2.0, n=2.0,
+                                        vsh=vsh[i], rsh=4.0, method=method)
+            np.testing.assert_allclose(sw[i], expected)
@@ -0,0 +1,71 @@
+# %%
+import pytest
+import numpy as np
+
+if __package__:
+    from ..rock_physics.templates import rock_physics_template, clear_template_cache
+    from ..rock_physics.gem import gem
+    from ..rock_physics.fluid_substitution import gassmann
+else:
+    from stoneforge.rock_physics.templates import rock_physics_template, clear_template_cache
+    from stoneforge.rock_physics.gem import gem
+    from stoneforge.rock_physics.fluid_substitution import gassmann
+
+# -------------------------------------------------------------------------------------------------------------- #
+# test functions
+
+mineral = dict(k=36.6, g=45.0, rhos=2.65, phic=0.4, n=8.0)
+fluids = dict(kw=2.8, rhow=1.09, khc=0.1, rhohc=0.25)
+phi = np.linspace(0.0, 0.4, 41)
+sw = np.linspace(0.0, 1.0, 6)
+p = np.array([0.01, 0.02, 0.03])
+
+
+@pytest.mark.parametrize("method, kwargs", [
+    ("soft_sand", {}),
+    ("stiff_sand", {}),
+    ("contact_cement", dict(kc=36.6, gc=45.0)),
+    ("constant_cement", dict(kc=36.6, gc=45.0, phib=0.34)),
+])
+def test_template_matches_loop(method, kwargs):
+    rpt = rock_physics_template(**mineral, **fluids, method=method, phi=phi, sw=sw, p=p, cache=False, **kwargs)
+    assert rpt["k"].shape == (p.size, sw.size, phi.size)
+
+    for i, pressure in enumerate(p):
+        args = dict(kwargs, p=pressure) if method.endswith("sand") else kwargs
+        kdry, gdry = gem(mineral["k"], mineral["g"], phi[1:], mineral["phic"], mineral["n"], method=method, **args)
+        for j, s in enumerate(sw):
+            kfluid = 1.0 / (s / fluids["kw"] + (1 - s) / fluids["khc"])
+            expected = gassmann(phi[1:], mineral["k"], method="ksat", kdry=kdry, kfluidB=kfluid)
+            np.testing.assert_allclose(rpt["k"][i, j, 1:], expected, rtol=1e-10)
+            np.testing.assert_allclose(rpt["g"][i, j, 1:], gdry, rtol=1e-10)
+    rho = (1 - phi) * mineral["rhos"] + phi * (sw[:, None] * fluids["rhow"] + (1 - sw[:, None]) * fluids["rhohc"])
+    np.testing.assert_allclose(rpt["rho"][0], rho)
+    np.testing.assert_allclose(rpt["vp"], np.sqrt((rpt["k"] + 4 / 3 * rpt["g"]) / rpt["rho"]))
+    # the mineral point has no fluid to substitute
+    np.testing.assert_allclose(rpt["k"][..., 0], rpt["kdry"][:, None, 0] + 0 * sw)
+
+
+def test_template_cache():
+    clear_template_cache()
+    first = rock_physics_template(**mineral, **fluids, phi=phi, sw=sw, p=p)
+    second = rock_physics_template(**mineral, **fluids, phi=phi.copy(), sw=sw, p=p)
+    assert second["vp"] is first["vp"]
+    assert not first["vp"].flags.writeable
+    with pytest.raises(ValueError):
+        first["vp"][0, 0, 0] = 0.0
+
+    other = rock_physics_template(**mineral, **fluids, phi=phi, sw=sw, p=p + 0.01)
+    assert other["vp"] is not first["vp"]
+    fresh = rock_physics_template(**mineral, **fluids, phi=phi, sw=sw, p=p, cache=False)
+    assert fresh["vp"] is not first["vp"]
+    np.testing.assert_array_equal(fresh["vp"], first["vp"])
+
+
+def test_template_errors():
+    with pytest.raises(TypeError):
+        rock_physics_template(**mineral, **fluids, method="soft_sand")
+    with pytest.raises(TypeError):
+        rock_physics_template(**mineral, **fluids, method="constant_cement", kc=36.6, gc=45.0)
+    with pytest.raises(ValueError):
+        rock_physics_template(**mineral, **fluids, method="unknown", p=p)
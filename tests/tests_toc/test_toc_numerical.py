@@ -0,0 +1,48 @@
+# %%
+import pytest
+import numpy as np
+
+if __package__:
+    from ..petrophysics.total_organic_carbon_content import passey, passey_baseline, passey_lom_grid, calculate_toc
+else:
+    from stoneforge.petrophysics.total_organic_carbon_content import passey, passey_baseline, passey_lom_grid, calculate_toc
+
+# -------------------------------------------------------------------------------------------------------------- #
+# test functions
+
+rng = np.random.default_rng(23)
+depth = np.linspace(2000.0, 3000.0, 20000)
+# organic-lean background where the scaled sonic and log resistivity overlay
+dt = 80.0 + 10.0 * np.sin(depth / 7.0) + rng.normal(0.0, 0.5, depth.size)
+rt = 1.0 - 0.02 * (dt - 80.0) + rng.normal(0.0, 0.01, depth.size)
+rt[depth >= 2700.0] += 0.3
+source = (depth > 2400.0) & (depth < 2500.0)
+rt[source] += 0.8
+dt[source] += 15.0
+
+
+def test_passey_baseline_per_zone():
+    base = passey_baseline(dt, rt, window=5.0, depth=depth, tops=[2000.0, 2700.0])
+
+    assert not base["baseline"][source].any()
+    upper, lower = depth < 2700.0, depth >= 2700.0
+    assert np.unique(base["rtbaseline"][upper]).size == 1 and np.unique(base["rtbaseline"][lower]).size == 1
+    np.testing.assert_allclose(base["rtbaseline"][lower][0] - base["rtbaseline"][upper][0], 0.3, atol=0.05)
+
+    toc = calculate_toc(dt, rt, lom=10.0, window=5.0, depth=depth, tops=[2000.0, 2700.0])
+    assert np.median(toc[~source]) < 0.2 < 3.0 < np.median(toc[source])
+
+
+def test_passey_lom_grid_matches_passey():
+    lom = np.array([8.0, 10.5, 12.0])
+
+    grid = passey_lom_grid(dt, rt, 80.0, 1.0, lom)
+
+    assert grid.shape == (3, depth.size)
+    for i, value in enumerate(lom):
+        np.testing.assert_allclose(grid[i], passey(dt, rt, 80.0, 1.0, value))
+
+
+def test_calculate_toc_rejects_unknown_method():
+    with pytest.raises(ValueError):
+        calculate_toc(dt, rt, 80.0, 1.0, 10.0, method="schmoker")
@@ -0,0 +1,71 @@
+# %%
+import numpy as np
+
+if __package__:
+    from ..petrophysics import uncertainty, porosity, shale_volume, water_saturation
+else:
+    from stoneforge.petrophysics import uncertainty, porosity, shale_volume, water_saturation
+
+# -------------------------------------------------------------------------------------------------------------- #
+# test functions
+
+rng = np.random.default_rng(0)
+n = 150
+logs = {"rhob": rng.uniform(2.0, 2.6, n), "gr": rng.uniform(20.0, 140.0, n), "rt": rng.uniform(1.0, 100.0, n)}
+parameters = {
+    "rhom": ("normal", 2.65, 0.02), "rhof": 1.0,
+    "grmin": ("uniform", 15.0, 25.0), "grmax": ("uniform", 120.0, 150.0),
+    "rw": ("lognormal", np.log(0.03), 0.2), "m": ("triangular", 1.8, 2.0, 2.3), "n": 2.0,
+    "vsh_t": 0.5, "phi_t": 0.1, "sw_t": 0.6,
+}
+
+
+def _ensemble(n_realizations, seed, block_size):
+    """Full ensemble drawn with the same streams as `monte_carlo`."""
+    sw = []
+    seeds = np.random.SeedSequence(seed).spawn(-(-n_realizations // block_size))
+    for child in seeds:
+        r = np.random.default_rng(child)
+        p = {k: uncertainty._draw(r, v, block_size) for k, v in parameters.items()}
+        vsh = shale_volume.vshale_linear(logs["gr"], p["grmin"], p["grmax"])
+        phi = porosity.density_porosity(logs["rhob"], p["rhom"], p["rhof"])
+        sw.append(water_saturation.archie(logs["rt"], phi, p["rw"], 1.0, p["m"], p["n"]))
+    return np.concatenate(sw)[:n_realizations]
+
+
+def test_monte_carlo_quantiles_match_full_ensemble():
+    result = uncertainty.monte_carlo(logs, parameters, n_realizations=400, block_size=100, seed=5, bins=2000)
+    expected = np.quantile(_ensemble(400, 5, 100), [0.1, 0.5, 0.9], axis=0, method="inverted_cdf")
+
+    assert result["sw"].shape == (3, n)
+    # both lie in the same histogram bin
+    assert np.allclose(result["sw"], expected, rtol=0, atol=1 / 2000 + 1e-12)
+
+
+def test_monte_carlo_independent_of_n_jobs():
+    serial = uncertainty.monte_carlo(logs, parameters, n_realizations=300, block_size=64, seed=1)
+    pooled = uncertainty.monte_carlo(logs, parameters, n_realizations=300, block_size=64, seed=1, n_jobs=2)
+
+    assert np.array_equal(serial["phi"], pooled["phi"])
+    assert np.array_equal(serial["net_pay_samples"], pooled["net_pay_samples"])
+
+
+def test_monte_carlo_net_pay():
+    depth = 1000.0 + 0.5 * np.arange(n)
+    result = uncertainty.monte_carlo(logs, parameters, n_realizations=200, seed=2, depth=depth)
+
+    assert result["net_pay_samples"].shape == (200,)
+    assert np.all((result["pay_probability"] >= 0) & (result["pay_probability"] <= 1))
+    assert np.all(np.diff(result["net_pay"]) >= 0)
+    assert np.isclose(result["pay_probability"].sum() * 0.5, result["net_pay_samples"].mean())
+
+
+def test_monte_carlo_depth_chunks(monkeypatch):
+    whole = uncertainty.monte_carlo(logs, parameters, n_realizations=200, block_size=50, seed=3)
+    # a budget of a few depth samples per chunk
+    monkeypatch.setattr(uncertainty, "DEFAULT_BLOCK_BYTES", 2 * 3 * 1001 * 8 * 7)
+    chunked = uncertainty.monte_carlo(logs, parameters, n_realizations=200, block_size=50, seed=3)
+
+    for name in ("phi", "sw", "vsh", "pay_probability"):
+        assert np.array_equal(whole[name], chunked[name])
+    assert np.allclose(whole["net_pay_samples"], chunked["net_pay_samples"])
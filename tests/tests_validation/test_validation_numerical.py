@@ -0,0 +1,66 @@
+# %%
+import warnings
+import pytest
+import numpy as np
+
+if __package__:
+    from ..petrophysics import porosity, water_saturation
+    from .. import validation
+else:
+    from stoneforge.petrophysics import porosity, water_saturation
+    from stoneforge import validation
+
+# -------------------------------------------------------------------------------------------------------------- #
+# test functions
+
+rt = np.array([0.5, 1.0, 10.0, 100.0])
+phi = np.array([0.1, 0.1, 0.2, 0.3])
+
+
+def test_warn_once_collects_report():
+    with validation.validation("warn-once") as report:
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            for _ in range(3):
+                water_saturation.archie(rt, phi, rw=0.05)
+
+    assert len(caught) == 1
+    # the warning points at the call in this file, not inside stoneforge
+    assert caught[0].filename == __file__
+    record = report.summary()[0]
+    assert record["function"] == "archie"
+    assert record["calls"] == 3
+    assert record["samples"] == 6
+
+
+def test_strict_raises():
+    with validation.validation("strict"):
+        with pytest.raises(validation.ValidationError):
+            porosity.density_porosity(np.array([0.9, 2.3]), rhom=2.65, rhof=1.0)
+
+
+def test_off_skips_checks_and_keeps_result():
+    rhob = np.array([0.9, 2.3, np.nan])
+    expected = porosity.density_porosity(rhob, rhom=2.65, rhof=1.0)
+
+    with validation.validation("off") as report:
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            result = porosity.density_porosity(rhob, rhom=2.65, rhof=1.0)
+
+    assert not report
+    assert np.allclose(result, expected, equal_nan=True)
+
+
+def test_division_by_zero_gives_nan():
+    with validation.validation("warn-once") as report:
+        with pytest.warns(UserWarning):
+            result = porosity.sonic_porosity(np.array([60.0, 80.0]), dtma=55.5, dtf=55.5)
+
+    assert np.all(np.isnan(result))
+    assert len(report) == 1
+
+
+def test_invalid_mode():
+    with pytest.raises(ValueError):
+        validation.set_validation("sometimes")
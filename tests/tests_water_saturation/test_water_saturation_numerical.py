@@ -4,8 +4,10 @@ import numpy as np
 
 if __package__:
     from ..petrophysics.porosity import water_saturation
+    from .. import validation
 else:
     from stoneforge.petrophysics import water_saturation
+    from stoneforge import validation
 
 # -------------------------------------------------------------------------------------------------------------- #
 # test functions
@@ -126,3 +128,75 @@ def test_water_saturation_models_monotonic_rt():
     assert np.all(np.diff(archie) <= 0.0)
     assert np.all(np.diff(sim) <= 0.0)
     assert np.all(np.diff(indo) <= 0.0)
+
+
+def test_water_saturation_stack_matches_single_methods():
+    rng = np.random.default_rng(4)
+    rt = rng.uniform(0.5, 100.0, 200)
+    phi = rng.uniform(0.02, 0.35, 200)
+    vsh = rng.uniform(0.0, 0.5, 200)
+    params = dict(rw=0.04, a=0.9, m=2.1, n=1.9)
+    methods = ("fertl", "archie", "indonesia", "simandoux")
+
+    result = water_saturation.water_saturation_stack(rt, phi, vsh, rsh=3.0, alpha=0.25, methods=methods, **params)
+
+    expected = [
+        water_saturation.fertl(rt, phi, vsh, rw=0.04, a=0.9, m=2.1, alpha=0.25),
+        water_saturation.archie(rt, phi, **params),
+        water_saturation.indonesia(rt, phi, vsh, rsh=3.0, **params),
+        water_saturation.simandoux(rt, phi, vsh, rsh=3.0, **params),
+    ]
+    np.testing.assert_allclose(result, expected, rtol=1e-12, atol=1e-14)
+
+
+def test_water_saturation_stack_float32():
+    rt = np.linspace(1.0, 50.0, 64)
+    phi = np.full(64, 0.2)
+    vsh = np.full(64, 0.1)
+
+    result = water_saturation.water_saturation_stack(rt, phi, vsh, dtype="float32")
+    expected = water_saturation.water_saturation_stack(rt, phi, vsh)
+
+    assert result.dtype == np.float32 and result.shape == (4, 64)
+    np.testing.assert_allclose(result, expected, atol=1e-5)
+    with pytest.raises(TypeError):
+        water_saturation.water_saturation_stack(rt, phi, methods=("simandoux",))
+
+
+def test_waxman_smits_matches_quadratic():
+    rng = np.random.default_rng(8)
+    rt = rng.uniform(1.0, 100.0, 1000)
+    phi = rng.uniform(0.05, 0.3, 1000)
+    qv = rng.uniform(0.0, 1.0, 1000)
+
+    sw = water_saturation.waxman_smits(rt, phi, qv, rw=0.05, b=3.8)
+
+    # for n = 2 the equation is a quadratic in sw
+    A, B = phi**2 / 0.05, phi**2 * 3.8 * qv
+    expected = np.clip((-B + np.sqrt(B**2 + 4*A/rt)) / (2*A), 0, 1)
+    np.testing.assert_allclose(sw, expected, atol=1e-10)
+
+
+def test_dual_water_satisfies_equation():
+    rng = np.random.default_rng(9)
+    rt = rng.uniform(1.0, 100.0, 1000)
+    phi = rng.uniform(0.05, 0.3, 1000)
+    swb = rng.uniform(0.0, 0.4, 1000)
+
+    swt = water_saturation.water_saturation(rw=0.05, rt=rt, phi=phi, a=1.0, m=1.9, n=2.3,
+                                            swb=swb, rwb=0.2, method="dual_water")
+
+    inside = swt < 1
+    ct = phi**1.9 * swt**2.3 * (1/0.05 + swb/swt * (1/0.2 - 1/0.05))
+    np.testing.assert_allclose(ct[inside], 1/rt[inside], rtol=1e-8)
+    assert np.all(np.isfinite(swt)) and np.any(inside)
+
+
+def test_waxman_smits_maxiter_reported():
+    rt = np.array([5.0, 20.0])
+    phi = np.array([0.2, 0.15])
+
+    with validation.validation("strict"):
+        with pytest.raises(validation.ValidationError, match=r"did not converge .*\(2 samples\)"):
+            water_saturation.waxman_smits(rt, phi, qv=0.5, n=2.4, maxiter=1)
+        water_saturation.waxman_smits(rt, phi, qv=0.5, n=2.4)
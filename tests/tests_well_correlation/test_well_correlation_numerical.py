@@ -0,0 +1,79 @@
+# %%
+import pytest
+import numpy as np
+
+if __package__:
+    from ..preprocessing import dtw, dtw_batch
+else:
+    from stoneforge.preprocessing import dtw, dtw_batch
+
+# -------------------------------------------------------------------------------------------------------------- #
+# test functions
+
+rng = np.random.default_rng(31)
+
+
+def _full_dtw(a, b):
+    D = np.full((len(a) + 1, len(b) + 1), np.inf)
+    D[0, 0] = 0.0
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            D[i, j] = abs(a[i - 1] - b[j - 1]) + min(D[i - 1, j], D[i, j - 1], D[i - 1, j - 1])
+    return D[-1, -1]
+
+
+def test_dtw_matches_full_recursion():
+    a, b = rng.normal(size=40), rng.normal(size=33)
+
+    result = dtw(a, b, normalize=False)
+
+    path = result["path"]
+    assert tuple(path[0]) == (0, 0) and tuple(path[-1]) == (39, 32)
+    assert np.all(np.diff(path, axis=0) >= 0) and np.all(np.diff(path, axis=0).sum(axis=1) >= 1)
+    np.testing.assert_allclose(np.abs(a[path[:, 0]] - b[path[:, 1]]).sum(), _full_dtw(a, b))
+
+
+def test_dtw_batch_recovers_warping():
+    size = 3000
+    gr = np.convolve(rng.normal(size=size), np.ones(21) / 21, mode="same")
+    # each well is a stretched and squeezed copy of the type well
+    targets = {}
+    truth = {}
+    for k, amplitude in enumerate([0.03, 0.06, 0.09]):
+        length = 2500 + 250 * k
+        u = np.linspace(0.0, 1.0, length)
+        source = (u + amplitude * np.sin(2 * np.pi * u)) * (size - 1)
+        targets[f"well{k}"] = 40.0 + 100.0 * np.interp(source, np.arange(size), gr)
+        truth[f"well{k}"] = np.interp(np.arange(size), source, np.arange(length))
+
+    banded = dtw_batch(gr, targets, band=300)
+    pyramid = dtw_batch(gr, targets, band=300, levels=3, radius=6)
+
+    for name in targets:
+        for result in (banded, pyramid):
+            error = np.abs(result[name]["index"] - truth[name])[50:-50]
+            assert np.median(error) < 2.0
+
+
+def test_categorical_facies_alignment():
+    facies = np.repeat([1, 2, 3, 2, 1], [30, 20, 40, 10, 30]).astype(float)
+    stretched = np.repeat([1, 2, 3, 2, 1], [45, 20, 30, 15, 30]).astype(float)
+
+    result = dtw(facies, stretched, metric="categorical", band=40)
+
+    assert result["distance"] == 0.0
+    np.testing.assert_array_equal(stretched[result["path"][:, 1]], facies[result["path"][:, 0]])
+
+
+def test_dtw_batch_memory_groups():
+    reference = rng.normal(size=200)
+    targets = [rng.normal(size=180 + 10 * k) for k in range(5)]
+
+    together = dtw_batch(reference, targets, band=20)
+    # room for the step codes of two wells at a time
+    grouped = dtw_batch(reference, targets, band=20, max_bytes=2 * 200 * 41)
+
+    for k in range(5):
+        np.testing.assert_array_equal(together[k]["path"], grouped[k]["path"])
+    with pytest.raises(ValueError):
+        dtw_batch(reference, targets, max_bytes=200 * 100)
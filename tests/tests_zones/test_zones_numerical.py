@@ -0,0 +1,76 @@
+# %%
+import pytest
+import numpy as np
+
+if __package__:
+    from ..preprocessing import zone_table
+    from ..petrophysics import water_saturation, porosity, batch
+else:
+    from stoneforge.preprocessing import zone_table
+    from stoneforge.petrophysics import water_saturation, porosity, batch
+
+# -------------------------------------------------------------------------------------------------------------- #
+# test functions
+
+rng = np.random.default_rng(11)
+depth = np.linspace(900.0, 2100.0, 600)
+rt = rng.uniform(0.5, 200.0, 600)
+phi = rng.uniform(0.02, 0.35, 600)
+rhob = rng.uniform(2.0, 2.6, 600)
+zones = [(1500.0, {"rw": 0.05, "rhom": 2.71}), (1000.0, {"rw": 0.03, "rhom": 2.65}),
+         (1800.0, {"rw": 0.08})]
+
+
+def test_zone_table_expand():
+    table = zone_table(zones, defaults={"rhom": 2.68})
+
+    params = table.expand(depth)
+
+    idx = np.select([depth >= 1800.0, depth >= 1500.0], [2, 1], 0)
+    np.testing.assert_array_equal(params["rw"], np.array([0.03, 0.05, 0.08])[idx])
+    np.testing.assert_array_equal(params["rhom"], np.array([2.65, 2.71, 2.68])[idx])
+    assert table.index([100.0])[0] == 0
+
+
+def test_zone_table_missing_parameter():
+    with pytest.raises(ValueError):
+        zone_table(zones)
+
+
+def test_facades_with_zoned_parameters():
+    table = zone_table(zones, defaults={"rhom": 2.68})
+    params = table.expand(depth)
+
+    sw = water_saturation.water_saturation(rt=rt, phi=phi, a=1.0, m=2.0, n=2.0, rw=params["rw"], chunksize=128)
+    phid = porosity.porosity(method="density", rhob=rhob, rhof=1.0, rhom=params["rhom"])
+
+    idx = table.index(depth)
+    for i, (top, values) in enumerate(sorted(zones, key=lambda zone: zone[0])):
+        mask = idx == i
+        expected = water_saturation.archie(rt[mask], phi[mask], values["rw"], 1.0, 2.0, 2.0)
+        np.testing.assert_allclose(sw[mask], expected)
+        expected = porosity.density_porosity(rhob[mask], values.get("rhom", 2.68), 1.0)
+        np.testing.assert_allclose(phid[mask], expected)
+
+
+def test_effective_porosity_with_zoned_phi_sh():
+    phi_sh = np.where(depth < 1500.0, 0.05, 0.2)
+    vsh = np.full(depth.size, 0.5)
+
+    result = porosity.porosity("effective", phi=phi, vsh=vsh, phi_sh=phi_sh)
+
+    np.testing.assert_allclose(result, porosity.effective_porosity(phi, vsh, phi_sh))
+    np.testing.assert_allclose(porosity.porosity("effective", phi=0.3, vsh=0.5, phi_sh=np.full(5, 0.2)), 0.2)
+
+
+def test_batch_with_zone_table():
+    wells = {"W1": {"DEPT": depth, "ILD": rt, "PHIE": phi}, "W2": {"DEPT": depth, "ILD": rt, "PHIE": phi}}
+    table = zone_table([(top, {"rw": values["rw"]}) for top, values in zones])
+    parameters = {"W1": table, "W2": [(top, {"rw": values["rw"]}) for top, values in zones]}
+
+    result = batch.batch(wells, "water_saturation", {"rt": "ILD", "phi": "PHIE"}, parameters=parameters,
+                         depth="DEPT", n_jobs=1, a=1.0, m=2.0, n=2.0, method="archie")
+
+    expected = water_saturation.archie(rt, phi, table.expand(depth)["rw"], 1.0, 2.0, 2.0)
+    np.testing.assert_allclose(result["W1"], expected)
+    np.testing.assert_allclose(result["W2"], expected)